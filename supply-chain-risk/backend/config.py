@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -17,6 +18,21 @@ class Settings(BaseSettings):
         "sqlite:///./supply_chain_risk.db"
     )
 
+    # Async engine pool (request handlers); the sync engine serves background jobs
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+
+    # SQLite production profile: WAL journaling + per-connection pragmas, and all writes
+    # funnelled through one writer thread that commits up to WRITE_BATCH_JOBS jobs together
+    SQLITE_PROFILE_ENABLED: bool = True
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE_BYTES: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_WRITE_BATCH_JOBS: int = 64
+
     # JWT Auth
     SECRET_KEY: str = os.getenv("SECRET_KEY", "super-secret-key-change-in-production")
     ALGORITHM: str = "HS256"
@@ -30,6 +46,112 @@ class Settings(BaseSettings):
     ENAM_API_URL: str = "https://enam.gov.in/web/dashboard/trade-data"
     TRADE_API_URL: str = "https://api.data.gov.in/resource"
     LOGISTICS_API_URL: str = os.getenv("LOGISTICS_API_URL", "")
+    # Optional CSV/JSON corridor network for the logistics simulator (defaults to the built-in corridors)
+    LOGISTICS_CORRIDORS_FILE: str = os.getenv("LOGISTICS_CORRIDORS_FILE", "")
+
+    # Deterministic replay: simulated feeds draw from generators seeded per (time bucket, source)
+    REPLAY_MODE: bool = os.getenv("REPLAY_MODE", "false").lower() in ("1", "true", "yes")
+    REPLAY_SEED: int = 0
+    REPLAY_BUCKET_SECONDS: int = 300
+    REPLAY_BUCKET: Optional[int] = None  # pin the bucket so benchmark runs replay across restarts
+
+    # Upstream HTTP connection pooling (one pooled client per upstream host)
+    HTTP2_ENABLED: bool = True
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+
+    # Per-source request timeouts (seconds)
+    MANDI_TIMEOUT: float = 30.0
+    ENAM_TIMEOUT: float = 30.0
+    TRADE_TIMEOUT: float = 30.0
+    WEATHER_TIMEOUT: float = 15.0
+    LOGISTICS_TIMEOUT: float = 30.0
+
+    # OpenWeatherMap free-tier quota (per API key, shared by all workers)
+    WEATHER_CALLS_PER_MINUTE: int = 60
+    WEATHER_RATE_BURST: int = 5
+    WEATHER_MAX_CONCURRENCY: int = 10
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+    # Concurrent feed fan-out: overall request deadline and per-source budgets (seconds)
+    FANOUT_DEADLINE_SECONDS: float = 10.0
+    FEED_BUDGET_SECONDS: dict = {"mandi": 8.0, "enam": 8.0, "trade": 8.0, "weather": 8.0, "logistics": 5.0}
+
+    # Background ingestion: per-feed pull cadence (seconds); read endpoints serve the
+    # stored snapshot while it is younger than SNAPSHOT_MAX_AGE_FACTOR x the cadence
+    INGESTION_ENABLED: bool = True
+    INGESTION_INTERVAL_SECONDS: dict = {"mandi": 1800, "enam": 1800, "trade": 3600, "weather": 600, "logistics": 300}
+    INGESTION_JITTER_SECONDS: int = 30
+    # Only one process runs ingestion: the holder of a PostgreSQL advisory lock / SQLite lock file.
+    # The other workers retry every RETRY seconds and take over when the leader exits.
+    INGESTION_LEADER_LOCK: bool = True
+    INGESTION_LEADER_RETRY_SECONDS: int = 60
+    SNAPSHOT_MAX_AGE_FACTOR: float = 3.0
+
+    # Full mandi resource sync (replaces the 50-record mandi pull when enabled)
+    MANDI_BULK_SYNC_ENABLED: bool = True
+    MANDI_BULK_INTERVAL_SECONDS: int = 6 * 3600
+    MANDI_BULK_PAGE_SIZE: int = 1000
+    MANDI_BULK_CONCURRENCY: int = 8
+    MANDI_BULK_PAGE_RETRIES: int = 3
+    MANDI_STREAM_BATCH_SIZE: int = 500
+    SNAPSHOT_MAX_RECORDS: int = 1000
+    # Rows per bulk INSERT / COPY batch when writing Signal rows
+    SIGNAL_WRITE_BATCH_SIZE: int = 5000
+
+    # Signal retention: raw JSON kept for RAW days, then compacted into per-day aggregates
+    # (monthly archive tables on SQLite, monthly partitions on PostgreSQL); rows dropped after ROW days
+    SIGNAL_COMPACTION_ENABLED: bool = True
+    SIGNAL_COMPACTION_INTERVAL_SECONDS: int = 6 * 3600
+    SIGNAL_RAW_RETENTION_DAYS: int = 30
+    SIGNAL_ROW_RETENTION_DAYS: int = 365
+    # Risk model artifact written by `python -m ml.train`; loaded (checksum-verified) on first use.
+    # Without an artifact the model is trained in-process unless TRAIN_IF_MISSING is off.
+    RISK_MODEL_PATH: str = os.getenv("RISK_MODEL_PATH", "./ml/artifacts/risk_model.joblib")
+    RISK_MODEL_TRAIN_IF_MISSING: bool = True
+    # Max feature rows per POST /api/dashboard/risk-scores/batch request
+    RISK_BATCH_MAX_ROWS: int = 10000
+
+    # CPU-bound model / feature stages run off the event loop on a thread pool. With MAX_PENDING
+    # jobs queued or running it rejects new work with 503.
+    COMPUTE_EXECUTOR_ENABLED: bool = True
+    COMPUTE_THREAD_WORKERS: int = 4
+    COMPUTE_THREAD_MAX_PENDING: int = 32
+
+    # Columnar (NumPy memmap) monthly export of signal history for backtesting; outlives row retention
+    SIGNAL_ARCHIVE_ENABLED: bool = True
+    SIGNAL_ARCHIVE_DIR: str = os.getenv("SIGNAL_ARCHIVE_DIR", "./signal_archive")
+    SIGNAL_ARCHIVE_INTERVAL_SECONDS: int = 6 * 3600
+
+    # Delta ingestion: arrival_date high-water marks + content-hash de-duplication.
+    # Mandi is owned by the full-resource bulk sync (consistent published snapshots) while
+    # MANDI_BULK_SYNC_ENABLED is on; listing "mandi" here only takes effect with bulk sync off.
+    # eNAM is swept per commodity in enam_api.ENAM_COMMODITIES, each with its own arrival mark.
+    DELTA_INGESTION_ENABLED: bool = True
+    DELTA_INGESTION_SOURCES: list = ["enam"]
+    DELTA_MAX_LOOKBACK_DAYS: int = 7
+    DELTA_HASH_RETENTION_DAYS: int = 14
+
+    # Max concurrent per-commodity fetches in a batch (eNAM / trade / category mandi)
+    BATCH_FETCH_CONCURRENCY: int = 6
+
+    # Shared in-memory mandi repository backing the mandi, eNAM and trade feeds
+    MANDI_REPOSITORY_TTL_SECONDS: int = 1800
+    MANDI_REPOSITORY_MAX_RECORDS: int = 20000
+
+    # Per-source circuit breakers: open after N consecutive upstream failures, probe again after OPEN_SECONDS
+    CIRCUIT_BREAKER_ENABLED: bool = True
+    CIRCUIT_FAILURE_THRESHOLD: int = 3
+    CIRCUIT_OPEN_SECONDS: float = 30.0
+    CIRCUIT_HALF_OPEN_PROBES: int = 1
+
+    # Feed response cache: fresh TTL, then a stale-while-revalidate window (seconds)
+    FEED_CACHE_ENABLED: bool = True
+    FEED_CACHE_MAX_ENTRIES: int = 512
+    FEED_CACHE_TTL_SECONDS: dict = {"mandi": 1800, "enam": 1800, "trade": 1800, "weather": 600, "logistics": 300}
+    FEED_CACHE_STALE_SECONDS: dict = {"mandi": 86400, "enam": 86400, "trade": 86400, "weather": 1800, "logistics": 600}
 
     # CORS — set CORS_ORIGINS env var in production (comma-separated)
     CORS_ORIGINS: list = os.getenv(
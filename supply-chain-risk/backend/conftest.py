@@ -0,0 +1,12 @@
+"""
+Pytest setup for the backend: this directory goes on sys.path (the app
+imports `config`, `database`, `services.*` as top-level modules), and the
+app gets a throwaway SQLite database with background ingestion off.
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("INGESTION_ENABLED", "false")
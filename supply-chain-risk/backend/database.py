@@ -1,16 +1,203 @@
-from sqlalchemy import create_engine
+import asyncio
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+from sqlalchemy import Enum as SQLEnum, create_engine, event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from config import settings
 
+logger = logging.getLogger(__name__)
+
+IS_SQLITE = settings.DATABASE_URL.startswith("sqlite")
+# SQLite production profile: WAL + tuned pragmas on every connection, one writer thread
+SQLITE_PROFILE = IS_SQLITE and settings.SQLITE_PROFILE_ENABLED
+
 connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
+if IS_SQLITE:
     connect_args["check_same_thread"] = False
 
+# Sync engine: background ingestion/compaction threads and sync (threadpool) handlers.
+# With the SQLite profile it only reads; writes go through `run_write`.
 engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL with its driver swapped for the asyncio one (aiosqlite / asyncpg)."""
+    scheme, sep, rest = url.partition("://")
+    return _ASYNC_DRIVERS.get(scheme.split("+")[0], scheme) + sep + rest
+
+
+# Async engine for `async def` request handlers, so DB I/O never blocks the event loop
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=True,
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in (
+        "PRAGMA journal_mode=WAL",  # readers never block the writer (or each other)
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_BYTES}",
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        "PRAGMA temp_store=MEMORY",
+    ):
+        cursor.execute(pragma)
+    cursor.close()
+
+
+if SQLITE_PROFILE:
+    event.listen(engine, "connect", _sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas)
+
+
+WriteJob = Callable[[Session], Any]
+
+
+class SQLiteWriter:
+    """
+    The one thread that writes to the SQLite database. Jobs queued from any
+    thread or the event loop run here in order, up to SQLITE_WRITE_BATCH_JOBS
+    per transaction (each inside its own SAVEPOINT, so a failing job only
+    rolls back itself), on a single connection that takes the write lock
+    up front. Writers never contend for the lock and commits are amortized
+    across jobs. Jobs get a Session and must not commit it.
+    """
+
+    def __init__(self, max_batch: int):
+        self.max_batch = max_batch
+        self._engine = create_engine(settings.DATABASE_URL, connect_args=connect_args, pool_size=1, max_overflow=0)
+        event.listen(self._engine, "connect", self._on_connect)
+        event.listen(self._engine, "begin", lambda conn: conn.exec_driver_sql("BEGIN IMMEDIATE"))
+        self._sessions = sessionmaker(bind=self._engine, autoflush=False, expire_on_commit=False)
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {"jobs": 0, "failed_jobs": 0, "transactions": 0}
+
+    @staticmethod
+    def _on_connect(dbapi_connection, connection_record):
+        _sqlite_pragmas(dbapi_connection, connection_record)
+        # Let SQLAlchemy issue BEGIN/SAVEPOINT itself (pysqlite's implicit transactions break SAVEPOINT)
+        dbapi_connection.isolation_level = None
+
+    def submit(self, job: WriteJob) -> Future:
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("write jobs cannot queue further write jobs")
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                self._thread.start()
+        future: Future = Future()
+        self._queue.put((job, future))
+        return future
+
+    def stop(self):
+        """Finish the queued jobs and stop the thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while batch[-1] is not None and len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = batch[-1] is None
+            self._run_batch([item for item in batch if item is not None])
+            if stopping:
+                return
+
+    def _run_batch(self, batch):
+        if not batch:
+            return
+        done = []
+        db = self._sessions()
+        try:
+            for job, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    with db.begin_nested():
+                        done.append((future, job(db)))
+                except Exception as e:
+                    self.stats["failed_jobs"] += 1
+                    future.set_exception(e)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"SQLite writer transaction failed: {type(e).__name__}: {e}")
+            for future, _ in done:
+                future.set_exception(e)
+            return
+        finally:
+            db.close()
+        self.stats["transactions"] += 1
+        self.stats["jobs"] += len(done)
+        for future, result in done:
+            future.set_result(result)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+
+sqlite_writer = SQLiteWriter(settings.SQLITE_WRITE_BATCH_JOBS) if SQLITE_PROFILE else None
+_WriteSession = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+def run_write(job: WriteJob) -> Any:
+    """
+    Run `job(session)` as a committed write and return its result. Blocking.
+    With the SQLite profile it runs on the writer thread; otherwise in the
+    calling thread on a fresh session.
+    """
+    if sqlite_writer is not None:
+        return sqlite_writer.submit(job).result()
+    db = _WriteSession()
+    try:
+        result = job(db)
+        db.commit()
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def run_write_async(job: WriteJob) -> Any:
+    """
+    `run_write` for the event loop. With the SQLite profile it awaits the
+    writer thread; otherwise it runs on the async engine, with `job` given
+    the sync Session view of an AsyncSession (`run_sync`), so no worker
+    thread or sync-pool connection is tied up.
+    """
+    if sqlite_writer is not None:
+        return await asyncio.wrap_future(sqlite_writer.submit(job))
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            return await db.run_sync(job)
+
 
 def get_db():
     """Dependency that provides a database session."""
@@ -21,12 +208,56 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency that provides an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def close_async_db():
+    if sqlite_writer is not None:
+        await asyncio.to_thread(sqlite_writer.stop)
+    await async_engine.dispose()
+
+
 def init_db():
     """Create all database tables."""
     from models.user import User  # noqa
-    from models.signal import Signal  # noqa
-    from models.risk_score import RiskScore  # noqa
+    from models.signal import Signal, SignalDailyAggregate  # noqa
+    from models.risk_score import RiskScore, RiskScoreRollup  # noqa
     from models.recommendation import Recommendation  # noqa
     from models.subscription import Subscription  # noqa
     from models.category import Category  # noqa
+    from models.ingestion_state import IngestionWatermark, IngestionCursor, IngestionCommodityCursor, IngestedRecordHash  # noqa
     Base.metadata.create_all(bind=engine)
+    # create_all skips indexes of tables that already exist
+    for index in Signal.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    if engine.dialect.name == "postgresql":
+        _add_enum_values()
+
+
+def _add_enum_values():
+    """
+    Add enum members introduced since a native PostgreSQL enum type was
+    created (e.g. SupplyChainSegment.OVERALL); create_all never alters an
+    existing type. Runs in autocommit, since a value added inside a
+    transaction cannot be used until that transaction commits.
+    """
+    types = {}
+    for table in Base.metadata.tables.values():
+        for column in table.columns:
+            if isinstance(column.type, SQLEnum) and column.type.native_enum:
+                types[column.type.name] = column.type.enums
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        rows = conn.execute(
+            text("SELECT t.typname, e.enumlabel FROM pg_type t JOIN pg_enum e ON e.enumtypid = t.oid WHERE t.typname = ANY(:names)"),
+            {"names": list(types)},
+        ).all()
+        existing = {(name, label) for name, label in rows}
+        for name, labels in types.items():
+            for label in labels:
+                if (name, label) not in existing:
+                    conn.execute(text(f"ALTER TYPE {quote(name)} ADD VALUE IF NOT EXISTS '{label}'"))
+                    logger.info(f"Added value {label} to enum type {name}")
@@ -0,0 +1,71 @@
+"""
+Concurrent multi-commodity fetches.
+
+`fetch_commodity_batch` runs one feed fetcher per (commodity, state) pair
+concurrently, at most `concurrency` at a time, then merges the results,
+drops duplicate records and reports which pairs failed. Asking for six
+commodities costs roughly one round-trip instead of six.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence
+from config import settings
+from integrations.feed_cache import is_fallback
+
+logger = logging.getLogger(__name__)
+
+CommodityFetcher = Callable[..., Awaitable[List[Dict[str, Any]]]]
+
+
+async def fetch_commodity_batch(
+    fetcher: CommodityFetcher,
+    commodities: Iterable[str],
+    states: Optional[Iterable[str]] = None,
+    key_fields: Sequence[str] = ("commodity", "state"),
+    concurrency: Optional[int] = None,
+    **kwargs,
+) -> Dict[str, Any]:
+    """
+    Fetch every (commodity, state) pair with `fetcher(commodity=..., state=..., **kwargs)`.
+
+    Returns {"records": [...], "failed": {"<commodity>[/<state>]": error}, "requested": n}.
+    Records are merged in request order and de-duplicated on `key_fields`.
+    A pair fails if its fetcher raises or can only return static fallback
+    data; fallback records are returned only when every pair failed.
+    """
+    state_list = list(states) if states else [None]
+    pairs = [(c, s) for c in dict.fromkeys(commodities) for s in state_list]
+    semaphore = asyncio.Semaphore(concurrency or settings.BATCH_FETCH_CONCURRENCY)
+
+    async def _fetch(commodity: str, state: Optional[str]) -> List[Dict[str, Any]]:
+        async with semaphore:
+            if state:
+                return await fetcher(commodity=commodity, state=state, **kwargs)
+            return await fetcher(commodity=commodity, **kwargs)
+
+    results = await asyncio.gather(*(_fetch(c, s) for c, s in pairs), return_exceptions=True)
+
+    records: List[Dict[str, Any]] = []
+    fallback: List[Dict[str, Any]] = []
+    failed: Dict[str, str] = {}
+    seen = set()
+    for (commodity, state), result in zip(pairs, results):
+        label = f"{commodity}/{state}" if state else commodity
+        if isinstance(result, BaseException):
+            failed[label] = f"{type(result).__name__}: {result}"
+            continue
+        if is_fallback(result):
+            failed[label] = "no live data (fallback returned)"
+            fallback.extend(result)
+            continue
+        for record in result:
+            key = tuple(record.get(f) for f in key_fields)
+            if key not in seen:
+                seen.add(key)
+                records.append(record)
+
+    if failed:
+        logger.warning(f"Batch fetch: {len(failed)}/{len(pairs)} commodity fetches failed: {', '.join(failed)}")
+    if not records and fallback:
+        records = list({tuple(r.get(f) for f in key_fields): r for r in fallback}.values())
+    return {"records": records, "failed": failed, "requested": len(pairs)}
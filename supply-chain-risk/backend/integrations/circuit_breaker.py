@@ -0,0 +1,142 @@
+"""
+Per-source circuit breakers for upstream APIs.
+
+When data.gov.in or OpenWeatherMap is down, every fetch would otherwise
+wait out its full timeout before dropping to fallback data — and the next
+request would do the same. After `failure_threshold` consecutive failures a
+source's breaker opens and calls are rejected immediately with
+`CircuitOpenError`. Once `open_seconds` have passed it half-opens and lets
+a limited number of probe calls through: a successful probe closes it, a
+failed one opens it again.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+import httpx
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"circuit for '{name}' is open (retry in {retry_in:.1f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed → open after consecutive failures → half-open probes → closed."""
+
+    def __init__(self, name: str, failure_threshold: int, open_seconds: float, half_open_probes: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.rejected = 0
+        self.times_opened = 0
+        self.last_error: Optional[str] = None
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError. Every admitted call must report back."""
+        if not settings.CIRCUIT_BREAKER_ENABLED:
+            return
+        if self.state == OPEN:
+            remaining = self.open_seconds - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, remaining)
+            self.state = HALF_OPEN
+            self._probes_in_flight = 0
+            logger.info(f"Circuit '{self.name}' half-open — probing upstream")
+        if self.state == HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_probes:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, 0.0)
+            self._probes_in_flight += 1
+
+    @contextmanager
+    def call(self) -> Iterator[None]:
+        """Guard one upstream call: admit it, then record its outcome."""
+        self.before_call()
+        try:
+            yield
+        except BaseException as e:
+            if isinstance(e, Exception) and is_upstream_failure(e):
+                self.record_failure(e)
+            else:
+                self.release()
+            raise
+        else:
+            self.record_success()
+
+    def record_success(self):
+        if self.state == HALF_OPEN:
+            logger.info(f"Circuit '{self.name}' closed — upstream recovered")
+        self.state = CLOSED
+        self._consecutive_failures = 0
+        self._probes_in_flight = 0
+
+    def record_failure(self, error: BaseException):
+        self.last_error = f"{type(error).__name__}: {error}"
+        self._consecutive_failures += 1
+        if self.state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def release(self):
+        """An admitted call ended without an upstream verdict (e.g. cancelled, 4xx)."""
+        if self.state == HALF_OPEN and self._probes_in_flight > 0:
+            self._probes_in_flight -= 1
+
+    def _open(self):
+        if self.state != OPEN:
+            self.times_opened += 1
+            logger.warning(f"Circuit '{self.name}' opened for {self.open_seconds}s after {self._consecutive_failures} failures ({self.last_error})")
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._probes_in_flight = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "last_error": self.last_error,
+        }
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """Timeouts, connection errors and 5xx/429 count against the breaker; other 4xx do not."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return isinstance(error, (httpx.TransportError, ValueError))
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(source: str) -> CircuitBreaker:
+    breaker = _breakers.get(source)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            source,
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            open_seconds=settings.CIRCUIT_OPEN_SECONDS,
+            half_open_probes=settings.CIRCUIT_HALF_OPEN_PROBES,
+        )
+        _breakers[source] = breaker
+    return breaker
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    return {source: breaker.stats() for source, breaker in _breakers.items()}
@@ -2,26 +2,23 @@
 eNAM (National Agriculture Market) Integration
 
 NOTE: eNAM does NOT have a public REST API for commodity prices.
-This module uses data.gov.in's mandi price API with different
-commodity filters to provide a second agricultural data feed,
+This module projects the shared data.gov.in mandi repository with
+different commodity filters to provide a second agricultural data feed,
 simulating what eNAM market data would look like.
 
 The data is REAL — sourced from data.gov.in — but filtered for
 commodities typically traded on eNAM platform.
 """
-import httpx
 import logging
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-from config import settings
+import pandas as pd
+from integrations.batch_fetch import fetch_commodity_batch
+from integrations.feed_cache import cached_feed
+from integrations.mandi_repository import mandi_repository, MANDI_RESOURCE_ID
 
 logger = logging.getLogger(__name__)
 
-# Same data.gov.in mandi resource — we query specific eNAM-traded commodities
-MANDI_RESOURCE_ID = "9ef84268-d588-465a-a308-a864a43d0070"
-BASE_URL = "https://api.data.gov.in/resource"
-DEFAULT_API_KEY = "579b464db66ec23bdd000001cdd3946e44ce4aad7209ff7b23ac571b"
-
 # Commodities commonly traded on eNAM
 ENAM_COMMODITIES = [
     "Onion", "Tomato", "Potato", "Green Chilli", "Brinjal",
@@ -30,7 +27,11 @@ ENAM_COMMODITIES = [
     "Maize", "Paddy(Dhan)(Common)", "Jowar(Sorghum)", "Bajra(Pearl Millet)",
 ]
 
+# Identifies one eNAM price record when merging batch results
+ENAM_RECORD_KEY = ("commodity", "state", "apmc", "variety", "trade_date")
+
 
+@cached_feed("enam", resource=MANDI_RESOURCE_ID)
 async def fetch_enam_prices(
     commodity: Optional[str] = None,
     state: Optional[str] = None,
@@ -38,111 +39,70 @@ async def fetch_enam_prices(
 ) -> List[Dict[str, Any]]:
     """
     Fetch REAL mandi prices filtered for eNAM-commonly-traded commodities.
-    Uses data.gov.in API as the source.
+    Uses the shared data.gov.in mandi repository as the source.
     """
-    api_key = settings.GOV_DATA_API_KEY or DEFAULT_API_KEY
-
     # If a specific commodity is requested, use it; otherwise pick popular eNAM ones
     target_commodity = commodity
     if not target_commodity:
         # Fetch onion data by default (one of the most actively traded on eNAM)
         target_commodity = "Onion"
 
-    params = {
-        "api-key": api_key,
-        "format": "json",
-        "limit": limit,
-        "offset": 0,
-        "filters[commodity]": target_commodity,
-    }
-
-    if state:
-        params["filters[state]"] = state
-
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            url = f"{BASE_URL}/{MANDI_RESOURCE_ID}"
-            logger.info(f"Fetching eNAM-type data: commodity={target_commodity}, state={state}")
-
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-
-            data = response.json()
+        logger.info(f"Fetching eNAM-type data: commodity={target_commodity}, state={state}")
 
-            if data.get("status") != "ok":
-                logger.warning(f"eNAM data fetch returned non-ok: {data.get('message')}")
-                return _get_fallback_enam_data()
+        frame = await mandi_repository.query_frame(commodity=target_commodity, state=state, limit=limit)
+        logger.info(f"eNAM data: {len(frame)} records for '{target_commodity}'")
 
-            records = data.get("records", [])
-            logger.info(f"eNAM data: Received {len(records)} records for '{target_commodity}'")
+        if frame.empty:
+            return _get_fallback_enam_data()
 
-            if not records:
-                return _get_fallback_enam_data()
-
-            return _normalize_enam_data(records)
+        return normalize_enam_frame(frame)
 
     except Exception as e:
         logger.error(f"eNAM data fetch error: {type(e).__name__}: {str(e)}")
         return _get_fallback_enam_data()
 
 
+async def fetch_enam_batch(
+    commodities: Optional[List[str]] = None,
+    states: Optional[List[str]] = None,
+    limit_per: int = 10,
+) -> Dict[str, Any]:
+    """
+    Fetch several eNAM commodities (default: all ENAM_COMMODITIES) concurrently.
+    Returns {"records", "failed", "requested"} — see fetch_commodity_batch.
+    """
+    return await fetch_commodity_batch(
+        fetch_enam_prices, commodities or ENAM_COMMODITIES, states,
+        key_fields=ENAM_RECORD_KEY, limit=limit_per,
+    )
+
+
 async def fetch_multiple_enam_commodities(limit_per: int = 10) -> List[Dict[str, Any]]:
     """Fetch prices for multiple eNAM commodities in parallel."""
-    all_data = []
-    commodities_to_fetch = ["Onion", "Tomato", "Potato", "Green Chilli", "Banana"]
-
-    for commodity in commodities_to_fetch:
-        try:
-            data = await fetch_enam_prices(commodity=commodity, limit=limit_per)
-            all_data.extend(data)
-        except Exception as e:
-            logger.warning(f"Failed to fetch {commodity}: {e}")
-
-    return all_data if all_data else _get_fallback_enam_data()
-
-
-def _normalize_enam_data(records: List[Dict]) -> List[Dict[str, Any]]:
-    """Normalize data from the API to our eNAM format."""
-    normalized = []
-    for r in records:
-        try:
-            state = r.get("state", "Unknown")
-            market = r.get("market", "Unknown")
-            modal_price = _safe_float(r.get("modal_price", 0))
-            min_price = _safe_float(r.get("min_price", 0))
-            max_price = _safe_float(r.get("max_price", 0))
-
-            # Estimate traded quantity from price spread (bigger spread = more activity)
-            price_range = max_price - min_price
-            estimated_qty = round(max(50, min(1000, price_range * 0.5)), 0)
-
-            normalized.append({
-                "source": "enam",
-                "data_type": "live",
-                "state": state,
-                "apmc": market,
-                "commodity": r.get("commodity", "Unknown"),
-                "variety": r.get("variety", ""),
-                "min_price": min_price,
-                "max_price": max_price,
-                "modal_price": modal_price,
-                "quantity_traded": estimated_qty,
-                "trade_date": r.get("arrival_date", ""),
-                "timestamp": datetime.utcnow().isoformat(),
-            })
-        except Exception as e:
-            logger.warning(f"Skipping malformed eNAM record: {e}")
-            continue
-    return normalized
-
-
-def _safe_float(val) -> float:
-    if val is None:
-        return 0.0
-    try:
-        return float(val)
-    except (TypeError, ValueError):
-        return 0.0
+    batch = await fetch_enam_batch(["Onion", "Tomato", "Potato", "Green Chilli", "Banana"], limit_per=limit_per)
+    return batch["records"] or _get_fallback_enam_data()
+
+
+def normalize_enam_frame(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Project a normalized mandi frame onto our eNAM format, column-wise."""
+    # Estimate traded quantity from price spread (bigger spread = more activity)
+    price_range = frame["max_price"] - frame["min_price"]
+    enam = pd.DataFrame({
+        "source": "enam",
+        "data_type": "live",
+        "state": frame["state"].astype(object),
+        "apmc": frame["market"].astype(object),
+        "commodity": frame["commodity"].astype(object),
+        "variety": frame["variety"],
+        "min_price": frame["min_price"],
+        "max_price": frame["max_price"],
+        "modal_price": frame["modal_price"],
+        "quantity_traded": (price_range * 0.5).clip(50, 1000).round(0),
+        "trade_date": frame["arrival_date"],
+        "timestamp": datetime.utcnow().isoformat(),
+    }, index=frame.index)
+    return enam.to_dict("records")
 
 
 def _get_fallback_enam_data() -> List[Dict[str, Any]]:
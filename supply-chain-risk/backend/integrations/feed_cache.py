@@ -0,0 +1,213 @@
+"""
+In-process TTL cache for feed responses.
+
+The mandi resource changes daily and OpenWeatherMap current weather every
+~10 minutes, so re-downloading them on every request is wasted work.
+`cached_feed` wraps a `fetch_*` coroutine transparently: results are keyed
+by (source, resource id, call arguments), kept for a per-source TTL in a
+bounded LRU, and served stale-while-revalidate — once data is warm a
+request never waits on a refresh. Concurrent misses for the same key share
+one load through a single-flight group.
+
+The last successful result per key is also kept beyond cache expiry: when a
+fetcher can only produce static fallback data (upstream down, circuit open)
+that last-known-good result is served instead, tagged with its age.
+
+Callers always get their own copies of the records, so annotating a
+returned record never changes what the cache serves next.
+"""
+import asyncio
+import copy
+import functools
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from config import settings
+from integrations.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class FeedCache:
+    """Bounded LRU of (value, fetched_at, ttl, stale_ttl) entries with hit/miss counters."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, float, float]]" = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Tuple[Optional[Any], str]:
+        """Return (value, state) where state is 'fresh', 'stale' or 'miss'."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, "miss"
+        value, fetched_at, ttl, stale_ttl = entry
+        age = time.monotonic() - fetched_at
+        if age > ttl + stale_ttl:
+            del self._entries[key]
+            self.misses += 1
+            return None, "miss"
+        self._entries.move_to_end(key)
+        if age > ttl:
+            self.stale_hits += 1
+            return value, "stale"
+        self.hits += 1
+        return value, "fresh"
+
+    def set(self, key: Hashable, value: Any, ttl: float, stale_ttl: float):
+        self._entries[key] = (value, time.monotonic(), ttl, stale_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+class LastKnownGood:
+    """Most recent non-fallback result per key, kept (bounded, LRU) for upstream outages."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[List[Dict[str, Any]], datetime]]" = OrderedDict()
+        self.served = 0
+
+    def remember(self, key: Hashable, records: List[Dict[str, Any]]):
+        self._entries[key] = (records, datetime.utcnow())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def recall(self, key: Hashable) -> Optional[List[Dict[str, Any]]]:
+        """Copies of the remembered records, tagged with the snapshot's age."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        records, fetched_at = entry
+        age = round((datetime.utcnow() - fetched_at).total_seconds(), 1)
+        self.served += 1
+        return [
+            {**r, "data_type": "last_known_good", "snapshot_at": fetched_at.isoformat(), "snapshot_age_seconds": age}
+            for r in records
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "served": self.served}
+
+
+feed_cache = FeedCache(settings.FEED_CACHE_MAX_ENTRIES)
+last_known_good = LastKnownGood(settings.FEED_CACHE_MAX_ENTRIES)
+cache_flight = SingleFlight("feed_cache")
+_refreshing: Dict[Hashable, asyncio.Task] = {}
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def _copy_result(value: Any) -> Any:
+    """Copy of a feed result: new record dicts, with nested containers deep-copied."""
+    if not isinstance(value, list):
+        return value
+    return [
+        {k: copy.deepcopy(v) if isinstance(v, (dict, list)) else v for k, v in r.items()} if isinstance(r, dict) else copy.deepcopy(r)
+        for r in value
+    ]
+
+
+def is_fallback(result: Any) -> bool:
+    """True for a non-empty list made only of static fallback records.
+
+    Such results are never cached, batched or stored, so the next run retries upstream.
+    """
+    return isinstance(result, list) and bool(result) and all(
+        isinstance(r, dict) and r.get("data_type") == "fallback" for r in result
+    )
+
+
+def cached_feed(source: str, resource: str = ""):
+    """Decorator that serves a feed fetcher through the shared TTL cache."""
+
+    def decorator(func: Callable):
+        signature = inspect.signature(func)
+
+        async def _load(key: Hashable, args, kwargs):
+            async def _fetch_and_store():
+                result = await func(*args, **kwargs)
+                if not is_fallback(result):
+                    last_known_good.remember(key, result)
+                    feed_cache.set(
+                        key, result,
+                        ttl=settings.FEED_CACHE_TTL_SECONDS.get(source, 300),
+                        stale_ttl=settings.FEED_CACHE_STALE_SECONDS.get(source, 0),
+                    )
+                return result
+
+            return await cache_flight.do(key, _fetch_and_store)
+
+        def _refresh_in_background(key: Hashable, args, kwargs):
+            if key in _refreshing:
+                return
+
+            async def _refresh():
+                try:
+                    await _load(key, args, kwargs)
+                except Exception as e:
+                    logger.warning(f"Background refresh of {source} cache failed: {type(e).__name__}: {e}")
+                finally:
+                    _refreshing.pop(key, None)
+
+            _refreshing[key] = asyncio.create_task(_refresh())
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (source, resource, _freeze(bound.arguments))
+
+            if not settings.FEED_CACHE_ENABLED:
+                value = await func(*args, **kwargs)
+                if not is_fallback(value):
+                    last_known_good.remember(key, value)
+            else:
+                value, state = feed_cache.get(key)
+                if state == "stale":
+                    _refresh_in_background(key, args, kwargs)
+                if state == "miss":
+                    value = await _load(key, args, kwargs)
+
+            if is_fallback(value):
+                recalled = last_known_good.recall(key)
+                if recalled:
+                    logger.info(f"Serving last-known-good {source} data instead of static fallback")
+                    return _copy_result(recalled)
+            return _copy_result(value)
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
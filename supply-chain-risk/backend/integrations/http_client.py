@@ -0,0 +1,133 @@
+"""
+Shared HTTP clients for all upstream integrations.
+
+One connection-pooled httpx.AsyncClient is kept per upstream host so that
+repeated dashboard requests reuse keep-alive (and HTTP/2, when the `h2`
+package is installed) connections instead of paying a fresh TCP+TLS
+handshake on every fetch. Clients are created in the FastAPI startup hook
+and closed on shutdown; timeouts are applied per source on each request.
+Identical concurrent GETs are coalesced through a single-flight group, and
+every upstream call goes through its source's circuit breaker.
+"""
+import httpx
+import importlib.util
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+from config import settings
+from integrations.circuit_breaker import get_breaker
+from integrations.json_stream import RecordStreamParser
+from integrations.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Which pooled client (upstream host) each source talks to.
+# mandi, eNAM and trade all read from api.data.gov.in and share one pool.
+SOURCE_HOSTS = {
+    "mandi": "data_gov",
+    "enam": "data_gov",
+    "trade": "data_gov",
+    "weather": "openweathermap",
+    "logistics": "logistics",
+}
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+upstream_flight = SingleFlight("upstream")
+
+
+def _http2_available() -> bool:
+    return settings.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+
+def _build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(limits=limits, http2=_http2_available(), timeout=30.0)
+
+
+def get_client(source: str) -> httpx.AsyncClient:
+    """
+    Return the pooled client for a source's upstream host.
+    Clients are normally created at startup; one is built lazily if a
+    fetcher runs outside the app (scripts, shell).
+    """
+    host = SOURCE_HOSTS.get(source, source)
+    client = _clients.get(host)
+    if client is None or client.is_closed:
+        client = _build_client()
+        _clients[host] = client
+    return client
+
+
+def get_timeout(source: str) -> httpx.Timeout:
+    """Per-source request timeout (connect is capped so a dead host fails fast)."""
+    timeouts = {
+        "mandi": settings.MANDI_TIMEOUT,
+        "enam": settings.ENAM_TIMEOUT,
+        "trade": settings.TRADE_TIMEOUT,
+        "weather": settings.WEATHER_TIMEOUT,
+        "logistics": settings.LOGISTICS_TIMEOUT,
+    }
+    total = timeouts.get(source, 30.0)
+    return httpx.Timeout(total, connect=min(total, settings.HTTP_CONNECT_TIMEOUT))
+
+
+async def get_json(source: str, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    GET a JSON document through the source's pooled client.
+    Concurrent callers asking for the same (url, params) share one request;
+    HTTP errors propagate to every waiter as httpx exceptions; while the
+    source's circuit is open, CircuitOpenError is raised without a request.
+    """
+    params = params or {}
+    key = (url, tuple(sorted((k, str(v)) for k, v in params.items())))
+
+    async def _request():
+        with get_breaker(source).call():
+            response = await get_client(source).get(url, params=params, timeout=get_timeout(source))
+            response.raise_for_status()
+            return response.json()
+
+    return await upstream_flight.do(key, _request)
+
+
+async def stream_json_records(
+    source: str,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    header: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    GET a data.gov.in style document and yield its `records` incrementally,
+    one list per received chunk. Top-level fields (status, total, ...) are
+    written into `header`. Streams are not coalesced.
+    """
+    parser = RecordStreamParser()
+    with get_breaker(source).call():
+        async with get_client(source).stream("GET", url, params=params or {}, timeout=get_timeout(source)) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                records = parser.feed(chunk)
+                if records:
+                    yield records
+        parser.close()
+    if header is not None:
+        header.update(parser.header)
+
+
+async def init_http_clients():
+    """Create one pooled client per upstream host (called on app startup)."""
+    for host in set(SOURCE_HOSTS.values()):
+        if host not in _clients or _clients[host].is_closed:
+            _clients[host] = _build_client()
+    logger.info(f"HTTP clients ready for {len(_clients)} upstream hosts (http2={_http2_available()})")
+
+
+async def close_http_clients():
+    """Close all pooled clients (called on app shutdown)."""
+    for client in _clients.values():
+        if not client.is_closed:
+            await client.aclose()
+    _clients.clear()
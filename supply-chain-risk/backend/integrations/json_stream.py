@@ -0,0 +1,119 @@
+"""
+Incremental parser for data.gov.in style JSON documents.
+
+data.gov.in responses look like {"status": "ok", "total": N, ..., "records": [{...}, ...]}.
+`RecordStreamParser` is fed raw bytes as they arrive and hands back each
+record of the array as soon as it is complete, so a page of thousands of
+records never has to be held as one response body plus one decoded list.
+Top-level fields before (and after) the array are collected in `header`.
+Standard library only — records are decoded one at a time with
+`json.JSONDecoder.raw_decode`.
+"""
+import codecs
+import json
+from typing import Any, Dict, List
+
+_WHITESPACE = " \t\r\n"
+
+
+class RecordStreamParser:
+    """Feed bytes in, get completed records of the top-level `array_key` array out."""
+
+    def __init__(self, array_key: str = "records"):
+        self.array_key = array_key
+        self.header: Dict[str, Any] = {}
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._state = "header"
+        # Header scanner state (character position, nesting depth, string tracking)
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = -1
+        self._last_string = None
+        self._last_string_start = -1
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        self._buffer += self._utf8.decode(chunk)
+        if self._state == "header":
+            self._scan_header()
+        if self._state == "array":
+            return self._drain_records()
+        return []
+
+    def close(self) -> Dict[str, Any]:
+        """Finish the document; parses any top-level fields that followed the array."""
+        self._buffer += self._utf8.decode(b"", final=True)
+        if self._state == "header" and self._buffer.strip():
+            # No records array at all — the whole body is the header
+            self.header.update(json.loads(self._buffer))
+        elif self._state == "array":
+            raise ValueError(f"JSON document ended inside the '{self.array_key}' array")
+        elif self._state == "trailer":
+            trailer = self._buffer.strip().lstrip(",").strip()
+            if trailer and trailer != "}":
+                self.header.update(json.loads("{" + trailer))
+        self._buffer = ""
+        return self.header
+
+    def _scan_header(self):
+        buf = self._buffer
+        while self._pos < len(buf):
+            ch = buf[self._pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._last_string = buf[self._string_start + 1:self._pos]
+                    self._last_string_start = self._string_start
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif ch in "{[":
+                if ch == "[" and self._depth == 1 and self._is_array_key(buf):
+                    self._start_array(buf)
+                    return
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+            self._pos += 1
+
+    def _is_array_key(self, buf: str) -> bool:
+        """True when the '[' at _pos directly follows `"<array_key>":` at depth 1."""
+        if self._last_string != self.array_key:
+            return False
+        between = buf[self._last_string_start + len(self.array_key) + 2:self._pos]
+        return between.strip(_WHITESPACE) == ":"
+
+    def _start_array(self, buf: str):
+        head = buf[:self._last_string_start].rstrip(_WHITESPACE).rstrip(",")
+        if head.strip() and head.strip() != "{":
+            self.header.update(json.loads(head + "}"))
+        self._buffer = buf[self._pos + 1:]
+        self._state = "array"
+
+    def _drain_records(self) -> List[Dict[str, Any]]:
+        records = []
+        buf, idx, end = self._buffer, 0, len(self._buffer)
+        while True:
+            while idx < end and (buf[idx] in _WHITESPACE or buf[idx] == ","):
+                idx += 1
+            if idx >= end:
+                break
+            if buf[idx] == "]":
+                self._state = "trailer"
+                idx += 1
+                break
+            try:
+                record, idx = self._decoder.raw_decode(buf, idx)
+            except json.JSONDecodeError:
+                # Record is not complete yet — wait for more bytes
+                break
+            records.append(record)
+        self._buffer = buf[idx:]
+        return records
@@ -11,14 +11,19 @@ This module generates REALISTIC logistics simulation based on:
 
 The data is clearly marked as "simulated" so the frontend knows.
 When a LOGISTICS_API_URL is configured, real data is fetched instead.
+Set LOGISTICS_CORRIDORS_FILE (CSV or JSON) to simulate a larger corridor
+network than the built-in list.
 """
-import httpx
 import logging
-import random
-import math
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List, Dict, Any, Optional
+import numpy as np
+import pandas as pd
 from config import settings
+from integrations.http_client import get_json
+from integrations.feed_cache import cached_feed
+from integrations.replay import sim_np_rng
+from integrations.logistics_sim import corridor_table, load_corridor_file, select_corridors, simulate_corridors, simulation_records
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +42,7 @@ LOGISTICS_CORRIDORS = [
 ]
 
 
+@cached_feed("logistics", resource="corridors")
 async def fetch_logistics_data(
     corridor_id: Optional[str] = None,
     mode: Optional[str] = None
@@ -57,119 +63,41 @@ async def fetch_logistics_data(
 
 async def _fetch_from_api(corridor_id: Optional[str], mode: Optional[str]) -> List[Dict[str, Any]]:
     """Fetch from real logistics API when configured."""
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        params = {}
-        if corridor_id:
-            params["corridor_id"] = corridor_id
-        if mode:
-            params["mode"] = mode
-        response = await client.get(settings.LOGISTICS_API_URL, params=params)
-        response.raise_for_status()
-        data = response.json()
-        results = data.get("corridors", data if isinstance(data, list) else [])
-        for r in results:
-            r["source"] = "logistics"
-            r["data_type"] = "live"
-        return results
-
-
-def _generate_corridor_data(corridor_id: Optional[str], mode: Optional[str]) -> List[Dict[str, Any]]:
-    """
-    Generate realistic logistics simulation based on real-world patterns.
-    """
-    corridors = LOGISTICS_CORRIDORS
+    params = {}
     if corridor_id:
-        corridors = [c for c in corridors if c["id"] == corridor_id]
+        params["corridor_id"] = corridor_id
     if mode:
-        corridors = [c for c in corridors if c["mode"] == mode]
+        params["mode"] = mode
+    data = await get_json("logistics", settings.LOGISTICS_API_URL, params)
+    results = data if isinstance(data, list) else data.get("corridors", [])
+    # The decoded body may be shared with coalesced callers, so tag copies
+    return [{**r, "source": "logistics", "data_type": "live"} for r in results]
 
-    now = datetime.utcnow()
-    hour_ist = (now.hour + 5) % 24  # Convert to IST
-    day_of_week = now.weekday()  # 0=Monday, 6=Sunday
-    month = now.month
-
-    results = []
-    for corridor in corridors:
-        # Base delay factor by mode (rail is more predictable, road varies more)
-        mode_base = {"road": 1.5, "rail": 0.7, "sea": 0.5, "air": 0.3}
-        base_delay = random.uniform(0.5, 2.5) * mode_base.get(corridor["mode"], 1.0)
-
-        # Time-of-day pattern: peak hours have more congestion (IST)
-        if 8 <= hour_ist <= 11 or 17 <= hour_ist <= 20:
-            time_factor = 1.6  # Peak hours
-        elif 22 <= hour_ist or hour_ist <= 5:
-            time_factor = 0.6  # Night — less traffic
-        else:
-            time_factor = 1.0
-
-        # Day-of-week: weekends lighter for road, ports busy on weekdays
-        if day_of_week >= 5:  # Weekend
-            if corridor["mode"] == "road":
-                time_factor *= 0.7
-            elif corridor["mode"] == "sea":
-                time_factor *= 0.9
-
-        # Seasonal: monsoon increases road delays significantly
-        monsoon_factor = 1.0
-        if 6 <= month <= 9:  # June–September monsoon
-            if corridor["mode"] == "road":
-                monsoon_factor = 1.8
-            elif corridor["mode"] == "sea":
-                monsoon_factor = 1.3
-        elif month in [10, 11]:  # Festival season — higher cargo volume
-            monsoon_factor = 1.3
-
-        delay_hours = base_delay * time_factor * monsoon_factor
-
-        # Congestion level (0.0 – 1.0)
-        congestion = min(delay_hours / 5.0, 1.0)
-
-        # Disruption probability based on conditions
-        base_disruption = random.uniform(0.05, 0.20)
-        if congestion > 0.6:
-            base_disruption += 0.15
-        if 6 <= month <= 9 and corridor["mode"] == "road":
-            base_disruption += 0.10
-
-        # Capacity utilization varies by time
-        if 8 <= hour_ist <= 20:
-            capacity = random.uniform(0.65, 0.95)
-        else:
-            capacity = random.uniform(0.30, 0.70)
 
-        # Active shipments proportional to capacity
-        active = int(capacity * random.randint(100, 600))
+_corridors: Optional[pd.DataFrame] = None
+
 
-        # Status determination
-        if congestion > 0.6:
-            status = "congested"
-        elif congestion > 0.3:
-            status = "moderate"
+def get_corridor_table() -> pd.DataFrame:
+    """Corridor definitions — from LOGISTICS_CORRIDORS_FILE when set, else the built-in list. Loaded once."""
+    global _corridors
+    if _corridors is None:
+        if settings.LOGISTICS_CORRIDORS_FILE:
+            _corridors = load_corridor_file(settings.LOGISTICS_CORRIDORS_FILE)
+            logger.info(f"Loaded {len(_corridors)} logistics corridors from {settings.LOGISTICS_CORRIDORS_FILE}")
         else:
-            status = "normal"
-
-        results.append({
-            "source": "logistics",
-            "data_type": "simulated",
-            "corridor_id": corridor["id"],
-            "corridor_name": corridor["name"],
-            "origin": corridor["origin"],
-            "destination": corridor["destination"],
-            "mode": corridor["mode"],
-            "distance_km": corridor["distance_km"],
-            "avg_transit_hours": corridor["avg_transit_hours"],
-            "current_delay_hours": round(delay_hours, 2),
-            "avg_delay_hours": round(delay_hours * 0.75, 2),
-            "congestion_level": round(congestion, 3),
-            "disruption_probability": round(min(base_disruption, 1.0), 3),
-            "capacity_utilization": round(capacity, 3),
-            "active_shipments": active,
-            "status": status,
-            "monsoon_impact": 6 <= month <= 9,
-            "peak_hour": 8 <= hour_ist <= 11 or 17 <= hour_ist <= 20,
-            "last_incident": (now - timedelta(hours=random.randint(2, 96))).isoformat(),
-            "timestamp": now.isoformat(),
-        })
+            _corridors = corridor_table(LOGISTICS_CORRIDORS)
+    return _corridors
+
+
+def _generate_corridor_data(corridor_id: Optional[str], mode: Optional[str], rng: Optional[np.random.Generator] = None) -> List[Dict[str, Any]]:
+    """
+    Generate realistic logistics simulation based on real-world patterns,
+    for all selected corridors in one vectorized pass.
+    """
+    corridors = select_corridors(get_corridor_table(), corridor_id, mode)
+    now = datetime.utcnow()
+    frame = simulate_corridors(corridors, now, rng if rng is not None else sim_np_rng("logistics", corridor_id, mode))
+    results = simulation_records(frame, now)
 
     logger.info(f"Logistics data: {len(results)} corridors (status: {', '.join(r['corridor_id'] + '=' + r['status'] for r in results[:5])})")
     return results
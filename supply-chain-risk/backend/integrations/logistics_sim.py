@@ -0,0 +1,126 @@
+"""
+Vectorized logistics corridor simulator.
+
+Computes delay, congestion, disruption probability, capacity utilisation
+and status for every corridor in one NumPy pass, so networks of thousands
+of corridors (district-to-hub road links, rail, ports) simulate in a few
+milliseconds. The patterns are the same as before: mode-specific base
+delay, IST peak/night hours, weekend relief, monsoon and festival season.
+Randomness comes from a caller-supplied `numpy.random.Generator`, so a
+seeded generator reproduces a run exactly.
+
+Corridor definitions are a table with columns
+id, name, origin, destination, mode, distance_km, avg_transit_hours
+(coordinates optional), loaded from a CSV or JSON file or from a list of dicts.
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+CORRIDOR_COLUMNS = ["id", "name", "origin", "destination", "mode", "distance_km", "avg_transit_hours"]
+
+# Base delay factor by mode (rail is more predictable, road varies more)
+MODE_BASE_DELAY = {"road": 1.5, "rail": 0.7, "sea": 0.5, "air": 0.3}
+
+
+def corridor_table(corridors: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Columnar corridor table from a list of corridor dicts."""
+    table = pd.DataFrame.from_records(corridors)
+    missing = [c for c in CORRIDOR_COLUMNS if c not in table]
+    if missing:
+        raise ValueError(f"corridor definitions missing columns: {', '.join(missing)}")
+    table["mode"] = table["mode"].astype(str).str.lower()
+    table["distance_km"] = pd.to_numeric(table["distance_km"], errors="coerce").fillna(0)
+    table["avg_transit_hours"] = pd.to_numeric(table["avg_transit_hours"], errors="coerce").fillna(0)
+    return table.reset_index(drop=True)
+
+
+def load_corridor_file(path: str) -> pd.DataFrame:
+    """Load corridor definitions from a .csv file or a .json list of objects."""
+    file = Path(path)
+    if file.suffix.lower() == ".csv":
+        return corridor_table(pd.read_csv(file).to_dict("records"))
+    with file.open(encoding="utf-8") as f:
+        data = json.load(f)
+    return corridor_table(data["corridors"] if isinstance(data, dict) else data)
+
+
+def simulate_corridors(table: pd.DataFrame, now: datetime, rng: np.random.Generator) -> pd.DataFrame:
+    """Simulate current conditions for every corridor in `table` in one pass."""
+    n = len(table)
+    mode = table["mode"].to_numpy()
+    road, sea = mode == "road", mode == "sea"
+    hour_ist = (now.hour + 5) % 24  # Convert to IST
+    month = now.month
+    peak_hour = 8 <= hour_ist <= 11 or 17 <= hour_ist <= 20
+    monsoon = 6 <= month <= 9  # June–September monsoon
+
+    base_delay = rng.uniform(0.5, 2.5, n) * table["mode"].map(MODE_BASE_DELAY).fillna(1.0).to_numpy()
+
+    # Time-of-day pattern: peak hours have more congestion (IST), nights are lighter
+    time_factor = np.full(n, 1.6 if peak_hour else 0.6 if (hour_ist >= 22 or hour_ist <= 5) else 1.0)
+    # Day-of-week: weekends lighter for road, ports slightly quieter
+    if now.weekday() >= 5:
+        time_factor *= np.where(road, 0.7, np.where(sea, 0.9, 1.0))
+
+    # Seasonal: monsoon slows road and sea; festival season raises cargo volume everywhere
+    if monsoon:
+        season_factor = np.where(road, 1.8, np.where(sea, 1.3, 1.0))
+    else:
+        season_factor = np.full(n, 1.3 if month in (10, 11) else 1.0)
+
+    delay_hours = base_delay * time_factor * season_factor
+    congestion = np.minimum(delay_hours / 5.0, 1.0)
+
+    disruption = rng.uniform(0.05, 0.20, n) + 0.15 * (congestion > 0.6)
+    if monsoon:
+        disruption += 0.10 * road
+
+    capacity = rng.uniform(0.65, 0.95, n) if 8 <= hour_ist <= 20 else rng.uniform(0.30, 0.70, n)
+    # Active shipments proportional to capacity
+    active = (capacity * rng.integers(100, 601, n)).astype(np.int64)
+    status = np.select([congestion > 0.6, congestion > 0.3], ["congested", "moderate"], default="normal")
+    incident_hours_ago = rng.integers(2, 97, n)
+
+    return pd.DataFrame({
+        "corridor_id": table["id"].to_numpy(),
+        "corridor_name": table["name"].to_numpy(),
+        "origin": table["origin"].to_numpy(),
+        "destination": table["destination"].to_numpy(),
+        "mode": mode,
+        "distance_km": table["distance_km"].to_numpy(),
+        "avg_transit_hours": table["avg_transit_hours"].to_numpy(),
+        "current_delay_hours": np.round(delay_hours, 2),
+        "avg_delay_hours": np.round(delay_hours * 0.75, 2),
+        "congestion_level": np.round(congestion, 3),
+        "disruption_probability": np.round(np.minimum(disruption, 1.0), 3),
+        "capacity_utilization": np.round(capacity, 3),
+        "active_shipments": active,
+        "status": status,
+        "monsoon_impact": monsoon,
+        "peak_hour": peak_hour,
+        "last_incident": np.datetime64(now, "us") - incident_hours_ago.astype("timedelta64[h]"),
+    })
+
+
+def simulation_records(frame: pd.DataFrame, now: datetime) -> List[Dict[str, Any]]:
+    """Dict-list view of a simulation frame in the logistics feed record format."""
+    view = frame.assign(
+        last_incident=frame["last_incident"].dt.strftime("%Y-%m-%dT%H:%M:%S.%f"),
+        timestamp=now.isoformat(),
+    )
+    return [
+        {"source": "logistics", "data_type": "simulated", **record}
+        for record in view.to_dict("records")
+    ]
+
+
+def select_corridors(table: pd.DataFrame, corridor_id: Optional[str] = None, mode: Optional[str] = None) -> pd.DataFrame:
+    if corridor_id:
+        table = table[table["id"] == corridor_id]
+    if mode:
+        table = table[table["mode"] == mode.lower()]
+    return table
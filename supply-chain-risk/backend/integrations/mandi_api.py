@@ -10,19 +10,17 @@ import httpx
 import logging
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-from config import settings
+from integrations.batch_fetch import fetch_commodity_batch
+from integrations.feed_cache import cached_feed
+from integrations.mandi_repository import mandi_repository, MANDI_RESOURCE_ID
 
 logger = logging.getLogger(__name__)
 
-# Real, verified resource ID for "Current Daily Price of Various Commodities"
-# Ministry of Agriculture — updated daily with 16,000+ records
-MANDI_RESOURCE_ID = "9ef84268-d588-465a-a308-a864a43d0070"
-BASE_URL = "https://api.data.gov.in/resource"
-
-# Public demo key — works for moderate traffic; replace with your own for production
-DEFAULT_API_KEY = "579b464db66ec23bdd000001cdd3946e44ce4aad7209ff7b23ac571b"
+# Identifies one mandi price record when merging batch results
+MANDI_RECORD_KEY = ("commodity", "state", "market", "variety", "arrival_date")
 
 
+@cached_feed("mandi", resource=MANDI_RESOURCE_ID)
 async def fetch_mandi_prices(
     commodity: Optional[str] = None,
     state: Optional[str] = None,
@@ -30,46 +28,19 @@ async def fetch_mandi_prices(
 ) -> List[Dict[str, Any]]:
     """
     Fetch REAL daily mandi commodity prices from data.gov.in.
+    Served from the shared mandi repository (one upstream sweep per refresh).
     Falls back to cached data ONLY if the API is genuinely unreachable.
     """
-    api_key = settings.GOV_DATA_API_KEY or DEFAULT_API_KEY
-
-    params = {
-        "api-key": api_key,
-        "format": "json",
-        "limit": limit,
-        "offset": 0,
-    }
-
-    # Add filters if provided
-    if commodity:
-        params["filters[commodity]"] = commodity
-    if state:
-        params["filters[state]"] = state
-
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            url = f"{BASE_URL}/{MANDI_RESOURCE_ID}"
-            logger.info(f"Fetching Mandi data: {url} with filters: commodity={commodity}, state={state}")
-
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-
-            data = response.json()
-
-            if data.get("status") != "ok":
-                logger.warning(f"Mandi API returned non-ok status: {data.get('message')}")
-                return _get_fallback_mandi_data()
+        logger.info(f"Fetching Mandi data with filters: commodity={commodity}, state={state}")
+        records = await mandi_repository.query(commodity=commodity, state=state, limit=limit)
+        logger.info(f"Mandi data: {len(records)} records out of {mandi_repository.upstream_total} total")
 
-            records = data.get("records", [])
-            total = data.get("total", 0)
-            logger.info(f"Mandi API: Received {len(records)} records out of {total} total")
+        if not records:
+            logger.warning("Mandi data has 0 matching records")
+            return _get_fallback_mandi_data()
 
-            if not records:
-                logger.warning("Mandi API returned 0 records")
-                return _get_fallback_mandi_data()
-
-            return _normalize_mandi_data(records)
+        return records
 
     except httpx.TimeoutException:
         logger.error("Mandi API timeout — using fallback data")
@@ -82,40 +53,16 @@ async def fetch_mandi_prices(
         return _get_fallback_mandi_data()
 
 
-def _normalize_mandi_data(records: List[Dict]) -> List[Dict[str, Any]]:
-    """Normalize the raw API records into a consistent format."""
-    normalized = []
-    for r in records:
-        try:
-            normalized.append({
-                "source": "mandi",
-                "data_type": "live",
-                "state": r.get("state", "Unknown"),
-                "district": r.get("district", "Unknown"),
-                "market": r.get("market", "Unknown"),
-                "commodity": r.get("commodity", "Unknown"),
-                "variety": r.get("variety", ""),
-                "grade": r.get("grade", ""),
-                "min_price": _safe_float(r.get("min_price", 0)),
-                "max_price": _safe_float(r.get("max_price", 0)),
-                "modal_price": _safe_float(r.get("modal_price", 0)),
-                "arrival_date": r.get("arrival_date", ""),
-                "timestamp": datetime.utcnow().isoformat(),
-            })
-        except Exception as e:
-            logger.warning(f"Skipping malformed mandi record: {e}")
-            continue
-    return normalized
-
-
-def _safe_float(val) -> float:
-    """Safely convert to float, handling strings, None, etc."""
-    if val is None:
-        return 0.0
-    try:
-        return float(val)
-    except (TypeError, ValueError):
-        return 0.0
+async def fetch_mandi_batch(
+    commodities: List[str],
+    states: Optional[List[str]] = None,
+    limit_per: int = 50,
+) -> Dict[str, Any]:
+    """
+    Fetch mandi prices for several commodities (and optionally states) concurrently.
+    Returns {"records", "failed", "requested"} — see fetch_commodity_batch.
+    """
+    return await fetch_commodity_batch(fetch_mandi_prices, commodities, states, key_fields=MANDI_RECORD_KEY, limit=limit_per)
 
 
 def _get_fallback_mandi_data() -> List[Dict[str, Any]]:
@@ -0,0 +1,74 @@
+"""
+Columnar normalization for data.gov.in mandi records.
+
+A page of raw API records becomes one DataFrame in a single pass: prices as
+float64, state/district/market/commodity as categoricals and arrival dates
+parsed to datetime64 (`arrival_ts`). `frame_to_records` is the thin dict-list
+view that existing callers and the Signal store consume.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List
+import pandas as pd
+
+ARRIVAL_DATE_FORMAT = "%d/%m/%Y"
+
+PRICE_FIELDS = ("min_price", "max_price", "modal_price")
+CATEGORY_FIELDS = ("state", "district", "market", "commodity")
+TEXT_DEFAULTS = {
+    "state": "Unknown",
+    "district": "Unknown",
+    "market": "Unknown",
+    "commodity": "Unknown",
+    "variety": "",
+    "grade": "",
+    "arrival_date": "",
+}
+
+# Column order of the dict view — identical to the record-at-a-time normalizer it replaces
+MANDI_FIELDS = [
+    "source", "data_type", "state", "district", "market", "commodity", "variety", "grade",
+    "min_price", "max_price", "modal_price", "arrival_date", "timestamp",
+]
+
+
+def normalize_mandi_frame(records: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Normalize a page of raw API records into a typed mandi DataFrame."""
+    # Only the fields we keep are pulled out, so pandas never has to union every record's keys
+    raw = {field: pd.Series([r.get(field) for r in records], dtype=object) for field in (*TEXT_DEFAULTS, *PRICE_FIELDS)}
+    columns: Dict[str, Any] = {"source": "mandi", "data_type": "live"}
+    for field, default in TEXT_DEFAULTS.items():
+        columns[field] = raw[field].fillna(default).astype(str)
+    for field in PRICE_FIELDS:
+        columns[field] = _to_price(raw[field])
+    columns["timestamp"] = datetime.utcnow().isoformat()
+
+    frame = pd.DataFrame(columns, index=pd.RangeIndex(len(records)))
+    frame["arrival_ts"] = pd.to_datetime(frame["arrival_date"], format=ARRIVAL_DATE_FORMAT, errors="coerce")
+    return _with_categories(frame)
+
+
+def concat_mandi_frames(frames: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """Stack page frames into one, re-unifying the per-page categoricals."""
+    frames = list(frames)
+    if not frames:
+        return normalize_mandi_frame([])
+    return _with_categories(pd.concat(frames, ignore_index=True))
+
+
+def frame_to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """The dict-list view of a mandi frame (plain Python values, JSON-safe)."""
+    view = frame[MANDI_FIELDS].astype({field: object for field in CATEGORY_FIELDS})
+    return view.to_dict("records")
+
+
+def _to_price(column: pd.Series) -> pd.Series:
+    try:
+        prices = column.astype("float64")
+    except (TypeError, ValueError):
+        # Slow path only when a page has unparseable prices; they become 0.0, same as safe_float
+        prices = pd.to_numeric(column, errors="coerce").astype("float64")
+    return prices.fillna(0.0)
+
+
+def _with_categories(frame: pd.DataFrame) -> pd.DataFrame:
+    return frame.astype({field: "category" for field in CATEGORY_FIELDS})
@@ -0,0 +1,319 @@
+"""
+Mandi Repository — one data-access layer for the data.gov.in mandi resource.
+
+The mandi, eNAM and trade feeds all read the same resource
+("Current Daily Price of Various Commodities from Various Markets"). Instead
+of each feed querying it separately, the repository keeps one copy of the
+resource in memory as a columnar DataFrame indexed by commodity, state and
+market, and serves each feed's filter as a cheap in-memory selection.
+
+When the ingestion bulk sync owns fetching the resource, the app hands the
+repository a snapshot loader and every refresh reads the latest published
+bulk-sync snapshot instead of calling upstream again. Otherwise a refresh
+pulls the resource itself (streamed, concurrent pages). Either way no
+request waits for a full sweep: until the first load completes, queries
+are served from one live upstream page.
+
+Doc: https://data.gov.in/resource/9ef84268-d588-465a-a308-a864a43d0070
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional, AsyncIterator, Callable
+import numpy as np
+import pandas as pd
+from config import settings
+from integrations.circuit_breaker import CircuitOpenError
+from integrations.http_client import stream_json_records
+from integrations.mandi_frame import normalize_mandi_frame, concat_mandi_frames, frame_to_records
+from integrations.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Real, verified resource ID for "Current Daily Price of Various Commodities"
+# Ministry of Agriculture — updated daily with 16,000+ records
+MANDI_RESOURCE_ID = "9ef84268-d588-465a-a308-a864a43d0070"
+BASE_URL = "https://api.data.gov.in/resource"
+
+# Public demo key — works for moderate traffic; replace with your own for production
+DEFAULT_API_KEY = "579b464db66ec23bdd000001cdd3946e44ce4aad7209ff7b23ac571b"
+
+INDEXED_FIELDS = ("commodity", "state", "market")
+
+# (max_records) -> records of the latest bulk-sync snapshot, or None if there is none
+SnapshotLoader = Callable[[int], Optional[List[Dict[str, Any]]]]
+
+
+class MandiRepository:
+    """In-memory, indexed copy of the mandi resource shared by the mandi, eNAM and trade feeds."""
+
+    def __init__(self, ttl_seconds: float, max_records: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_records = max_records
+        self._frame: pd.DataFrame = normalize_mandi_frame([])
+        self._index: Dict[str, Dict[str, np.ndarray]] = {field: {} for field in INDEXED_FIELDS}
+        self._refreshed_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._flight = SingleFlight("mandi_repository")
+        self.snapshot_loader: Optional[SnapshotLoader] = None
+        self.loaded_at: Optional[str] = None
+        self.loaded_from: Optional[str] = None
+        self.refreshes = 0
+        self.live_pages = 0
+        self.upstream_total = 0
+
+    def load(self, frame: pd.DataFrame):
+        """Replace the in-memory copy and rebuild the commodity/state/market indexes."""
+        frame = frame.reset_index(drop=True)
+        index = {field: frame.groupby(field, observed=True).indices for field in INDEXED_FIELDS}
+        self._frame, self._index = frame, index
+        self._refreshed_at = time.monotonic()
+        self.loaded_at = datetime.utcnow().isoformat()
+
+    async def refresh(self):
+        """Reload the latest bulk-sync snapshot, or pull the resource from upstream when there is no snapshot loader."""
+        if self.snapshot_loader is not None:
+            if not await self._load_snapshot():
+                raise ValueError("no published mandi snapshot")
+            return
+        page_stats: Dict[str, Any] = {}
+        frames: List[pd.DataFrame] = []
+        async for batch in iter_mandi_pages(stats=page_stats, max_records=self.max_records):
+            frames.append(batch)
+        frame = concat_mandi_frames(frames)
+        if frame.empty:
+            raise ValueError("mandi resource returned no records")
+        self.load(frame.head(self.max_records))
+        self.refreshes += 1
+        self.loaded_from = "upstream"
+        self.upstream_total = page_stats.get("total", 0)
+        logger.info(f"Mandi repository refreshed: {len(self._frame)} of {self.upstream_total} records in {page_stats.get('pages', 0)} pages")
+
+    async def _load_snapshot(self) -> bool:
+        records = await asyncio.to_thread(self.snapshot_loader, self.max_records)
+        if not records:
+            return False
+        self.load(normalize_mandi_frame(records))
+        self.refreshes += 1
+        self.loaded_from = "snapshot"
+        logger.info(f"Mandi repository loaded {len(self._frame)} records from the bulk-sync snapshot")
+        return True
+
+    def expire(self):
+        """Mark the copy stale so the next query reloads it (e.g. after a new snapshot is published)."""
+        self._refreshed_at = None
+
+    def _is_fresh(self) -> bool:
+        return self._refreshed_at is not None and time.monotonic() - self._refreshed_at < self.ttl_seconds
+
+    async def ensure_loaded(self) -> bool:
+        """
+        Make sure data is available; False while a cold repository has
+        nothing to serve yet. A cold repository loads the stored snapshot
+        (one DB read) or starts the upstream sweep in the background; a warm
+        but expired one keeps serving while one background refresh runs.
+        """
+        if self._is_fresh():
+            return True
+        if not self._frame.empty:
+            self._start_background_refresh()
+            return True
+        if self.snapshot_loader is not None:
+            return await self._flight.do("snapshot", self._load_snapshot)
+        self._start_background_refresh()
+        return False
+
+    def _start_background_refresh(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self):
+        try:
+            await self._flight.do("refresh", self.refresh)
+        except Exception as e:
+            logger.warning(f"Mandi repository refresh failed, serving data from {self.loaded_at}: {type(e).__name__}: {e}")
+
+    async def _live_frame(
+        self,
+        commodity: Optional[str] = None,
+        state: Optional[str] = None,
+        market: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """The first upstream page for the filters, served while the repository is cold."""
+        filters = {
+            f"filters[{field}]": value
+            for field, value in (("commodity", commodity), ("state", state), ("market", market))
+            if value is not None
+        }
+        self.live_pages += 1
+        frames = [batch async for batch in _stream_mandi_page(0, limit or settings.MANDI_BULK_PAGE_SIZE, filters, {})]
+        frame = concat_mandi_frames(frames)
+        return frame if limit is None else frame.head(limit)
+
+    def select_frame(
+        self,
+        commodity: Optional[str] = None,
+        state: Optional[str] = None,
+        market: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Rows matching every given filter, in upstream order."""
+        frame = self._frame
+        candidates: Optional[np.ndarray] = None
+        for field, value in (("commodity", commodity), ("state", state), ("market", market)):
+            if value is None:
+                continue
+            ids = self._index[field].get(value, np.empty(0, dtype=np.intp))
+            candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+        if candidates is not None:
+            frame = frame.iloc[candidates]
+        return frame if limit is None else frame.head(limit)
+
+    def select(self, **filters) -> List[Dict[str, Any]]:
+        """Dict-list view of `select_frame` (fresh dicts, safe to mutate)."""
+        return frame_to_records(self.select_frame(**filters))
+
+    async def query_frame(self, **filters) -> pd.DataFrame:
+        if not await self.ensure_loaded():
+            return await self._live_frame(**filters)
+        return self.select_frame(**filters)
+
+    async def query(self, **filters) -> List[Dict[str, Any]]:
+        return frame_to_records(await self.query_frame(**filters))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "records": len(self._frame),
+            "upstream_total": self.upstream_total,
+            "commodities": len(self._index["commodity"]),
+            "states": len(self._index["state"]),
+            "markets": len(self._index["market"]),
+            "loaded_at": self.loaded_at,
+            "loaded_from": self.loaded_from,
+            "refreshes": self.refreshes,
+            "live_pages": self.live_pages,
+        }
+
+
+async def _stream_mandi_page(offset: int, page_size: int, filters: Dict[str, str], header: Dict[str, Any]) -> AsyncIterator[pd.DataFrame]:
+    """
+    Stream one page of the mandi resource as normalized frames of up to
+    MANDI_STREAM_BATCH_SIZE rows. A failed attempt is retried with backoff and
+    resumes after the records already yielded, so nothing is emitted twice.
+    """
+    params = {
+        "api-key": settings.GOV_DATA_API_KEY or DEFAULT_API_KEY,
+        "format": "json",
+        "limit": page_size,
+        "offset": offset,
+        **filters,
+    }
+    url = f"{BASE_URL}/{MANDI_RESOURCE_ID}"
+    batch_size = settings.MANDI_STREAM_BATCH_SIZE
+    attempts = settings.MANDI_BULK_PAGE_RETRIES + 1
+    emitted = 0
+    for attempt in range(attempts):
+        seen, batch = 0, []
+        try:
+            async for raw_records in stream_json_records("mandi", url, params, header):
+                # Skip records an earlier attempt already yielded
+                batch.extend(raw_records[max(0, emitted - seen):])
+                seen += len(raw_records)
+                if len(batch) >= batch_size:
+                    emitted += len(batch)
+                    yield normalize_mandi_frame(batch)
+                    batch = []
+            if header.get("status") != "ok":
+                raise ValueError(f"non-ok status: {header.get('message')}")
+            if batch:
+                emitted += len(batch)
+                yield normalize_mandi_frame(batch)
+            return
+        except Exception as e:
+            if attempt == attempts - 1 or isinstance(e, CircuitOpenError):
+                raise
+            delay = 0.5 * (2 ** attempt)
+            logger.warning(f"Mandi page offset={offset} failed ({type(e).__name__}: {e}); retry {attempt + 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+async def iter_mandi_pages(
+    filters: Optional[Dict[str, str]] = None,
+    page_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    stats: Optional[Dict[str, Any]] = None,
+    max_records: Optional[int] = None,
+) -> AsyncIterator[pd.DataFrame]:
+    """
+    Walk the whole mandi resource, yielding normalized frames.
+
+    Pages are parsed as they stream in, so memory is bounded by a handful of
+    batches rather than whole responses. The first page reports the resource
+    total; the remaining offsets are fetched by `concurrency` workers whose
+    batches pass through a bounded queue, so a slow consumer (e.g. the DB
+    writer) applies backpressure. Pages that still fail after retries are
+    skipped and counted in `stats["failed_pages"]`. `max_records` stops the
+    walk early (rounded up to whole pages).
+    """
+    filters = filters or {}
+    page_size = page_size or settings.MANDI_BULK_PAGE_SIZE
+    concurrency = concurrency or settings.MANDI_BULK_CONCURRENCY
+    stats = stats if stats is not None else {}
+    stats.update(total=0, pages=0, records=0, failed_pages=0)
+
+    header: Dict[str, Any] = {}
+    async for batch in _stream_mandi_page(0, page_size, filters, header):
+        stats["records"] += len(batch)
+        yield batch
+    stats["pages"] += 1
+    stats["total"] = int(header.get("total", 0) or 0)
+
+    end = min(stats["total"], max_records) if max_records else stats["total"]
+    offsets = iter(range(page_size, end, page_size))
+    remaining = max(0, -(-end // page_size) - 1)
+    batches: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    page_done = object()
+
+    async def worker():
+        # Workers share one offset iterator, so each page is fetched exactly once
+        for offset in offsets:
+            try:
+                async for batch in _stream_mandi_page(offset, page_size, filters, {}):
+                    await batches.put((offset, batch))
+                await batches.put((offset, page_done))
+            except Exception as e:
+                await batches.put((offset, e))
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, remaining))]
+    try:
+        finished = 0
+        while finished < remaining:
+            offset, item = await batches.get()
+            if item is page_done:
+                finished += 1
+                stats["pages"] += 1
+            elif isinstance(item, Exception):
+                finished += 1
+                stats["failed_pages"] += 1
+                logger.error(f"Mandi page offset={offset} dropped after retries: {type(item).__name__}: {item}")
+            else:
+                stats["records"] += len(item)
+                yield item
+    finally:
+        for task in workers:
+            task.cancel()
+
+
+def safe_float(val) -> float:
+    """Safely convert to float, handling strings, None, etc."""
+    if val is None:
+        return 0.0
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+mandi_repository = MandiRepository(settings.MANDI_REPOSITORY_TTL_SECONDS, settings.MANDI_REPOSITORY_MAX_RECORDS)
@@ -0,0 +1,59 @@
+"""
+Async token-bucket rate limiter for upstream APIs with call quotas.
+
+Callers that find the bucket empty wait in FIFO order for the next token
+instead of firing requests that would come back as HTTP 429.
+"""
+import asyncio
+import time
+from typing import Dict
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `capacity`; `acquire` waits for one token."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        # The lock makes waiters queue up in arrival order
+        async with self._lock:
+            started = time.monotonic()
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+            self.acquired += 1
+            self.waited_seconds += time.monotonic() - started
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "rate_per_minute": round(self.rate * 60, 2),
+            "capacity": self.capacity,
+            "acquired": self.acquired,
+            "waited_seconds": round(self.waited_seconds, 3),
+        }
+
+
+def per_worker_bucket(calls_per_minute: int, burst: int, workers: int) -> TokenBucket:
+    """
+    Split an account-wide per-minute quota across uvicorn worker processes.
+    The refill rate leaves room for the burst, so a full bucket plus one
+    minute of refill never exceeds the quota.
+    """
+    workers = max(workers, 1)
+    burst = max(1, min(burst, calls_per_minute) // workers)
+    rate_per_minute = max(calls_per_minute / workers - burst, 1)
+    return TokenBucket(rate=rate_per_minute / 60.0, capacity=burst)
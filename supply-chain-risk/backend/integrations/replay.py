@@ -0,0 +1,42 @@
+"""
+Random generators for simulated data, with a deterministic replay mode.
+
+Every simulated component (weather, logistics, trade records, the supply
+network graph, historical disruption features) draws from a generator
+obtained here instead of the global `random` module. Normally each call
+gets fresh entropy. With REPLAY_MODE on, the generator is seeded from
+(REPLAY_SEED, time bucket, source, extra key parts), so identical inputs
+produce identical output for the whole bucket — responses can be cached
+and performance runs reproduced. REPLAY_BUCKET pins the bucket for
+benchmarks that must replay across runs.
+"""
+import hashlib
+import random
+import time
+from typing import Any, Optional
+import numpy as np
+from config import settings
+
+
+def current_bucket() -> int:
+    if settings.REPLAY_BUCKET is not None:
+        return settings.REPLAY_BUCKET
+    return int(time.time() // settings.REPLAY_BUCKET_SECONDS)
+
+
+def replay_seed(source: str, *parts: Any) -> Optional[int]:
+    """64-bit seed for (bucket, source, parts) in replay mode, else None."""
+    if not settings.REPLAY_MODE:
+        return None
+    key = ":".join(str(p) for p in (settings.REPLAY_SEED, current_bucket(), source, *parts))
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], "big")
+
+
+def sim_random(source: str, *parts: Any) -> random.Random:
+    """A `random.Random` for one simulated component call."""
+    return random.Random(replay_seed(source, *parts))
+
+
+def sim_np_rng(source: str, *parts: Any) -> np.random.Generator:
+    """A NumPy Generator for one simulated component call."""
+    return np.random.default_rng(replay_seed(source, *parts))
@@ -0,0 +1,46 @@
+"""
+Single-flight request coalescing.
+
+When many requests ask for the same upstream resource at once (a dashboard
+stampede, or every worker missing the cache right after expiry), only the
+first caller performs the call; the rest await the same in-flight task.
+This keeps identical data.gov.in / OpenWeatherMap calls to one at a time
+and protects the shared API key quota.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one in-flight task."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        # Shield the shared task so one caller timing out (e.g. a fan-out
+        # budget) does not cancel the call for everyone else waiting on it.
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"{self.name} call {key!r} failed: {task.exception()!r}")
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._calls), "started": self.started, "coalesced": self.coalesced}
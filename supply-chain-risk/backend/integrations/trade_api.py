@@ -8,18 +8,19 @@ NOTE: Real-time trade data is published monthly by DGCIS. The commodity price
 feed from data.gov.in provides daily price signals which we interpret as
 trade proxies for supply chain risk computation.
 """
-import httpx
 import logging
+import random
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-from config import settings
+from integrations.batch_fetch import fetch_commodity_batch
+from integrations.feed_cache import cached_feed
+from integrations.replay import sim_random
+from integrations.mandi_repository import mandi_repository, safe_float, MANDI_RESOURCE_ID
 
 logger = logging.getLogger(__name__)
 
-# Use the REAL mandi API to get prices for import/export-relevant commodities
-MANDI_RESOURCE_ID = "9ef84268-d588-465a-a308-a864a43d0070"
-BASE_URL = "https://api.data.gov.in/resource"
-DEFAULT_API_KEY = "579b464db66ec23bdd000001cdd3946e44ce4aad7209ff7b23ac571b"
+# Identifies one trade record when merging batch results
+TRADE_RECORD_KEY = ("commodity", "country", "trade_type", "data_type", "state")
 
 # Commodities relevant to import/export trade
 TRADE_COMMODITIES = [
@@ -46,6 +47,7 @@ EXPORT_CORRIDORS = {
 }
 
 
+@cached_feed("trade", resource=MANDI_RESOURCE_ID)
 async def fetch_trade_data(
     commodity: Optional[str] = None,
     country: Optional[str] = None,
@@ -56,13 +58,11 @@ async def fetch_trade_data(
     Fetch trade-relevant commodity data from data.gov.in.
     Supplements with real trade corridor metadata.
     """
-    api_key = settings.GOV_DATA_API_KEY or DEFAULT_API_KEY
-
     # Fetch real commodity prices for trade-relevant items
-    real_commodity_data = await _fetch_trade_commodities(api_key, commodity, limit)
+    real_commodity_data = await _fetch_trade_commodities(commodity, limit)
 
     # Build trade records by combining real price data with corridor knowledge
-    trade_records = _build_trade_records(real_commodity_data, country, trade_type)
+    trade_records = _build_trade_records(real_commodity_data, commodity, country, trade_type)
 
     if trade_records:
         logger.info(f"Trade data: {len(trade_records)} records ({sum(1 for t in trade_records if t.get('data_type') == 'live')} with live prices)")
@@ -72,46 +72,58 @@ async def fetch_trade_data(
     return _get_fallback_trade_data()
 
 
-async def _fetch_trade_commodities(api_key: str, commodity: Optional[str], limit: int) -> List[Dict]:
-    """Fetch prices for trade-relevant commodities from data.gov.in."""
-    target = commodity if commodity else "Cotton"
+async def fetch_trade_batch(
+    commodities: Optional[List[str]] = None,
+    country: Optional[str] = None,
+    trade_type: Optional[str] = None,
+    limit_per: int = 10,
+) -> Dict[str, Any]:
+    """
+    Fetch trade records for several commodities (default: all TRADE_COMMODITIES)
+    concurrently. Corridor reference rows repeated by every call are kept once.
+    Returns {"records", "failed", "requested"} — see fetch_commodity_batch.
+    """
+    return await fetch_commodity_batch(
+        fetch_trade_data, commodities or TRADE_COMMODITIES,
+        key_fields=TRADE_RECORD_KEY, country=country, trade_type=trade_type, limit=limit_per,
+    )
 
-    params = {
-        "api-key": api_key,
-        "format": "json",
-        "limit": min(limit, 30),
-        "filters[commodity]": target,
-    }
+
+async def _fetch_trade_commodities(commodity: Optional[str], limit: int) -> List[Dict]:
+    """Fetch prices for trade-relevant commodities from the shared mandi repository."""
+    target = commodity if commodity else "Cotton"
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            url = f"{BASE_URL}/{MANDI_RESOURCE_ID}"
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("records", [])
+        return await mandi_repository.query(commodity=target, limit=min(limit, 30))
     except Exception as e:
         logger.error(f"Trade commodity fetch error: {e}")
         return []
 
 
-def _build_trade_records(commodity_data: List[Dict], country: Optional[str], trade_type: Optional[str]) -> List[Dict[str, Any]]:
+def _build_trade_records(
+    commodity_data: List[Dict],
+    commodity: Optional[str],
+    country: Optional[str],
+    trade_type: Optional[str],
+    rng: Optional[random.Random] = None,
+) -> List[Dict[str, Any]]:
     """Combine real commodity prices with trade corridor knowledge."""
-    import random
+    # Seeded per requested commodity so batch fetches replay a distinct sequence for each
+    rng = rng or sim_random("trade", commodity, country, trade_type)
     now = datetime.utcnow()
     records = []
 
     # Build records from real price data with trade context
     for item in commodity_data[:10]:
         commodity_name = item.get("commodity", "Unknown")
-        modal_price = _safe_float(item.get("modal_price", 0))
-        min_price = _safe_float(item.get("min_price", 0))
-        max_price = _safe_float(item.get("max_price", 0))
+        modal_price = safe_float(item.get("modal_price", 0))
+        min_price = safe_float(item.get("min_price", 0))
+        max_price = safe_float(item.get("max_price", 0))
 
         # Calculate price change estimate from spread
         if modal_price > 0:
             volatility = ((max_price - min_price) / modal_price) * 100
-            change_pct = round(random.uniform(-volatility, volatility), 1)
+            change_pct = round(rng.uniform(-volatility, volatility), 1)
         else:
             change_pct = 0
 
@@ -122,9 +134,9 @@ def _build_trade_records(commodity_data: List[Dict], country: Optional[str], tra
             dest_country = corridor["countries"][0]
             port = corridor["ports"][0]
         else:
-            t_type = random.choice(["import", "export"])
-            dest_country = random.choice(["China", "United States", "UAE", "Bangladesh", "Saudi Arabia"])
-            port = random.choice(["JNPT Mumbai", "Chennai", "Kolkata", "Kandla"])
+            t_type = rng.choice(["import", "export"])
+            dest_country = rng.choice(["China", "United States", "UAE", "Bangladesh", "Saudi Arabia"])
+            port = rng.choice(["JNPT Mumbai", "Chennai", "Kolkata", "Kandla"])
 
         if trade_type and t_type != trade_type:
             continue
@@ -137,8 +149,8 @@ def _build_trade_records(commodity_data: List[Dict], country: Optional[str], tra
             "commodity": commodity_name,
             "country": dest_country,
             "trade_type": t_type,
-            "quantity_mt": round(modal_price * random.uniform(5, 50), 0),
-            "value_inr_cr": round(modal_price * random.uniform(0.5, 5), 1),
+            "quantity_mt": round(modal_price * rng.uniform(5, 50), 0),
+            "value_inr_cr": round(modal_price * rng.uniform(0.5, 5), 1),
             "year_month": now.strftime("%Y-%m"),
             "port": port,
             "change_pct": change_pct,
@@ -162,11 +174,11 @@ def _build_trade_records(commodity_data: List[Dict], country: Optional[str], tra
                 "commodity": commodity_name,
                 "country": dest_country,
                 "trade_type": t_type,
-                "quantity_mt": round(random.uniform(1000, 100000), 0),
-                "value_inr_cr": round(random.uniform(100, 30000), 1),
+                "quantity_mt": round(rng.uniform(1000, 100000), 0),
+                "value_inr_cr": round(rng.uniform(100, 30000), 1),
                 "year_month": now.strftime("%Y-%m"),
                 "port": corridor["ports"][0],
-                "change_pct": round(random.uniform(-15, 15), 1),
+                "change_pct": round(rng.uniform(-15, 15), 1),
                 "unit_price": 0,
                 "state": "",
                 "timestamp": now.isoformat(),
@@ -175,15 +187,6 @@ def _build_trade_records(commodity_data: List[Dict], country: Optional[str], tra
     return records
 
 
-def _safe_float(val) -> float:
-    if val is None:
-        return 0.0
-    try:
-        return float(val)
-    except (TypeError, ValueError):
-        return 0.0
-
-
 def _get_fallback_trade_data() -> List[Dict[str, Any]]:
     """Fallback trade data — only if all API calls fail."""
     now = datetime.utcnow()
@@ -5,13 +5,20 @@ Uses the FREE tier of OpenWeatherMap API (60 calls/min, 1M calls/month).
 Sign up at: https://openweathermap.org/api
 
 Maps weather conditions to supply chain disruption severity scores.
+Hub requests run concurrently behind a semaphore and a shared token bucket
+that keeps us inside the per-minute quota (requests queue rather than 429).
 """
+import asyncio
 import httpx
 import logging
 import random
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from config import settings
+from integrations.http_client import get_json
+from integrations.feed_cache import cached_feed
+from integrations.replay import sim_random
+from integrations.rate_limiter import per_worker_bucket
 
 logger = logging.getLogger(__name__)
 
@@ -48,7 +55,14 @@ DISRUPTION_SEVERITY = {
     "Clouds": 0.05,
 }
 
+# Free tier allows 60 calls/min per API key; the quota is shared by all uvicorn workers
+weather_rate_limiter = per_worker_bucket(
+    settings.WEATHER_CALLS_PER_MINUTE, settings.WEATHER_RATE_BURST, settings.WEB_CONCURRENCY
+)
+_hub_semaphore = asyncio.Semaphore(settings.WEATHER_MAX_CONCURRENCY)
 
+
+@cached_feed("weather", resource="weather")
 async def fetch_weather_data(cities: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """
     Fetch REAL weather data from OpenWeatherMap for supply chain hubs.
@@ -65,40 +79,42 @@ async def fetch_weather_data(cities: Optional[List[str]] = None) -> List[Dict[st
         logger.warning("WEATHER_API_KEY not set — using simulated weather data. Sign up free at https://openweathermap.org/api")
         return [_generate_simulated_weather(hub) for hub in hubs]
 
-    results = []
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        for hub in hubs:
-            try:
-                params = {
-                    "lat": hub["lat"],
-                    "lon": hub["lng"],
-                    "appid": api_key,
-                    "units": "metric",
-                }
-                response = await client.get(
-                    f"{settings.WEATHER_API_URL}/weather",
-                    params=params
-                )
-                response.raise_for_status()
-                data = response.json()
-                results.append(_normalize_weather(data, hub))
-                logger.debug(f"Weather fetched for {hub['name']}: {data.get('weather', [{}])[0].get('main')}")
-
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 401:
-                    logger.error("OpenWeatherMap API key invalid! Check WEATHER_API_KEY in .env")
-                    results.append(_generate_simulated_weather(hub))
-                else:
-                    logger.warning(f"Weather fetch failed for {hub['name']}: HTTP {e.response.status_code}")
-                    results.append(_generate_simulated_weather(hub))
-            except Exception as e:
-                logger.warning(f"Weather fetch error for {hub['name']}: {e}")
-                results.append(_generate_simulated_weather(hub))
+    results = await asyncio.gather(*(_fetch_hub_weather(hub, api_key) for hub in hubs))
+    if results and not any(r.get("data_type") == "live" for r in results):
+        # Every hub failed upstream: mark it as fallback so it is not cached and last-known-good data is served
+        logger.warning("Weather upstream unavailable for every hub — returning fallback data")
+        return [{**r, "data_type": "fallback"} for r in results]
 
     logger.info(f"Weather data: {len(results)} hubs ({sum(1 for r in results if r.get('data_type') == 'live')} live, {sum(1 for r in results if r.get('data_type') == 'simulated')} simulated)")
     return results
 
 
+async def _fetch_hub_weather(hub: Dict, api_key: str) -> Dict[str, Any]:
+    """Fetch one hub, waiting for a concurrency slot and a rate-limit token."""
+    try:
+        params = {
+            "lat": hub["lat"],
+            "lon": hub["lng"],
+            "appid": api_key,
+            "units": "metric",
+        }
+        async with _hub_semaphore:
+            await weather_rate_limiter.acquire()
+            data = await get_json("weather", f"{settings.WEATHER_API_URL}/weather", params)
+        logger.debug(f"Weather fetched for {hub['name']}: {data.get('weather', [{}])[0].get('main')}")
+        return _normalize_weather(data, hub)
+
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 401:
+            logger.error("OpenWeatherMap API key invalid! Check WEATHER_API_KEY in .env")
+        else:
+            logger.warning(f"Weather fetch failed for {hub['name']}: HTTP {e.response.status_code}")
+        return _generate_simulated_weather(hub)
+    except Exception as e:
+        logger.warning(f"Weather fetch error for {hub['name']}: {e}")
+        return _generate_simulated_weather(hub)
+
+
 def _normalize_weather(data: Dict, hub: Dict) -> Dict[str, Any]:
     """Convert raw OpenWeatherMap response to our disruption-aware format."""
     weather_list = data.get("weather", [{}])
@@ -185,11 +201,12 @@ def _explain_disruption(weather: str, wind: float, vis: int, temp: float, humidi
     return factors
 
 
-def _generate_simulated_weather(hub: Dict) -> Dict[str, Any]:
+def _generate_simulated_weather(hub: Dict, rng: Optional[random.Random] = None) -> Dict[str, Any]:
     """
     Generate realistic simulated weather when API key is unavailable.
     Uses time-of-day and regional patterns for realism.
     """
+    rng = rng or sim_random("weather", hub["name"])
     now = datetime.utcnow()
     hour_ist = (now.hour + 5) % 24  # IST offset
 
@@ -207,17 +224,17 @@ def _generate_simulated_weather(hub: Dict) -> Dict[str, Any]:
     }
 
     pattern = regional_patterns.get(hub["region"], {"temp_range": (20, 35), "conditions": ["Clear", "Clouds"]})
-    condition = random.choice(pattern["conditions"])
+    condition = rng.choice(pattern["conditions"])
     temp_min, temp_max = pattern["temp_range"]
 
     # Temperature varies by time of day
     if 6 <= hour_ist <= 17:
-        temp = random.uniform(temp_min + 5, temp_max)
+        temp = rng.uniform(temp_min + 5, temp_max)
     else:
-        temp = random.uniform(temp_min, temp_max - 5)
+        temp = rng.uniform(temp_min, temp_max - 5)
 
-    severity = DISRUPTION_SEVERITY.get(condition, 0.0) + random.uniform(0, 0.1)
-    wind_speed = random.uniform(1, 25) if condition in ["Thunderstorm", "Squall"] else random.uniform(0, 12)
+    severity = DISRUPTION_SEVERITY.get(condition, 0.0) + rng.uniform(0, 0.1)
+    wind_speed = rng.uniform(1, 25) if condition in ["Thunderstorm", "Squall"] else rng.uniform(0, 12)
 
     return {
         "source": "weather",
@@ -229,13 +246,13 @@ def _generate_simulated_weather(hub: Dict) -> Dict[str, Any]:
         "weather_main": condition,
         "weather_description": condition.lower(),
         "temperature": round(temp, 1),
-        "feels_like": round(temp + random.uniform(-2, 3), 1),
-        "humidity": random.randint(30, 90),
-        "pressure": random.randint(1005, 1020),
+        "feels_like": round(temp + rng.uniform(-2, 3), 1),
+        "humidity": rng.randint(30, 90),
+        "pressure": rng.randint(1005, 1020),
         "wind_speed": round(wind_speed, 1),
-        "wind_gust": round(wind_speed * random.uniform(1.2, 2.0), 1),
-        "visibility": random.randint(2000, 10000),
-        "cloud_cover": random.randint(0, 100) if condition in ["Clouds", "Rain"] else random.randint(0, 30),
+        "wind_gust": round(wind_speed * rng.uniform(1.2, 2.0), 1),
+        "visibility": rng.randint(2000, 10000),
+        "cloud_cover": rng.randint(0, 100) if condition in ["Clouds", "Rain"] else rng.randint(0, 30),
         "disruption_severity": round(min(severity, 1.0), 3),
         "is_disruptive": severity > 0.3,
         "disruption_factors": [],
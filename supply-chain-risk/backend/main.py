@@ -2,13 +2,20 @@
 Supply Chain Risk Platform - FastAPI Backend
 """
 import logging
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from config import settings
-from database import init_db
+from database import init_db, close_async_db
+from integrations.http_client import init_http_clients, close_http_clients
+from integrations.mandi_repository import mandi_repository
+from services.compute_executor import ComputeSaturatedError, shutdown_compute_pools
+from services.ingestion_scheduler import start_ingestion_scheduler, stop_ingestion_scheduler
+from services.signal_compaction import ensure_signal_partitions
+from services.signal_store import load_mandi_snapshot
 
 # Import routers
-from routers import auth, dashboard, data_ingestion
+from routers import auth, dashboard, data_ingestion, signals
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
@@ -34,15 +41,36 @@ app.add_middleware(
 app.include_router(auth.router)
 app.include_router(dashboard.router)
 app.include_router(data_ingestion.router)
+app.include_router(signals.router)
+
+
+@app.exception_handler(ComputeSaturatedError)
+async def compute_saturated_handler(request: Request, exc: ComputeSaturatedError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
 
 
 @app.on_event("startup")
 async def startup_event():
     logger.info("Initializing database...")
     init_db()
+    ensure_signal_partitions()
+    await init_http_clients()
+    if settings.INGESTION_ENABLED:
+        if settings.MANDI_BULK_SYNC_ENABLED:
+            # The bulk sync already fetches the mandi resource; the repository reads its snapshots
+            mandi_repository.snapshot_loader = load_mandi_snapshot
+        start_ingestion_scheduler()
     logger.info(f"{settings.APP_NAME} v{settings.APP_VERSION} started successfully!")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    stop_ingestion_scheduler()
+    await close_http_clients()
+    shutdown_compute_pools()
+    await close_async_db()
+
+
 @app.get("/")
 async def root():
     return {
@@ -1,75 +1,149 @@
 """
 ML Risk Scoring Model - scikit-learn ensemble with explainability.
+
+The fitted scaler, regressor and classifier importances come from the
+artifact written by `python -m ml.train`. It is loaded on first use, after
+its SHA-256 is checked against the manifest; a missing artifact is trained
+in-process (RISK_MODEL_TRAIN_IF_MISSING), a corrupt one leaves the model on
+the weighted score alone.
 """
+import hashlib
+import json
+import threading
+import joblib
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
-from sklearn.preprocessing import StandardScaler
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime
+from pathlib import Path
+
+from config import settings
 
 logger = logging.getLogger(__name__)
 
+MODEL_VERSION = "v1.0.0"
+FEATURE_NAMES = [
+    "price_volatility", "weather_severity", "logistics_delay",
+    "trade_volume_change", "congestion_level", "supply_demand_ratio",
+    "seasonal_factor", "historical_disruption_rate",
+]
+
+
+def manifest_path(artifact_path: str) -> Path:
+    return Path(artifact_path).with_suffix(".json")
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 
 class SupplyChainRiskModel:
-    FEATURE_NAMES = [
-        "price_volatility", "weather_severity", "logistics_delay",
-        "trade_volume_change", "congestion_level", "supply_demand_ratio",
-        "seasonal_factor", "historical_disruption_rate",
-    ]
+    FEATURE_NAMES = FEATURE_NAMES
     SEGMENT_WEIGHTS = {
         "procurement": {"price_volatility": 0.30, "weather_severity": 0.15, "supply_demand_ratio": 0.25, "seasonal_factor": 0.15, "historical_disruption_rate": 0.15, "logistics_delay": 0.0, "trade_volume_change": 0.0, "congestion_level": 0.0},
         "transport": {"logistics_delay": 0.30, "congestion_level": 0.25, "weather_severity": 0.20, "seasonal_factor": 0.10, "historical_disruption_rate": 0.15, "price_volatility": 0.0, "supply_demand_ratio": 0.0, "trade_volume_change": 0.0},
         "import_export": {"trade_volume_change": 0.30, "price_volatility": 0.20, "logistics_delay": 0.15, "congestion_level": 0.10, "seasonal_factor": 0.10, "historical_disruption_rate": 0.15, "weather_severity": 0.0, "supply_demand_ratio": 0.0},
     }
 
-    def __init__(self):
-        self.scaler = StandardScaler()
-        self.classifier = RandomForestClassifier(n_estimators=100, max_depth=8, random_state=42, n_jobs=-1)
-        self.regressor = GradientBoostingRegressor(n_estimators=100, max_depth=5, random_state=42)
+    # SEGMENT_WEIGHTS as rows in FEATURE_NAMES order, for batch scoring
+    _WEIGHT_MATRIX = {segment: np.array([weights.get(name, 0.0) for name in FEATURE_NAMES]) for segment, weights in SEGMENT_WEIGHTS.items()}
+
+    def __init__(self, artifact_path: Optional[str] = None):
+        self.artifact_path = artifact_path or settings.RISK_MODEL_PATH
+        self.scaler = None
+        self.regressor = None
+        self.feature_importances = None
+        self.metadata: Dict[str, Any] = {}
         self.is_trained = False
-        self.model_version = "v1.0.0"
-        self._train_initial_model()
-
-    def _train_initial_model(self):
-        np.random.seed(42)
-        n_samples = 1000
-        X = np.random.rand(n_samples, len(self.FEATURE_NAMES))
-        risk_scores = np.zeros(n_samples)
-        for i in range(n_samples):
-            risk_scores[i] = (X[i, 0] * 0.20 + X[i, 1] * 0.15 + X[i, 2] * 0.20 + X[i, 3] * 0.15 + X[i, 4] * 0.10 + X[i, 5] * 0.10 + X[i, 6] * 0.05 + X[i, 7] * 0.05) * 100
-        labels = np.digitize(risk_scores, bins=[25, 50, 75])
-        X_scaled = self.scaler.fit_transform(X)
-        self.classifier.fit(X_scaled, labels)
-        self.regressor.fit(X_scaled, risk_scores)
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def model_version(self) -> str:
+        self._ensure_loaded()
+        return self.metadata.get("model_version", MODEL_VERSION)
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+
+    def _load(self):
+        try:
+            artifact = self._read_artifact()
+        except FileNotFoundError:
+            if not settings.RISK_MODEL_TRAIN_IF_MISSING:
+                logger.error(f"Risk model artifact {self.artifact_path} not found — serving weighted scores only (run `python -m ml.train`)")
+                return
+            logger.warning(f"Risk model artifact {self.artifact_path} not found — training in-process (run `python -m ml.train` at build time)")
+            from ml.train import train_model
+            artifact = train_model()
+        except Exception as e:
+            logger.error(f"Risk model artifact {self.artifact_path} rejected — serving weighted scores only: {type(e).__name__}: {e}")
+            return
+        self.scaler = artifact["scaler"]
+        self.regressor = artifact["regressor"]
+        self.feature_importances = np.asarray(artifact["feature_importances"])
+        self.metadata = artifact["metadata"]
         self.is_trained = True
-        logger.info("Initial risk model trained successfully")
+        logger.info(f"Risk model {self.metadata['model_version']} loaded (trained {self.metadata['trained_at']})")
+
+    def _read_artifact(self) -> Dict[str, Any]:
+        manifest = json.loads(manifest_path(self.artifact_path).read_text())
+        checksum = file_sha256(self.artifact_path)
+        if checksum != manifest.get("sha256"):
+            raise ValueError(f"checksum mismatch (manifest {manifest.get('sha256')}, file {checksum})")
+        # Checksum verified before unpickling
+        artifact = joblib.load(self.artifact_path)
+        if list(artifact["metadata"]["feature_names"]) != self.FEATURE_NAMES:
+            raise ValueError("artifact was trained on a different feature set")
+        return artifact
 
     def compute_risk_score(self, features: Dict[str, float], segment: str = "procurement") -> Dict[str, Any]:
-        feature_vector = np.array([features.get(name, 0.0) for name in self.FEATURE_NAMES]).reshape(1, -1)
-        weights = self.SEGMENT_WEIGHTS.get(segment, self.SEGMENT_WEIGHTS["procurement"])
-        weighted_score = sum(features.get(name, 0.0) * weight for name, weight in weights.items()) * 100
-        ml_score = weighted_score
-        if self.is_trained:
-            X_scaled = self.scaler.transform(feature_vector)
-            ml_score = float(self.regressor.predict(X_scaled)[0])
-        final_score = min(max(0.6 * ml_score + 0.4 * weighted_score, 0), 100)
-        risk_level = self._score_to_level(final_score)
-        contributing_factors = {}
-        feature_weights_out = {}
-        for i, name in enumerate(self.FEATURE_NAMES):
-            value = features.get(name, 0.0)
-            weight = weights.get(name, 0.0)
-            contribution = value * weight * 100
-            if contribution > 0:
-                contributing_factors[name] = {"value": round(value, 4), "weight": round(weight, 4), "contribution": round(contribution, 2)}
-                feature_weights_out[name] = round(weight, 4)
-        if self.is_trained:
-            importances = self.classifier.feature_importances_
-            for i, name in enumerate(self.FEATURE_NAMES):
-                if name in contributing_factors:
-                    contributing_factors[name]["ml_importance"] = round(importances[i], 4)
-        return {"score": round(final_score, 2), "risk_level": risk_level, "contributing_factors": contributing_factors, "feature_weights": feature_weights_out, "model_version": self.model_version, "weighted_score": round(weighted_score, 2), "ml_score": round(ml_score, 2), "computed_at": datetime.utcnow().isoformat()}
+        return self.compute_risk_scores([{"segment": segment, "features": features}])[0]
+
+    def compute_risk_scores(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Score many feature dicts at once. Each row has "features" and a
+        "segment" (plus optional "region"/"commodity", echoed back); all rows
+        go through one scaler transform and one regressor predict, and the
+        weighted scores and contributions are computed as matrix operations.
+        """
+        self._ensure_loaded()
+        if not rows:
+            return []
+        X = np.array([[float(r["features"].get(name, 0.0)) for name in self.FEATURE_NAMES] for r in rows])
+        segments = [r.get("segment") if r.get("segment") in self._WEIGHT_MATRIX else "procurement" for r in rows]
+        W = np.stack([self._WEIGHT_MATRIX[s] for s in segments])
+        contributions = X * W * 100
+        weighted_scores = contributions.sum(axis=1)
+        ml_scores = self.regressor.predict(self.scaler.transform(X)) if self.is_trained else weighted_scores
+        final_scores = np.clip(0.6 * ml_scores + 0.4 * weighted_scores, 0, 100)
+        model_version, computed_at = self.model_version, datetime.utcnow().isoformat()
+        importances = self.feature_importances.round(4).tolist() if self.is_trained else None
+        results = []
+        for i, row in enumerate(rows):
+            contributing_factors = {}
+            feature_weights_out = {}
+            for j in np.flatnonzero(contributions[i] > 0):
+                name, weight = self.FEATURE_NAMES[j], round(float(W[i, j]), 4)
+                contributing_factors[name] = {"value": round(float(X[i, j]), 4), "weight": weight, "contribution": round(float(contributions[i, j]), 2)}
+                if importances:
+                    contributing_factors[name]["ml_importance"] = importances[j]
+                feature_weights_out[name] = weight
+            result = {"score": round(float(final_scores[i]), 2), "risk_level": self._score_to_level(final_scores[i]), "contributing_factors": contributing_factors, "feature_weights": feature_weights_out, "model_version": model_version, "weighted_score": round(float(weighted_scores[i]), 2), "ml_score": round(float(ml_scores[i]), 2), "computed_at": computed_at}
+            for key in ("region", "commodity"):
+                if key in row:
+                    result[key] = row[key]
+            results.append(result)
+        return results
 
     def predict_bottlenecks(self, signals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         bottlenecks = []
@@ -111,3 +185,8 @@ class SupplyChainRiskModel:
 
 
 risk_model = SupplyChainRiskModel()
+
+
+def predict_bottlenecks(signals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Module-level `risk_model.predict_bottlenecks` for the compute pool (needs no trained model)."""
+    return risk_model.predict_bottlenecks(signals)
@@ -0,0 +1,88 @@
+"""
+Offline training for the risk model.
+
+    python -m ml.train [--output PATH] [--samples N] [--seed S]
+
+Fits the scaler, the gradient-boosting regressor and the random-forest
+classifier on the synthetic training set and writes a versioned artifact
+(joblib) plus a JSON manifest next to it holding the artifact's SHA-256,
+model version and training metadata. The service loads the artifact
+lazily (see ml.risk_model) instead of training on every process start.
+"""
+import argparse
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+import joblib
+import numpy as np
+import sklearn
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
+from sklearn.preprocessing import StandardScaler
+
+from config import settings
+from ml.risk_model import FEATURE_NAMES, MODEL_VERSION, file_sha256, manifest_path
+
+logger = logging.getLogger(__name__)
+
+# Weights of the synthetic target, in FEATURE_NAMES order
+TARGET_WEIGHTS = np.array([0.20, 0.15, 0.20, 0.15, 0.10, 0.10, 0.05, 0.05])
+
+
+def train_model(n_samples: int = 1000, seed: int = 42) -> Dict[str, Any]:
+    """Fit the model on the synthetic training set; returns the artifact contents."""
+    np.random.seed(seed)
+    X = np.random.rand(n_samples, len(FEATURE_NAMES))
+    risk_scores = X @ TARGET_WEIGHTS * 100
+    labels = np.digitize(risk_scores, bins=[25, 50, 75])
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    classifier = RandomForestClassifier(n_estimators=100, max_depth=8, random_state=seed, n_jobs=-1)
+    classifier.fit(X_scaled, labels)
+    regressor = GradientBoostingRegressor(n_estimators=100, max_depth=5, random_state=seed)
+    regressor.fit(X_scaled, risk_scores)
+    # Only the classifier's feature importances are used at serving time
+    return {
+        "scaler": scaler,
+        "regressor": regressor,
+        "feature_importances": classifier.feature_importances_,
+        "metadata": {
+            "model_version": MODEL_VERSION,
+            "feature_names": FEATURE_NAMES,
+            "trained_at": datetime.utcnow().isoformat(),
+            "n_samples": n_samples,
+            "seed": seed,
+            "sklearn_version": sklearn.__version__,
+        },
+    }
+
+
+def save_artifact(artifact: Dict[str, Any], path: str) -> Dict[str, Any]:
+    """Write the artifact and its manifest (atomically each); returns the manifest."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    joblib.dump(artifact, tmp)
+    manifest = {**artifact["metadata"], "artifact": path.name, "sha256": file_sha256(tmp)}
+    os.replace(tmp, path)
+    tmp_manifest = tmp.with_suffix(".json")
+    tmp_manifest.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp_manifest, manifest_path(path))
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the risk model and write its artifact.")
+    parser.add_argument("--output", default=settings.RISK_MODEL_PATH, help="artifact path (default: RISK_MODEL_PATH)")
+    parser.add_argument("--samples", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    manifest = save_artifact(train_model(args.samples, args.seed), args.output)
+    logger.info(f"Risk model {manifest['model_version']} written to {args.output} (sha256 {manifest['sha256'][:12]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 from models.user import User
-from models.signal import Signal
-from models.risk_score import RiskScore
+from models.signal import Signal, SignalDailyAggregate
+from models.risk_score import RiskScore, RiskScoreRollup
 from models.recommendation import Recommendation
 from models.subscription import Subscription
 from models.category import Category
+from models.ingestion_state import IngestionWatermark, IngestionCursor, IngestionCommodityCursor, IngestedRecordHash
 
-__all__ = ["User", "Signal", "RiskScore", "Recommendation", "Subscription", "Category"]
+__all__ = [
+    "User", "Signal", "SignalDailyAggregate", "RiskScore", "RiskScoreRollup", "Recommendation", "Subscription", "Category",
+    "IngestionWatermark", "IngestionCursor", "IngestionCommodityCursor", "IngestedRecordHash",
+]
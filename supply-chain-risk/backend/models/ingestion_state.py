@@ -0,0 +1,45 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Enum as SQLEnum
+from database import Base
+from models.signal import SignalSource
+
+
+class IngestionWatermark(Base):
+    """Newest arrival date ingested per (source, commodity, state, market)."""
+    __tablename__ = "ingestion_watermarks"
+
+    source = Column(SQLEnum(SignalSource), primary_key=True)
+    commodity = Column(String(255), primary_key=True, default="")
+    state = Column(String(255), primary_key=True, default="")
+    market = Column(String(255), primary_key=True, default="")
+    last_arrival_date = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class IngestionCursor(Base):
+    """Per-source delta sync progress: when it last ran and how far it got."""
+    __tablename__ = "ingestion_cursors"
+
+    source = Column(SQLEnum(SignalSource), primary_key=True)
+    last_synced_at = Column(DateTime, nullable=False)
+    last_arrival_date = Column(DateTime, nullable=True)
+
+
+class IngestionCommodityCursor(Base):
+    """Per-commodity delta sync progress, for sources synced one commodity at a time (eNAM)."""
+    __tablename__ = "ingestion_commodity_cursors"
+
+    source = Column(SQLEnum(SignalSource), primary_key=True)
+    commodity = Column(String(255), primary_key=True)
+    last_synced_at = Column(DateTime, nullable=False)
+    last_arrival_date = Column(DateTime, nullable=True)
+
+
+class IngestedRecordHash(Base):
+    """Content hash of every record already written to `signals`, for de-duplication."""
+    __tablename__ = "ingested_record_hashes"
+
+    source = Column(SQLEnum(SignalSource), primary_key=True)
+    content_hash = Column(String(16), primary_key=True)
+    arrival_date = Column(DateTime, nullable=True, index=True)
+    first_seen_at = Column(DateTime, default=datetime.utcnow)
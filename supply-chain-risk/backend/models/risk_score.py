@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Float, DateTime, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, Float, Integer, DateTime, JSON, Enum as SQLEnum
 from database import Base
 import enum
 
@@ -9,6 +9,7 @@ class SupplyChainSegment(str, enum.Enum):
     PROCUREMENT = "procurement"
     TRANSPORT = "transport"
     IMPORT_EXPORT = "import_export"
+    OVERALL = "overall"
 
 
 class RiskLevel(str, enum.Enum):
@@ -32,3 +33,25 @@ class RiskScore(Base):
     model_version = Column(String(50), nullable=True)
     computed_at = Column(DateTime, default=datetime.utcnow, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class RollupGranularity(str, enum.Enum):
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+
+
+class RiskScoreRollup(Base):
+    """Scores aggregated per (granularity, category, bucket, segment), updated as each score is stored."""
+    __tablename__ = "risk_score_rollups"
+
+    granularity = Column(SQLEnum(RollupGranularity), primary_key=True)
+    category = Column(String(100), primary_key=True, default="")  # "" = platform-wide scores
+    bucket_start = Column(DateTime, primary_key=True)
+    segment = Column(SQLEnum(SupplyChainSegment), primary_key=True)
+    samples = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+    score_min = Column(Float, nullable=False)
+    score_max = Column(Float, nullable=False)
+    last_score = Column(Float, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
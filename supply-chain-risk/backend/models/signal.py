@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Float, DateTime, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, Float, Integer, Date, DateTime, JSON, Index, Enum as SQLEnum
 from database import Base
 import enum
 
@@ -15,14 +15,47 @@ class SignalSource(str, enum.Enum):
 
 class Signal(Base):
     __tablename__ = "signals"
+    # Keyset pagination on (timestamp, id) for each filter combination of /api/signals;
+    # they also cover single-column lookups on their leading column. (source, created_at)
+    # serves the snapshot reads and publish of services.signal_store and the delta view,
+    # which find and order a source's rows by ingestion time. Monthly range
+    # partitions on PostgreSQL (see services.signal_compaction) — the partition key
+    # has to be part of the primary key there.
+    __table_args__ = (
+        Index("ix_signals_timestamp_id", "timestamp", "id"),
+        Index("ix_signals_source_timestamp_id", "source", "timestamp", "id"),
+        Index("ix_signals_source_commodity_timestamp_id", "source", "commodity", "timestamp", "id"),
+        Index("ix_signals_source_region_timestamp_id", "source", "region", "timestamp", "id"),
+        Index("ix_signals_commodity_timestamp_id", "commodity", "timestamp", "id"),
+        Index("ix_signals_region_timestamp_id", "region", "timestamp", "id"),
+        Index("ix_signals_source_created_at", "source", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    source = Column(SQLEnum(SignalSource), nullable=False, index=True)
-    region = Column(String(255), nullable=True, index=True)
-    commodity = Column(String(255), nullable=True, index=True)
+    source = Column(SQLEnum(SignalSource), nullable=False)
+    region = Column(String(255), nullable=True)
+    commodity = Column(String(255), nullable=True)
     value = Column(Float, nullable=True)
     unit = Column(String(50), nullable=True)
     raw_data = Column(JSON, nullable=True)
     severity = Column(Float, default=0.0)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+
+
+class SignalDailyAggregate(Base):
+    """Per-day downsample of compacted signals per (source, commodity, region)."""
+    __tablename__ = "signal_daily_aggregates"
+
+    source = Column(SQLEnum(SignalSource), primary_key=True)
+    commodity = Column(String(255), primary_key=True, default="")
+    region = Column(String(255), primary_key=True, default="")
+    day = Column(Date, primary_key=True)
+    samples = Column(Integer, nullable=False, default=0)
+    value_samples = Column(Integer, nullable=False, default=0)
+    value_sum = Column(Float, nullable=True)
+    value_min = Column(Float, nullable=True)
+    value_max = Column(Float, nullable=True)
+    severity_sum = Column(Float, nullable=True)
+    severity_max = Column(Float, nullable=True)
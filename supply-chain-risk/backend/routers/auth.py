@@ -1,23 +1,23 @@
 """Auth Router"""
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 from schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse
 from models.user import User, SubscriptionTier
 from services.auth_service import (
-    create_user, authenticate_user, create_access_token,
-    get_current_user, get_required_user
+    create_user, authenticate_user, create_access_token, get_user_by_email,
+    get_current_user, get_required_user, set_subscription_tier
 )
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=TokenResponse)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == user_data.email).first()
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing = await get_user_by_email(db, user_data.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
-    user = create_user(db, user_data.email, user_data.password, user_data.full_name, user_data.company)
+    user = await create_user(user_data.email, user_data.password, user_data.full_name, user_data.company)
     token = create_access_token(data={"sub": str(user.id)})
     return TokenResponse(
         access_token=token,
@@ -26,8 +26,8 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(user_data: UserLogin, db: Session = Depends(get_db)):
-    user = authenticate_user(db, user_data.email, user_data.password)
+async def login(user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate_user(db, user_data.email, user_data.password)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     token = create_access_token(data={"sub": str(user.id)})
@@ -43,7 +43,6 @@ async def get_profile(user: User = Depends(get_required_user)):
 
 
 @router.post("/upgrade")
-async def upgrade_to_premium(user: User = Depends(get_required_user), db: Session = Depends(get_db)):
-    user.subscription_tier = SubscriptionTier.PAID
-    db.commit()
+async def upgrade_to_premium(user: User = Depends(get_required_user)):
+    await set_subscription_tier(user, SubscriptionTier.PAID)
     return {"message": "Upgraded to premium", "subscription_tier": "paid"}
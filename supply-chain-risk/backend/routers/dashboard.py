@@ -1,22 +1,24 @@
 """Dashboard & Risk API Router"""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from datetime import datetime, timedelta
-import random
 
-from database import get_db
+from config import settings
+from database import get_async_db
+from integrations.replay import sim_random
+from ml.risk_model import SupplyChainRiskModel
 from models.user import User
+from schemas.risk import BatchRiskScoreRequest
 from services.auth_service import get_current_user, is_premium_user
-from services.risk_service import compute_all_risk_scores, compute_category_risk
-from integrations.mandi_api import fetch_mandi_prices
-from integrations.enam_api import fetch_enam_prices
-from integrations.trade_api import fetch_trade_data
-from integrations.weather_api import fetch_weather_data
-from integrations.logistics_api import fetch_logistics_data
+from services.risk_service import compute_all_risk_scores, compute_category_risk, compute_risk_grid, score_feature_rows
+from services.risk_history import load_risk_trend
+from services.feed_fanout import fetch_feeds, FEED_FETCHERS
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
+# Stored mandi snapshots can hold the full daily resource; cap the markers plotted
+MAP_MAX_MANDI_POINTS = 100
+
 
 @router.get("/summary")
 async def get_dashboard_summary(user: Optional[User] = Depends(get_current_user)):
@@ -37,39 +39,53 @@ async def get_category_insights(category: str, user: Optional[User] = Depends(ge
     return await compute_category_risk(category)
 
 
+@router.post("/risk-scores/batch")
+async def score_risk_batch(request: BatchRiskScoreRequest, user: Optional[User] = Depends(get_current_user)):
+    if len(request.rows) > settings.RISK_BATCH_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.RISK_BATCH_MAX_ROWS} rows per batch")
+    unknown = {name for row in request.rows for name in row.features} - set(SupplyChainRiskModel.FEATURE_NAMES)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown features: {sorted(unknown)}. Choose from: {SupplyChainRiskModel.FEATURE_NAMES}")
+    rows = [row.model_dump(mode="json") for row in request.rows]
+    return {"scores": [{"segment": row["segment"], **score} for row, score in zip(rows, await score_feature_rows(rows))]}
+
+
+@router.get("/risk-grid")
+async def get_risk_grid(user: Optional[User] = Depends(get_current_user)):
+    # Every state x commodity x segment, scored in one model call
+    return await compute_risk_grid()
+
+
 @router.get("/signals")
-async def get_live_signals(source: Optional[str] = None, user: Optional[User] = Depends(get_current_user)):
-    result = {}
-    result["mandi"] = await fetch_mandi_prices()
-    result["enam"] = await fetch_enam_prices()
-    result["weather"] = await fetch_weather_data()
+async def get_live_signals(response: Response, source: Optional[str] = None, user: Optional[User] = Depends(get_current_user)):
     # For demo: always include trade and logistics data
-    result["trade"] = await fetch_trade_data()
-    result["logistics"] = await fetch_logistics_data()
-    if source and source in result:
-        return {source: result[source]}
-    return result
+    sources = [source] if source in FEED_FETCHERS else ["mandi", "enam", "weather", "trade", "logistics"]
+    fanout = await fetch_feeds(sources)
+    # The body is keyed by source, so late sources are reported in a header
+    if fanout["late_sources"]:
+        response.headers["X-Late-Sources"] = ",".join(fanout["late_sources"])
+    return fanout["feeds"]
 
 
 @router.get("/map-data")
 async def get_map_data(user: Optional[User] = Depends(get_current_user)):
-    weather = await fetch_weather_data()
-    logistics = await fetch_logistics_data()
-    mandi = await fetch_mandi_prices()
+    fanout = await fetch_feeds(["weather", "logistics", "mandi"])
+    weather, logistics, mandi = fanout["feeds"]["weather"], fanout["feeds"]["logistics"], fanout["feeds"]["mandi"]
+    rng = sim_random("map", "mandi_jitter")
     points = []
     for w in weather:
         risk_score = w.get("disruption_severity", 0) * 100
         points.append({"lat": w["lat"], "lng": w["lng"], "region": w["city"], "risk_score": round(risk_score, 1), "risk_level": _score_to_level(risk_score), "segment": "procurement", "details": {"weather": w["weather_main"], "temp": f"{w['temperature']}°C", "wind": f"{w['wind_speed']} m/s"}})
     state_coords = {"Maharashtra": (19.75, 75.71), "Uttar Pradesh": (26.85, 80.95), "Madhya Pradesh": (22.97, 78.66), "Rajasthan": (27.02, 74.22), "Gujarat": (22.26, 71.19), "Karnataka": (15.32, 75.71), "Tamil Nadu": (11.13, 78.66), "Andhra Pradesh": (15.91, 79.74), "Punjab": (31.15, 75.34), "West Bengal": (22.99, 87.86)}
-    for m in mandi:
+    for m in mandi[:MAP_MAX_MANDI_POINTS]:
         state = m.get("state", "")
         if state in state_coords:
             modal = m.get("modal_price", 0)
             max_p = m.get("max_price", 0)
             volatility = ((max_p - modal) / max_p * 100) if max_p > 0 else 0
             lat, lng = state_coords[state]
-            lat += random.uniform(-0.5, 0.5)
-            lng += random.uniform(-0.5, 0.5)
+            lat += rng.uniform(-0.5, 0.5)
+            lng += rng.uniform(-0.5, 0.5)
             points.append({"lat": lat, "lng": lng, "region": f"{m.get('market', state)}", "risk_score": round(min(volatility * 2, 100), 1), "risk_level": _score_to_level(min(volatility * 2, 100)), "segment": "procurement", "details": {"commodity": m.get("commodity"), "modal_price": f"₹{modal}", "market": m.get("market")}})
     corridors = []
     # For demo: always show corridors
@@ -80,24 +96,13 @@ async def get_map_data(user: Optional[User] = Depends(get_current_user)):
         if origin in city_coords and dest in city_coords:
             risk = l.get("congestion_level", 0) * 100
             corridors.append({"origin": {"name": origin, "lat": city_coords[origin][0], "lng": city_coords[origin][1]}, "destination": {"name": dest, "lat": city_coords[dest][0], "lng": city_coords[dest][1]}, "mode": l.get("mode", "road"), "delay": l.get("current_delay_hours", 0), "risk_level": _score_to_level(risk), "risk_score": round(risk, 1)})
-    return {"center": {"lat": 22.0, "lng": 78.0}, "zoom": 5, "points": points, "corridors": corridors}
+    return {"center": {"lat": 22.0, "lng": 78.0}, "zoom": 5, "points": points, "corridors": corridors, "late_sources": fanout["late_sources"]}
 
 
 @router.get("/risk-trend")
-async def get_risk_trend(days: int = 7):
-    import random
-    random.seed(42)
-    trend = []
-    base = {"overall": 42, "procurement": 38, "transport": 45, "import_export": 40}
-    for i in range(days):
-        date = (datetime.utcnow() - timedelta(days=days - i - 1)).strftime("%b %d")
-        entry = {"date": date}
-        for key in base:
-            base[key] += random.uniform(-5, 5)
-            base[key] = max(10, min(90, base[key]))
-            entry[key] = round(base[key], 1)
-        trend.append(entry)
-    return {"trend": trend}
+async def get_risk_trend(days: int = Query(7, ge=1, le=3650), category: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    # Served from pre-aggregated rollups: hourly up to 2 days, daily up to 90, weekly beyond
+    return await load_risk_trend(db, days, category)
 
 
 def _score_to_level(score):
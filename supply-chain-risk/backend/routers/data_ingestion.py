@@ -1,11 +1,18 @@
 """Data Ingestion Router — raw API data endpoints."""
 from fastapi import APIRouter, Query
-from typing import Optional
+from typing import List, Optional
 from integrations.mandi_api import fetch_mandi_prices
-from integrations.enam_api import fetch_enam_prices
-from integrations.trade_api import fetch_trade_data
+from integrations.enam_api import fetch_enam_prices, fetch_enam_batch
+from integrations.trade_api import fetch_trade_data, fetch_trade_batch
 from integrations.weather_api import fetch_weather_data
 from integrations.logistics_api import fetch_logistics_data
+from integrations.feed_cache import feed_cache, cache_flight, last_known_good
+from integrations.circuit_breaker import breaker_stats
+from integrations.http_client import upstream_flight
+from integrations.mandi_repository import mandi_repository
+from integrations.weather_api import weather_rate_limiter
+from services.compute_executor import get_compute_stats
+from services.ingestion_scheduler import get_ingestion_status
 
 router = APIRouter(prefix="/api/data", tags=["data"])
 
@@ -18,10 +25,18 @@ async def get_mandi_data(commodity: Optional[str] = None, state: Optional[str] =
 async def get_enam_data(commodity: Optional[str] = None, state: Optional[str] = None, limit: int = Query(50, le=200)):
     return await fetch_enam_prices(commodity=commodity, state=state, limit=limit)
 
+@router.get("/enam/batch")
+async def get_enam_batch(commodities: Optional[str] = None, states: Optional[str] = None, limit_per: int = Query(10, le=100)):
+    return await fetch_enam_batch(_split(commodities), _split(states), limit_per=limit_per)
+
 @router.get("/trade")
 async def get_trade_data_endpoint(commodity: Optional[str] = None, country: Optional[str] = None, limit: int = Query(50, le=200)):
     return await fetch_trade_data(commodity=commodity, country=country, limit=limit)
 
+@router.get("/trade/batch")
+async def get_trade_batch(commodities: Optional[str] = None, country: Optional[str] = None, limit_per: int = Query(10, le=100)):
+    return await fetch_trade_batch(_split(commodities), country=country, limit_per=limit_per)
+
 @router.get("/weather")
 async def get_weather_data_endpoint():
     return await fetch_weather_data()
@@ -29,3 +44,28 @@ async def get_weather_data_endpoint():
 @router.get("/logistics")
 async def get_logistics_data_endpoint(corridor_id: Optional[str] = None, mode: Optional[str] = None):
     return await fetch_logistics_data(corridor_id=corridor_id, mode=mode)
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    return {**feed_cache.stats(), "coalescing": {"cache_loads": cache_flight.stats(), "upstream_requests": upstream_flight.stats()}, "weather_rate_limit": weather_rate_limiter.stats(), "mandi_repository": mandi_repository.stats()}
+
+
+@router.get("/circuit-breakers")
+async def get_circuit_breakers():
+    return {"breakers": breaker_stats(), "last_known_good": last_known_good.stats()}
+
+
+@router.get("/ingestion-status")
+async def get_ingestion_status_endpoint():
+    return get_ingestion_status()
+
+
+@router.get("/compute-stats")
+async def get_compute_stats_endpoint():
+    return get_compute_stats()
+
+
+def _split(values: Optional[str]) -> Optional[List[str]]:
+    """Comma-separated query value → list (None when empty)."""
+    items = [v.strip() for v in (values or "").split(",") if v.strip()]
+    return items or None
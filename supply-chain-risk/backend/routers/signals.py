@@ -0,0 +1,40 @@
+"""Stored Signal History Router"""
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from database import get_db
+from models.signal import SignalSource
+from schemas.risk import SignalPage, SignalResponse
+from services.signal_store import query_signals
+
+router = APIRouter(prefix="/api/signals", tags=["signals"])
+
+
+@router.get("", response_model=SignalPage)
+def list_signals(
+    source: Optional[SignalSource] = None,
+    commodity: Optional[str] = None,
+    region: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_raw: bool = False,
+    db: Session = Depends(get_db),
+):
+    # Newest first; pass `next_cursor` back as `cursor` for the next page
+    try:
+        rows, next_cursor = query_signals(db, source, commodity, region, start, end, limit, cursor, include_raw)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    signals = [
+        SignalResponse(
+            id=row.id, source=row.source.value, region=row.region, commodity=row.commodity, value=row.value,
+            unit=row.unit, severity=row.severity or 0.0, timestamp=row.timestamp, created_at=row.created_at,
+            raw_data=row.raw_data if include_raw else None,
+        )
+        for row in rows
+    ]
+    return SignalPage(signals=signals, next_cursor=next_cursor)
@@ -32,19 +32,38 @@ class RiskScoreResponse(BaseModel):
         from_attributes = True
 
 
+class RiskScoreRow(BaseModel):
+    segment: SegmentEnum
+    region: Optional[str] = None
+    commodity: Optional[str] = None
+    features: Dict[str, float]
+
+
+class BatchRiskScoreRequest(BaseModel):
+    rows: List[RiskScoreRow]
+
+
 class SignalResponse(BaseModel):
     id: str
     source: str
     region: Optional[str] = None
     commodity: Optional[str] = None
     value: Optional[float] = None
+    unit: Optional[str] = None
     severity: float
     timestamp: datetime
+    created_at: Optional[datetime] = None
+    raw_data: Optional[Dict[str, Any]] = None
 
     class Config:
         from_attributes = True
 
 
+class SignalPage(BaseModel):
+    signals: List[SignalResponse]
+    next_cursor: Optional[str] = None
+
+
 class RecommendationResponse(BaseModel):
     id: str
     segment: str
@@ -1,15 +1,17 @@
 """
 Authentication Service
 """
+import asyncio
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from config import settings
-from database import get_db
+from database import get_async_db, run_write_async
 from models.user import User, SubscriptionTier
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -28,21 +30,34 @@ def create_access_token(data: dict, expires_delta=None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
-def create_user(db: Session, email, password, full_name=None, company=None):
-    hashed = get_password_hash(password)
+async def get_user_by_email(db: AsyncSession, email) -> Optional[User]:
+    return (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
+
+async def create_user(email, password, full_name=None, company=None):
+    # bcrypt is deliberately slow — hash off the event loop
+    hashed = await asyncio.to_thread(get_password_hash, password)
     user = User(email=email, hashed_password=hashed, full_name=full_name, company=company, subscription_tier=SubscriptionTier.FREE)
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
 
-def authenticate_user(db: Session, email, password):
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.hashed_password):
+    def _insert(db):
+        db.add(user)
+        db.flush()
+        return user
+
+    return await run_write_async(_insert)
+
+async def set_subscription_tier(user: User, tier: SubscriptionTier):
+    await run_write_async(lambda db: db.query(User).filter(User.id == user.id).update(
+        {User.subscription_tier: tier, User.updated_at: datetime.utcnow()}, synchronize_session=False
+    ))
+    user.subscription_tier = tier
+
+async def authenticate_user(db: AsyncSession, email, password):
+    user = await get_user_by_email(db, email)
+    if not user or not await asyncio.to_thread(verify_password, password, user.hashed_password):
         return None
     return user
 
-async def get_current_user(token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Optional[User]:
+async def get_current_user(token: Optional[str] = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> Optional[User]:
     if not token:
         return None
     try:
@@ -50,12 +65,11 @@ async def get_current_user(token: Optional[str] = Depends(oauth2_scheme), db: Se
         user_id = payload.get("sub")
         if user_id is None:
             return None
-        user = db.query(User).filter(User.id == user_id).first()
-        return user
+        return await db.get(User, user_id)
     except JWTError:
         return None
 
-async def get_required_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_required_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> User:
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     user = await get_current_user(token, db)
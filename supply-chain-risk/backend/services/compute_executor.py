@@ -0,0 +1,125 @@
+"""
+Compute Executor — runs CPU-bound model and feature stages off the event
+loop, so one heavy risk computation never stalls the other connections of
+a worker.
+
+Stages run on a thread pool: feature math, scaler transform and regressor
+predict are NumPy / scikit-learn work that releases the GIL in its inner
+loops, and bottleneck detection is too short to repay shipping its input
+to another process. The pool caps queued + running jobs; when full it
+rejects new work with ComputeSaturatedError (served as 503) instead of
+queueing without bound. Per-stage latency (queue wait and run
+time) is kept for `/api/data/compute-stats`.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ComputeSaturatedError(Exception):
+    """Raised instead of queueing work on a pool that is at its pending limit."""
+
+    def __init__(self, pool: str, limit: int):
+        super().__init__(f"compute pool '{pool}' is saturated ({limit} jobs pending)")
+        self.pool = pool
+        self.limit = limit
+
+
+def _timed(fn: Callable, *args) -> tuple:
+    """Run `fn` in the worker and report its run time."""
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+class ComputePool:
+    """A lazily started thread pool with a pending-jobs cap and per-stage metrics."""
+
+    def __init__(self, name: str, workers: int, max_pending: int):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._stages: Dict[str, Dict[str, float]] = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix=f"compute-{self.name}")
+        return self._executor
+
+    async def run(self, stage: str, fn: Callable, *args) -> Any:
+        """Run `fn(*args)` on the pool; raises ComputeSaturatedError when the pool is full."""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ComputeSaturatedError(self.name, self.max_pending)
+        # Only touched from the event loop thread, so no lock is needed
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        submitted = time.perf_counter()
+        try:
+            run_seconds, result = await asyncio.get_running_loop().run_in_executor(self._get_executor(), _timed, fn, *args)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+        self.completed += 1
+        self._record(stage, time.perf_counter() - submitted, run_seconds)
+        return result
+
+    def _record(self, stage: str, total: float, run: float):
+        s = self._stages.setdefault(stage, {"calls": 0, "run_ms": 0.0, "wait_ms": 0.0, "max_total_ms": 0.0})
+        s["calls"] += 1
+        s["run_ms"] += run * 1000
+        s["wait_ms"] += max(total - run, 0.0) * 1000
+        s["max_total_ms"] = max(s["max_total_ms"], total * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        stages = {
+            name: {
+                "calls": s["calls"],
+                "avg_run_ms": round(s["run_ms"] / s["calls"], 2),
+                "avg_wait_ms": round(s["wait_ms"] / s["calls"], 2),
+                "max_total_ms": round(s["max_total_ms"], 2),
+            }
+            for name, s in self._stages.items()
+        }
+        return {
+            "workers": self.workers, "started": self._executor is not None,
+            "pending": self.pending, "peak_pending": self.peak_pending, "max_pending": self.max_pending,
+            "completed": self.completed, "failed": self.failed, "rejected": self.rejected, "stages": stages,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+thread_pool = ComputePool("thread", settings.COMPUTE_THREAD_WORKERS, settings.COMPUTE_THREAD_MAX_PENDING)
+
+
+async def run_in_thread_pool(stage: str, fn: Callable, *args) -> Any:
+    """Offload GIL-releasing NumPy / scikit-learn work."""
+    if not settings.COMPUTE_EXECUTOR_ENABLED:
+        return fn(*args)
+    return await thread_pool.run(stage, fn, *args)
+
+
+def get_compute_stats() -> Dict[str, Any]:
+    return {"enabled": settings.COMPUTE_EXECUTOR_ENABLED, "pools": {"thread": thread_pool.stats()}}
+
+
+def shutdown_compute_pools():
+    thread_pool.shutdown()
@@ -0,0 +1,236 @@
+"""
+Delta Ingestion — stores only mandi/eNAM records we have not stored before.
+
+For the sources in DELTA_INGESTION_SOURCES (mandi only while the bulk
+snapshot sync is off) each run:
+  * asks data.gov.in only for arrival dates from the last high-water mark
+    onward (the API filters on exact values, so one paged sweep per date)
+    — a full sweep only when there is no usable mark. Mandi keeps one mark
+    for the resource; eNAM is swept per commodity in ENAM_COMMODITIES, each
+    with its own mark,
+  * drops rows older than the `arrival_date` high-water mark of their
+    (commodity, state, market),
+  * de-duplicates the rest by a 64-bit content hash, within the batch and
+    against every record already written.
+
+Sync bandwidth and Signal writes therefore follow the amount of new data.
+Readers of a delta source get the most recently ingested rows, and
+freshness is the time of the last completed sync rather than of the
+newest row.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from config import settings
+from database import SessionLocal, run_write
+from integrations.mandi_frame import ARRIVAL_DATE_FORMAT
+from models.ingestion_state import IngestionWatermark, IngestionCursor, IngestionCommodityCursor, IngestedRecordHash
+from models.signal import Signal, SignalSource
+from services.signal_writer import signal_rows, insert_signal_rows
+
+logger = logging.getLogger(__name__)
+
+# (series key fields, arrival-date field) per source
+DELTA_KEYS = {
+    "mandi": (("commodity", "state", "market"), "arrival_date"),
+    "enam": (("commodity", "state", "apmc"), "trade_date"),
+}
+# Fields that change on every fetch without the record itself changing
+VOLATILE_FIELDS = ("timestamp",)
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+_HASH_QUERY_CHUNK = 500
+
+WatermarkKey = Tuple[str, str, str]
+
+
+def is_delta_source(source: str) -> bool:
+    """Whether `source` is synced (and read) incrementally. The mandi bulk sync takes precedence."""
+    if source == "mandi" and settings.MANDI_BULK_SYNC_ENABLED:
+        return False
+    return settings.DELTA_INGESTION_ENABLED and source in settings.DELTA_INGESTION_SOURCES and source in DELTA_KEYS
+
+
+def content_hashes(frame: pd.DataFrame) -> pd.Series:
+    """Stable 16-hex-digit hash of each row's content (volatile fields excluded)."""
+    content = frame.drop(columns=[c for c in VOLATILE_FIELDS if c in frame.columns])
+    content = content[sorted(content.columns)].astype(object)
+    return pd.util.hash_pandas_object(content, index=False).map("{:016x}".format)
+
+
+class DeltaWriter:
+    """Filters and writes one source's records incrementally. Blocking — use from a worker thread."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.key_fields, self.date_field = DELTA_KEYS[source]
+        self.written = 0
+        self.skipped = 0
+        db = SessionLocal()
+        try:
+            rows = db.query(IngestionWatermark).filter(IngestionWatermark.source == SignalSource(source)).all()
+            self.watermarks: Dict[WatermarkKey, datetime] = {
+                (r.commodity, r.state, r.market): r.last_arrival_date for r in rows
+            }
+        finally:
+            db.close()
+
+    def write(self, records: List[Dict[str, Any]], ingested_at: datetime) -> int:
+        """Write the records that are new; returns how many were written."""
+        if not records:
+            return 0
+        frame = pd.DataFrame.from_records(records)
+        for field in (*self.key_fields, self.date_field):
+            if field not in frame:
+                frame[field] = ""
+        keys: List[WatermarkKey] = list(zip(*(frame[f].fillna("").astype(str) for f in self.key_fields)))
+        arrival = pd.to_datetime(frame[self.date_field], format=ARRIVAL_DATE_FORMAT, errors="coerce")
+        marks = pd.to_datetime(pd.Series([self.watermarks.get(k) for k in keys], index=frame.index, dtype=object))
+        hashes = content_hashes(frame)
+
+        keep = (arrival.isna() | marks.isna() | (arrival >= marks)) & ~hashes.duplicated()
+        keep &= ~hashes.isin(self._known_hashes(hashes[keep].tolist()))
+        kept = np.flatnonzero(keep.to_numpy())
+        self.skipped += len(records) - len(kept)
+        if not len(kept):
+            return 0
+
+        arrival_dates = [None if pd.isna(a) else a.to_pydatetime() for a in arrival]
+        advanced: Dict[WatermarkKey, datetime] = {}
+        for i in kept:
+            a = arrival_dates[i]
+            if a is not None and a > advanced.get(keys[i], self.watermarks.get(keys[i]) or datetime.min):
+                advanced[keys[i]] = a
+
+        source = SignalSource(self.source)
+        rows = signal_rows(self.source, [records[i] for i in kept], ingested_at)
+        hash_rows = [
+            {"source": source, "content_hash": hashes.iat[i], "arrival_date": arrival_dates[i], "first_seen_at": ingested_at}
+            for i in kept
+        ]
+        marks_rows = [
+            {"source": source, "commodity": k[0], "state": k[1], "market": k[2], "last_arrival_date": a, "updated_at": ingested_at}
+            for k, a in advanced.items()
+        ]
+
+        def _write(db):
+            insert_signal_rows(db.connection(), rows)
+            db.bulk_insert_mappings(IngestedRecordHash, hash_rows)
+            db.bulk_insert_mappings(IngestionWatermark, [m for m, k in zip(marks_rows, advanced) if k not in self.watermarks])
+            db.bulk_update_mappings(IngestionWatermark, [m for m, k in zip(marks_rows, advanced) if k in self.watermarks])
+
+        run_write(_write)
+
+        self.watermarks.update(advanced)
+        self.written += len(kept)
+        return len(kept)
+
+    def _known_hashes(self, hashes: List[str]) -> set:
+        known = set()
+        db = SessionLocal()
+        try:
+            for start in range(0, len(hashes), _HASH_QUERY_CHUNK):
+                chunk = hashes[start:start + _HASH_QUERY_CHUNK]
+                rows = db.query(IngestedRecordHash.content_hash).filter(
+                    IngestedRecordHash.source == SignalSource(self.source),
+                    IngestedRecordHash.content_hash.in_(chunk),
+                ).all()
+                known.update(row.content_hash for row in rows)
+        finally:
+            db.close()
+        return known
+
+    def finish(self, synced_at: datetime, complete: bool = True):
+        """
+        Record the sync in the source's cursor and prune old hashes. The
+        cursor's arrival mark only advances after a complete run, so rows
+        from pages that failed are requested again next time.
+        """
+        source = SignalSource(self.source)
+
+        def _finish(db):
+            cursor = db.get(IngestionCursor, source) or IngestionCursor(source=source)
+            cursor.last_synced_at = synced_at
+            if complete and self.watermarks:
+                cursor.last_arrival_date = max(self.watermarks.values())
+            db.merge(cursor)
+            if cursor.last_arrival_date is not None:
+                cutoff = cursor.last_arrival_date - timedelta(days=settings.DELTA_HASH_RETENTION_DAYS)
+                db.query(IngestedRecordHash).filter(
+                    IngestedRecordHash.source == source, IngestedRecordHash.arrival_date < cutoff
+                ).delete(synchronize_session=False)
+
+        run_write(_finish)
+
+    def finish_commodity(self, commodity: str, synced_at: datetime, complete: bool):
+        """Record one commodity's sweep; its arrival mark only advances after a complete sweep."""
+        source = SignalSource(self.source)
+        marks = [mark for key, mark in self.watermarks.items() if key[0] == commodity]
+
+        def _finish(db):
+            cursor = db.get(IngestionCommodityCursor, (source, commodity)) or IngestionCommodityCursor(source=source, commodity=commodity)
+            cursor.last_synced_at = synced_at
+            if complete and marks:
+                cursor.last_arrival_date = max(marks)
+            db.merge(cursor)
+
+        run_write(_finish)
+
+
+def load_commodity_marks(source: str) -> Dict[str, Optional[datetime]]:
+    """Arrival mark of each commodity's last complete sweep of a source."""
+    db = SessionLocal()
+    try:
+        rows = db.query(IngestionCommodityCursor).filter(IngestionCommodityCursor.source == SignalSource(source)).all()
+        return {r.commodity: r.last_arrival_date for r in rows}
+    finally:
+        db.close()
+
+
+def load_cursor(source: str) -> Optional[IngestionCursor]:
+    db = SessionLocal()
+    try:
+        return db.get(IngestionCursor, SignalSource(source))
+    finally:
+        db.close()
+
+
+def delta_date_filters(mark: Optional[datetime]) -> List[Dict[str, str]]:
+    """
+    data.gov.in filters for each arrival date from `mark` up to today, or
+    [{}] (one full sweep) when there is no mark or it is older than
+    DELTA_MAX_LOOKBACK_DAYS.
+    """
+    if mark is None:
+        return [{}]
+    start = mark.date()
+    today = datetime.utcnow().date()
+    if (today - start).days > settings.DELTA_MAX_LOOKBACK_DAYS:
+        return [{}]
+    days = range((today - start).days + 1)
+    return [{"filters[arrival_date]": (start + timedelta(days=d)).strftime(ARRIVAL_DATE_FORMAT)} for d in days]
+
+
+def load_delta_view(source: str, max_age_seconds: float, limit: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    The `limit` most recently ingested records of a delta source, or None
+    when it has never synced or its last sync is older than `max_age_seconds`.
+    Blocking.
+    """
+    db = SessionLocal()
+    try:
+        cursor = db.get(IngestionCursor, SignalSource(source))
+        if cursor is None or cursor.last_synced_at < datetime.utcnow() - timedelta(seconds=max_age_seconds):
+            return None
+        rows = (
+            db.query(Signal.raw_data)
+            .filter(Signal.source == SignalSource(source))
+            .order_by(Signal.created_at.desc())
+            .limit(limit)
+            .all()
+        )
+        return [row.raw_data for row in rows if row.raw_data]
+    finally:
+        db.close()
@@ -0,0 +1,98 @@
+"""
+Feed Fan-out — fetches the upstream feeds concurrently.
+
+Request latency becomes the slowest feed (bounded by its budget) instead of
+the sum of all five round-trips. Each source gets its own time budget and
+the whole fan-out is capped by an overall deadline; sources that miss their
+budget come back empty and are listed in `late_sources`.
+
+When background ingestion is enabled, a source is served from its latest
+stored snapshot and upstream is only called if no recent snapshot exists.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from config import settings
+from integrations.mandi_api import fetch_mandi_prices
+from integrations.enam_api import fetch_enam_prices
+from integrations.trade_api import fetch_trade_data
+from integrations.weather_api import fetch_weather_data
+from integrations.logistics_api import fetch_logistics_data
+from services.delta_ingestion import is_delta_source, load_delta_view
+from services.signal_store import load_latest_snapshot, ingestion_interval
+
+logger = logging.getLogger(__name__)
+
+FeedFetcher = Callable[[], Awaitable[List[Dict[str, Any]]]]
+
+FEED_FETCHERS: Dict[str, FeedFetcher] = {
+    "mandi": fetch_mandi_prices,
+    "enam": fetch_enam_prices,
+    "trade": fetch_trade_data,
+    "weather": fetch_weather_data,
+    "logistics": fetch_logistics_data,
+}
+
+
+async def _snapshot_or_live(source: str, fetcher: FeedFetcher) -> List[Dict[str, Any]]:
+    interval = ingestion_interval(source)
+    if settings.INGESTION_ENABLED and interval:
+        try:
+            max_age = interval * settings.SNAPSHOT_MAX_AGE_FACTOR
+            loader = load_delta_view if is_delta_source(source) else load_latest_snapshot
+            snapshot = await asyncio.to_thread(loader, source, max_age, settings.SNAPSHOT_MAX_RECORDS)
+            if snapshot:
+                return snapshot
+        except Exception as e:
+            logger.warning(f"Snapshot read for '{source}' failed, fetching live: {type(e).__name__}: {e}")
+    return await fetcher()
+
+
+async def fetch_feeds(
+    sources: Optional[Iterable[str]] = None,
+    overrides: Optional[Dict[str, FeedFetcher]] = None,
+    deadline: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Fetch the requested feeds concurrently.
+
+    `overrides` replaces the default fetcher for a source (e.g. a category's
+    commodity-filtered mandi query). Returns
+    {"feeds": {source: records}, "late_sources": [...], "failed_sources": [...]}
+    where late or failed sources map to an empty list.
+    """
+    overrides = overrides or {}
+    selected = list(sources) if sources is not None else list(FEED_FETCHERS)
+    deadline = deadline if deadline is not None else settings.FANOUT_DEADLINE_SECONDS
+
+    tasks = {}
+    for source in selected:
+        budget = min(settings.FEED_BUDGET_SECONDS.get(source, deadline), deadline)
+        if source in overrides:
+            coro = overrides[source]()
+        else:
+            coro = _snapshot_or_live(source, FEED_FETCHERS[source])
+        tasks[source] = asyncio.create_task(asyncio.wait_for(coro, timeout=budget))
+
+    _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    for task in pending:
+        task.cancel()
+
+    feeds, late, failed = {}, [], []
+    for source, task in tasks.items():
+        feeds[source] = []
+        if task in pending:
+            late.append(source)
+            continue
+        try:
+            feeds[source] = task.result()
+        except asyncio.TimeoutError:
+            late.append(source)
+        except Exception as e:
+            logger.error(f"Feed '{source}' failed during fan-out: {type(e).__name__}: {e}")
+            failed.append(source)
+
+    if late:
+        logger.warning(f"Fan-out returned partial results; late sources: {', '.join(late)}")
+    return {"feeds": feeds, "late_sources": late, "failed_sources": failed}
@@ -0,0 +1,235 @@
+"""
+Ingestion Scheduler — pulls each upstream feed on its own cadence and stores
+it in the Signal table, so read endpoints serve the latest snapshot from the
+DB instead of calling upstream inside the request.
+
+Each feed is an APScheduler interval job with jitter (so feeds and workers
+don't fire in lock-step), `max_instances=1` so a slow run is never
+overlapped by the next one, and a per-job status record for reporting.
+With MANDI_BULK_SYNC_ENABLED the mandi job walks the whole resource page by
+page instead of pulling the first 50 records. Sources in
+DELTA_INGESTION_SOURCES are synced incrementally (see delta_ingestion).
+The same scheduler runs the signal compaction and columnar archive export
+jobs (see signal_compaction, signal_archive).
+
+With several app workers only the holder of the ingestion leader lock
+(see leader_lock) runs the scheduler; the others retry every
+INGESTION_LEADER_RETRY_SECONDS and take over when the leader exits.
+"""
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from config import settings
+from integrations.enam_api import ENAM_COMMODITIES, normalize_enam_frame
+from integrations.feed_cache import is_fallback
+from integrations.mandi_frame import frame_to_records
+from integrations.mandi_repository import iter_mandi_pages, mandi_repository
+from services.delta_ingestion import DeltaWriter, is_delta_source, load_commodity_marks, load_cursor, delta_date_filters
+from services.feed_fanout import FEED_FETCHERS
+from services.leader_lock import LeaderLock
+from services.risk_history import get_history_status
+from services.signal_archive import run_archive_job, get_archive_status
+from services.signal_compaction import run_compaction_job, get_compaction_status
+from services.signal_writer import SignalBatcher
+from services.signal_store import save_snapshot, publish_snapshot, staging_timestamp, ingestion_interval
+
+logger = logging.getLogger(__name__)
+
+_scheduler: Optional[AsyncIOScheduler] = None
+_leader = LeaderLock("ingestion")
+_standby_task: Optional[asyncio.Task] = None
+_job_status: Dict[str, Dict[str, Any]] = {}
+
+
+async def _sync_mandi_bulk(status: Dict[str, Any]):
+    """Stream every page of the mandi resource into a staged snapshot, publish it and have the repository reload it."""
+    snapshot_at = datetime.utcnow()
+    staged_at = staging_timestamp(snapshot_at)
+    page_stats: Dict[str, Any] = {}
+    batcher = SignalBatcher("mandi", staged_at)
+    async for page in iter_mandi_pages(stats=page_stats):
+        if not page.empty:
+            await batcher.add(frame_to_records(page))
+    await batcher.flush()
+    published = await asyncio.to_thread(publish_snapshot, "mandi", staged_at, snapshot_at)
+    mandi_repository.expire()
+    status.update(
+        status="ok" if not page_stats["failed_pages"] else "partial",
+        records=published, pages=page_stats["pages"], failed_pages=page_stats["failed_pages"],
+        upstream_total=page_stats["total"], error=None, last_success_at=datetime.utcnow().isoformat(),
+    )
+
+
+async def _sweep_delta_pages(writer: DeltaWriter, mark: Optional[datetime], synced_at: datetime,
+                             to_records: Callable, filters: Optional[Dict[str, str]] = None) -> Tuple[int, int]:
+    """Page through every arrival date since `mark` and write the new records; returns (pages, failed pages)."""
+    pages = failed_pages = 0
+    for date_filters in delta_date_filters(mark):
+        page_stats: Dict[str, Any] = {}
+        async for page in iter_mandi_pages(filters={**date_filters, **(filters or {})}, stats=page_stats):
+            if not page.empty:
+                await asyncio.to_thread(writer.write, to_records(page), synced_at)
+        pages += page_stats["pages"]
+        failed_pages += page_stats["failed_pages"]
+    return pages, failed_pages
+
+
+async def _sync_delta(source: str, status: Dict[str, Any]):
+    """Write only new records, asking upstream only for arrival dates since the last mark."""
+    synced_at = datetime.utcnow()
+    writer = await asyncio.to_thread(DeltaWriter, source)
+    pages = failed_pages = 0
+    if source == "mandi":
+        cursor = await asyncio.to_thread(load_cursor, source)
+        pages, failed_pages = await _sweep_delta_pages(writer, cursor and cursor.last_arrival_date, synced_at, frame_to_records)
+    else:
+        # eNAM projects the mandi resource; each commodity is swept down to its own mark
+        marks = await asyncio.to_thread(load_commodity_marks, source)
+        for commodity in ENAM_COMMODITIES:
+            try:
+                swept, failed = await _sweep_delta_pages(
+                    writer, marks.get(commodity), synced_at, normalize_enam_frame, {"filters[commodity]": commodity}
+                )
+            except Exception as e:
+                swept, failed = 0, 1
+                logger.warning(f"Delta sync of {source} '{commodity}' failed: {type(e).__name__}: {e}")
+            await asyncio.to_thread(writer.finish_commodity, commodity, synced_at, failed == 0)
+            pages += swept
+            failed_pages += failed
+    await asyncio.to_thread(writer.finish, synced_at, failed_pages == 0)
+    status.update(
+        status="ok" if not failed_pages else "partial",
+        records=writer.written, duplicates_skipped=writer.skipped, pages=pages, failed_pages=failed_pages,
+        error=None, last_success_at=datetime.utcnow().isoformat(),
+    )
+
+
+async def ingest_feed(source: str):
+    """Fetch one feed from upstream (bypassing the response cache) and store it."""
+    status = _job_status.setdefault(source, {"runs": 0, "failures": 0})
+    if status.get("running"):
+        logger.warning(f"Ingestion for '{source}' still running — skipping overlapping run")
+        return
+    status.update(running=True, last_run_at=datetime.utcnow().isoformat())
+    started = time.perf_counter()
+    try:
+        if is_delta_source(source):
+            await _sync_delta(source, status)
+            return
+        if source == "mandi" and settings.MANDI_BULK_SYNC_ENABLED:
+            await _sync_mandi_bulk(status)
+            return
+        fetcher = FEED_FETCHERS[source]
+        records = await getattr(fetcher, "uncached", fetcher)()
+        if is_fallback(records) or not records:
+            # Keep serving the previous snapshot rather than persisting static fallback rows
+            status.update(status="skipped_fallback", records=0, error=None)
+        else:
+            written = await asyncio.to_thread(save_snapshot, source, records)
+            status.update(status="ok", records=written, error=None, last_success_at=datetime.utcnow().isoformat())
+    except Exception as e:
+        status["failures"] += 1
+        status.update(status="error", error=f"{type(e).__name__}: {e}")
+        logger.error(f"Ingestion for '{source}' failed: {type(e).__name__}: {e}")
+    finally:
+        status["runs"] += 1
+        status["running"] = False
+        status["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def start_ingestion_scheduler():
+    """
+    Start the scheduler if this process takes the leader lock, else stand
+    by and retry it in the background (called on app startup).
+    """
+    global _standby_task
+    if _scheduler is not None or _standby_task is not None:
+        return
+    if not settings.INGESTION_LEADER_LOCK or _leader.try_acquire():
+        _start_scheduler()
+    else:
+        logger.info("Ingestion runs in another process; standing by")
+        _standby_task = asyncio.create_task(_wait_for_leadership())
+
+
+async def _wait_for_leadership():
+    global _standby_task
+    while not await asyncio.to_thread(_leader.try_acquire):
+        await asyncio.sleep(settings.INGESTION_LEADER_RETRY_SECONDS)
+    _standby_task = None
+    logger.info("Took over the ingestion leader lock")
+    _start_scheduler()
+
+
+def _start_scheduler():
+    """Register one interval job per feed and start the scheduler."""
+    global _scheduler
+    _scheduler = AsyncIOScheduler()
+    jitter = settings.INGESTION_JITTER_SECONDS
+    for source in settings.INGESTION_INTERVAL_SECONDS:
+        interval = ingestion_interval(source)
+        _job_status.setdefault(source, {"runs": 0, "failures": 0, "status": "pending"})
+        _job_status[source]["interval_seconds"] = interval
+        _scheduler.add_job(
+            ingest_feed,
+            IntervalTrigger(seconds=interval, jitter=jitter),
+            args=[source],
+            id=f"ingest_{source}",
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=interval,
+            # Stagger the first runs so startup doesn't burst every upstream at once
+            next_run_time=datetime.now() + timedelta(seconds=random.uniform(0, jitter)),
+        )
+    if settings.SIGNAL_COMPACTION_ENABLED:
+        _scheduler.add_job(
+            run_compaction_job,
+            IntervalTrigger(seconds=settings.SIGNAL_COMPACTION_INTERVAL_SECONDS, jitter=jitter),
+            id="signal_compaction",
+            max_instances=1,
+            coalesce=True,
+            next_run_time=datetime.now() + timedelta(seconds=jitter + random.uniform(0, jitter)),
+        )
+    if settings.SIGNAL_ARCHIVE_ENABLED:
+        _scheduler.add_job(
+            run_archive_job,
+            IntervalTrigger(seconds=settings.SIGNAL_ARCHIVE_INTERVAL_SECONDS, jitter=jitter),
+            id="signal_archive",
+            max_instances=1,
+            coalesce=True,
+            next_run_time=datetime.now() + timedelta(seconds=jitter + random.uniform(0, jitter)),
+        )
+    _scheduler.start()
+    logger.info(f"Ingestion scheduler started for: {', '.join(settings.INGESTION_INTERVAL_SECONDS)}")
+
+
+def stop_ingestion_scheduler():
+    global _scheduler, _standby_task
+    if _standby_task is not None:
+        _standby_task.cancel()
+        _standby_task = None
+    if _scheduler is not None:
+        _scheduler.shutdown(wait=False)
+        _scheduler = None
+    _leader.release()
+
+
+def get_ingestion_status() -> Dict[str, Any]:
+    """Last-run status per feed job, plus the next scheduled run time."""
+    jobs = {}
+    for source, status in _job_status.items():
+        job = _scheduler.get_job(f"ingest_{source}") if _scheduler else None
+        next_run = job.next_run_time.isoformat() if job and job.next_run_time else None
+        jobs[source] = {**status, "next_run_at": next_run}
+    return {
+        "enabled": settings.INGESTION_ENABLED, "running": _scheduler is not None, "leader": _leader.held, "jobs": jobs,
+        "compaction": get_compaction_status(),
+        "archive": get_archive_status(),
+        "risk_history": get_history_status(),
+    }
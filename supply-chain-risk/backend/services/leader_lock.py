@@ -0,0 +1,87 @@
+"""
+Leader Lock — lets exactly one app process run the background scheduler.
+
+Every uvicorn / gunicorn worker runs the startup hook. Without a lock each
+would ingest and publish every snapshot, and the workers would race each
+other in publish_snapshot's staged `created_at` UPDATE. The process that
+takes the lock is the leader until it exits:
+
+  * PostgreSQL: a session-level advisory lock, held on a dedicated
+    connection (released when that connection closes).
+  * SQLite: an exclusive `flock` on a `<database>.<name>.lock` file next
+    to the database (released by the OS when the process dies).
+
+Other databases, in-memory SQLite and platforms without `fcntl` have one
+process by construction or no shared lock to take, so there the lock
+always succeeds.
+"""
+import hashlib
+import logging
+import os
+from typing import Any, Optional
+from sqlalchemy import text
+
+from database import engine
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLock:
+    """A non-blocking, process-wide lock named `name`. Blocking I/O — call off the event loop after startup."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.held = False
+        self._handle: Optional[Any] = None
+
+    def try_acquire(self) -> bool:
+        """Take the lock if no other process holds it; True if this process holds it now."""
+        if self.held:
+            return True
+        dialect = engine.dialect.name
+        if dialect == "postgresql":
+            self.held = self._try_advisory_lock()
+        elif dialect == "sqlite":
+            self.held = self._try_lock_file()
+        else:
+            self.held = True
+        return self.held
+
+    def release(self):
+        if self._handle is not None:
+            self._handle.close()  # closing the connection / file drops the lock
+            self._handle = None
+        self.held = False
+
+    def _try_advisory_lock(self) -> bool:
+        key = int.from_bytes(hashlib.sha256(self.name.encode()).digest()[:8], "big", signed=True)
+        conn = engine.connect()
+        try:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        if not acquired:
+            conn.close()
+            return False
+        self._handle = conn
+        return True
+
+    def _try_lock_file(self) -> bool:
+        database = engine.url.database
+        if fcntl is None or not database or database == ":memory:":
+            return True
+        handle = open(f"{os.path.abspath(database)}.{self.name}.lock", "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._handle = handle
+        return True
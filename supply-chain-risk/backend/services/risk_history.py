@@ -0,0 +1,136 @@
+"""
+Risk History — stores every computed risk score and serves the risk trend.
+
+Each score is written to `risk_scores` and folded into hourly, daily and
+weekly rows of `risk_score_rollups` (sample count, sum, min, max, last) in
+the same transaction, with an INSERT ... ON CONFLICT DO UPDATE per bucket.
+The trend endpoint reads only rollup rows at a granularity chosen from the
+requested window, so it never scans score history: a 365-day trend reads
+at most 53 weekly buckets per segment.
+
+Dashboard reads store their scores through `store_risk_scores`, which
+never fails the request: a failed write is logged and counted under
+`/api/data/ingestion-status`.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import case, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database import engine, run_write_async
+from models.risk_score import RiskScore, RiskScoreRollup, RiskLevel, RollupGranularity, SupplyChainSegment
+
+# Widest window (days) served from each granularity; anything longer reads weekly rows
+TREND_GRANULARITY_DAYS = ((RollupGranularity.HOUR, 2), (RollupGranularity.DAY, 90))
+_TREND_LABELS = {RollupGranularity.HOUR: "%b %d %H:00", RollupGranularity.DAY: "%b %d", RollupGranularity.WEEK: "%b %d"}
+_ROLLUP_KEY = ("granularity", "category", "bucket_start", "segment")
+
+logger = logging.getLogger(__name__)
+
+_history_status: Dict[str, Any] = {"writes": 0, "failed_writes": 0, "last_error": None}
+
+
+def bucket_start(ts: datetime, granularity: RollupGranularity) -> datetime:
+    """Start of the hour, day or (Monday-based) week containing `ts`."""
+    if granularity == RollupGranularity.HOUR:
+        return ts.replace(minute=0, second=0, microsecond=0)
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    return day if granularity == RollupGranularity.DAY else day - timedelta(days=day.weekday())
+
+
+def trend_granularity(days: int) -> RollupGranularity:
+    for granularity, max_days in TREND_GRANULARITY_DAYS:
+        if days <= max_days:
+            return granularity
+    return RollupGranularity.WEEK
+
+
+def _upsert_rollups(db: Session, rows: List[Dict[str, Any]]):
+    insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+    table = RiskScoreRollup.__table__
+    stmt = insert(table).values(rows)
+    new = stmt.excluded
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=list(_ROLLUP_KEY),
+        set_={
+            "samples": table.c.samples + new.samples,
+            "score_sum": table.c.score_sum + new.score_sum,
+            "score_min": case((new.score_min < table.c.score_min, new.score_min), else_=table.c.score_min),
+            "score_max": case((new.score_max > table.c.score_max, new.score_max), else_=table.c.score_max),
+            "last_score": new.last_score,
+            "updated_at": new.updated_at,
+        },
+    ))
+
+
+async def record_risk_scores(scores: Dict[str, Dict[str, Any]], computed_at: datetime, category: Optional[str] = None) -> int:
+    """
+    Store {segment: risk result} computed at `computed_at` and update its
+    rollups. Results need "score" and "risk_level"; model fields are kept
+    when present.
+    """
+    def _record(db: Session) -> int:
+        db.add_all([
+            RiskScore(
+                segment=SupplyChainSegment(segment), category=category, score=result["score"],
+                risk_level=RiskLevel(result["risk_level"]),
+                contributing_factors=result.get("contributing_factors"), feature_weights=result.get("feature_weights"),
+                model_version=result.get("model_version"), computed_at=computed_at,
+            )
+            for segment, result in scores.items()
+        ])
+        _upsert_rollups(db, [
+            {
+                "granularity": granularity, "category": category or "",
+                "bucket_start": bucket_start(computed_at, granularity), "segment": SupplyChainSegment(segment),
+                "samples": 1, "score_sum": result["score"], "score_min": result["score"],
+                "score_max": result["score"], "last_score": result["score"], "updated_at": computed_at,
+            }
+            for granularity in RollupGranularity
+            for segment, result in scores.items()
+        ])
+        return len(scores)
+
+    return await run_write_async(_record)
+
+
+async def store_risk_scores(scores: Dict[str, Dict[str, Any]], category: Optional[str] = None):
+    """`record_risk_scores` for read endpoints: a failed write is logged and counted, never raised."""
+    try:
+        await record_risk_scores(scores, datetime.utcnow(), category)
+        _history_status["writes"] += 1
+    except Exception as e:
+        _history_status["failed_writes"] += 1
+        _history_status["last_error"] = f"{type(e).__name__}: {e}"
+        logger.error(f"Storing risk scores failed: {type(e).__name__}: {e}")
+
+
+def get_history_status() -> Dict[str, Any]:
+    return dict(_history_status)
+
+
+async def load_risk_trend(db: AsyncSession, days: int, category: Optional[str] = None) -> Dict[str, Any]:
+    """Average score per bucket and segment over the last `days` days."""
+    granularity = trend_granularity(days)
+    # Daily/weekly windows include today's bucket, so `days` daily points cover `days` days
+    span = timedelta(days=days) if granularity == RollupGranularity.HOUR else timedelta(days=days - 1)
+    since = bucket_start(datetime.utcnow() - span, granularity)
+    rows = (await db.execute(
+        select(RiskScoreRollup.bucket_start, RiskScoreRollup.segment, RiskScoreRollup.samples, RiskScoreRollup.score_sum)
+        .where(
+            RiskScoreRollup.granularity == granularity,
+            RiskScoreRollup.category == (category or ""),
+            RiskScoreRollup.bucket_start >= since,
+        )
+        .order_by(RiskScoreRollup.bucket_start)
+    )).all()
+
+    buckets: Dict[datetime, Dict[str, Any]] = {}
+    for row in rows:
+        entry = buckets.setdefault(row.bucket_start, {"date": row.bucket_start.strftime(_TREND_LABELS[granularity])})
+        entry[row.segment.value] = round(row.score_sum / row.samples, 1) if row.samples else None
+    return {"trend": list(buckets.values()), "granularity": granularity.value, "days": days}
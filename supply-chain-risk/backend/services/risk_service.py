@@ -1,47 +1,58 @@
 """
 Risk Scoring Service — orchestrates data ingestion and ML risk computation.
+
+Feature math, model scoring and bottleneck detection run on the compute
+thread pool (see compute_executor), so the event loop keeps serving other
+requests meanwhile.
 """
+import asyncio
 import logging
-import random
 from typing import Dict, List, Any
 from datetime import datetime
 import numpy as np
+import pandas as pd
 
-from integrations.mandi_api import fetch_mandi_prices
-from integrations.enam_api import fetch_enam_prices
-from integrations.trade_api import fetch_trade_data
-from integrations.weather_api import fetch_weather_data
-from integrations.logistics_api import fetch_logistics_data
-from ml.risk_model import risk_model
+from integrations.mandi_api import fetch_mandi_batch
+from integrations.mandi_repository import mandi_repository
+from integrations.replay import sim_random
+from ml.risk_model import risk_model, predict_bottlenecks
+from services.compute_executor import run_in_thread_pool
+from services.feed_fanout import fetch_feeds
+from services.risk_history import store_risk_scores
 
 logger = logging.getLogger(__name__)
 
 
 async def compute_all_risk_scores():
-    mandi_data = await fetch_mandi_prices()
-    enam_data = await fetch_enam_prices()
-    trade_data = await fetch_trade_data()
-    weather_data = await fetch_weather_data()
-    logistics_data = await fetch_logistics_data()
-
-    procurement_features = _extract_procurement_features(mandi_data, enam_data, weather_data)
-    transport_features = _extract_transport_features(logistics_data, weather_data)
-    import_export_features = _extract_import_export_features(trade_data, logistics_data)
-
-    procurement_risk = risk_model.compute_risk_score(procurement_features, "procurement")
-    transport_risk = risk_model.compute_risk_score(transport_features, "transport")
-    import_export_risk = risk_model.compute_risk_score(import_export_features, "import_export")
+    fanout = await fetch_feeds()
+    feeds = fanout["feeds"]
+    mandi_data, enam_data, trade_data = feeds["mandi"], feeds["enam"], feeds["trade"]
+    weather_data, logistics_data = feeds["weather"], feeds["logistics"]
+
+    procurement_features, transport_features, import_export_features = await run_in_thread_pool(
+        "features", _extract_segment_features, mandi_data, enam_data, trade_data, weather_data, logistics_data
+    )
+    all_signals = mandi_data + enam_data + trade_data + weather_data + logistics_data
+    (procurement_risk, transport_risk, import_export_risk), bottlenecks = await asyncio.gather(
+        score_feature_rows([
+            {"segment": "procurement", "features": procurement_features},
+            {"segment": "transport", "features": transport_features},
+            {"segment": "import_export", "features": import_export_features},
+        ]),
+        run_in_thread_pool("bottlenecks", predict_bottlenecks, all_signals),
+    )
 
     overall_score = procurement_risk["score"] * 0.35 + transport_risk["score"] * 0.35 + import_export_risk["score"] * 0.30
-    all_signals = mandi_data + enam_data + trade_data + weather_data + logistics_data
-    bottlenecks = risk_model.predict_bottlenecks(all_signals)
     recommendations = _generate_recommendations(procurement_risk, transport_risk, import_export_risk, bottlenecks)
+    overall = {"score": round(overall_score, 2), "risk_level": risk_model._score_to_level(overall_score), "model_version": risk_model.model_version}
+    await store_risk_scores({"overall": overall, "procurement": procurement_risk, "transport": transport_risk, "import_export": import_export_risk})
 
     return {
-        "overall_score": round(overall_score, 2), "overall_risk_level": risk_model._score_to_level(overall_score),
+        "overall_score": overall["score"], "overall_risk_level": overall["risk_level"],
         "segments": {"procurement": procurement_risk, "transport": transport_risk, "import_export": import_export_risk},
         "bottlenecks": bottlenecks, "recommendations": recommendations,
         "signals_summary": {"mandi_records": len(mandi_data), "enam_records": len(enam_data), "trade_records": len(trade_data), "weather_records": len(weather_data), "logistics_records": len(logistics_data), "total": len(all_signals)},
+        "late_sources": fanout["late_sources"],
         "computed_at": datetime.utcnow().isoformat()
     }
 
@@ -54,29 +65,94 @@ async def compute_category_risk(category):
         "Toys": ["Toys & Games", "Plastic Products"],
     }
     commodities = category_commodities.get(category, [])
-    mandi_data = []
-    for commodity in commodities[:3]:
-        data = await fetch_mandi_prices(commodity=commodity)
-        mandi_data.extend(data)
-    enam_data = await fetch_enam_prices()
-    trade_data = await fetch_trade_data()
-    weather_data = await fetch_weather_data()
-    logistics_data = await fetch_logistics_data()
-    features = _extract_procurement_features(mandi_data, enam_data, weather_data)
-    risk_result = risk_model.compute_risk_score(features, "procurement")
+
+    async def fetch_category_mandi():
+        # Every commodity of the category, fetched concurrently
+        return (await fetch_mandi_batch(commodities))["records"] if commodities else []
+
+    fanout = await fetch_feeds(overrides={"mandi": fetch_category_mandi})
+    feeds = fanout["feeds"]
+    mandi_data, enam_data, trade_data = feeds["mandi"], feeds["enam"], feeds["trade"]
+    weather_data, logistics_data = feeds["weather"], feeds["logistics"]
+    features = await run_in_thread_pool("features", _extract_procurement_features, mandi_data, enam_data, weather_data)
     all_signals = mandi_data + enam_data + weather_data + logistics_data
-    bottlenecks = risk_model.predict_bottlenecks(all_signals)
+    (risk_result,), bottlenecks = await asyncio.gather(
+        score_feature_rows([{"segment": "procurement", "features": features}]),
+        run_in_thread_pool("bottlenecks", predict_bottlenecks, all_signals),
+    )
     supply_network = _build_supply_network(category, mandi_data, trade_data, logistics_data)
+    await store_risk_scores({"procurement": risk_result}, category)
     return {
         "category": category, "risk_score": risk_result["score"], "risk_level": risk_result["risk_level"],
         "contributing_factors": risk_result["contributing_factors"], "feature_weights": risk_result["feature_weights"],
         "commodities_tracked": commodities, "price_data": mandi_data[:10], "bottlenecks": bottlenecks[:5],
         "supply_network": supply_network, "recommendations": _generate_category_recommendations(category, risk_result),
-        "computed_at": datetime.utcnow().isoformat()
+        "late_sources": fanout["late_sources"], "computed_at": datetime.utcnow().isoformat()
+    }
+
+
+async def score_feature_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Score (segment, features[, region, commodity]) rows in one model call, on the compute thread pool."""
+    return await run_in_thread_pool("score", risk_model.compute_risk_scores, rows)
+
+
+async def compute_risk_grid():
+    """Risk for every state x commodity in the mandi repository, per segment, scored in one model call."""
+    fanout = await fetch_feeds()
+    feeds = fanout["feeds"]
+    try:
+        mandi_frame = await mandi_repository.query_frame()
+    except Exception as e:
+        # Cold repository with upstream down: the fan-out sample is all there is
+        logger.warning(f"Risk grid: mandi repository unavailable, using the mandi feed: {type(e).__name__}: {e}")
+        mandi_frame = pd.DataFrame.from_records(feeds["mandi"], columns=["state", "commodity", "modal_price"])
+    rows, groups = await run_in_thread_pool("grid_features", _grid_feature_rows, feeds, mandi_frame)
+    scores = await score_feature_rows(rows)
+    return {
+        "cells": [{"segment": row["segment"], **score} for row, score in zip(rows, scores)],
+        "states": len({state for state, _ in groups}), "commodities": len({commodity for _, commodity in groups}),
+        "mandi_records": len(mandi_frame), "late_sources": fanout["late_sources"], "computed_at": datetime.utcnow().isoformat(),
     }
 
 
-def _extract_procurement_features(mandi_data, enam_data, weather_data):
+def _grid_feature_rows(feeds, mandi_frame: pd.DataFrame):
+    """(segment, state, commodity, features) rows for every state x commodity group of the mandi frame."""
+    enam_data, trade_data = feeds["enam"], feeds["trade"]
+    weather_data, logistics_data = feeds["weather"], feeds["logistics"]
+    mandi_frame = mandi_frame[mandi_frame["state"].notna() & mandi_frame["commodity"].notna()]
+    groups = mandi_frame.groupby(["state", "commodity"], observed=True, sort=True).indices
+    modal_prices = mandi_frame["modal_price"].to_numpy()
+    enam_groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for d in enam_data:
+        enam_groups.setdefault((d.get("state"), d.get("commodity")), []).append(d)
+    trade_by_commodity: Dict[str, List[Dict[str, Any]]] = {}
+    rows = []
+    for (state, commodity), positions in sorted(groups.items()):
+        # The procurement extractor only reads modal_price from the mandi records
+        records = [{"modal_price": price} for price in modal_prices[positions]]
+        enam = enam_groups.get((state, commodity), [])
+        if commodity not in trade_by_commodity:
+            trade_by_commodity[commodity] = [d for d in trade_data if d.get("commodity") == commodity]
+        # Simulated historical disruption rates are drawn per cell, not shared grid-wide
+        for segment, features in (
+            ("procurement", _extract_procurement_features(records, enam, weather_data, sim_random("features", "procurement", state, commodity))),
+            ("transport", _extract_transport_features(logistics_data, weather_data, sim_random("features", "transport", state, commodity))),
+            ("import_export", _extract_import_export_features(trade_by_commodity[commodity], logistics_data, sim_random("features", "import_export", state, commodity))),
+        ):
+            rows.append({"segment": segment, "region": state, "commodity": commodity, "features": features})
+    return rows, list(groups)
+
+
+def _extract_segment_features(mandi_data, enam_data, trade_data, weather_data, logistics_data):
+    return (
+        _extract_procurement_features(mandi_data, enam_data, weather_data),
+        _extract_transport_features(logistics_data, weather_data),
+        _extract_import_export_features(trade_data, logistics_data),
+    )
+
+
+def _extract_procurement_features(mandi_data, enam_data, weather_data, rng=None):
+    rng = rng or sim_random("features", "procurement")
     prices = [d.get("modal_price", 0) for d in mandi_data if d.get("modal_price")]
     price_volatility = float(np.std(prices) / (np.mean(prices) + 1e-6)) if len(prices) > 1 else 0.1
     weather_severities = [d.get("disruption_severity", 0) for d in weather_data]
@@ -85,24 +161,27 @@ def _extract_procurement_features(mandi_data, enam_data, weather_data):
     supply_demand = min(sum(quantities) / 5000, 1.0) if quantities else 0.5
     month = datetime.utcnow().month
     seasonal = {1: 0.3, 2: 0.3, 3: 0.4, 4: 0.5, 5: 0.6, 6: 0.7, 7: 0.8, 8: 0.7, 9: 0.5, 10: 0.4, 11: 0.3, 12: 0.3}.get(month, 0.5)
-    return {"price_volatility": min(price_volatility, 1.0), "weather_severity": weather_severity, "logistics_delay": 0.0, "trade_volume_change": 0.0, "congestion_level": 0.0, "supply_demand_ratio": supply_demand, "seasonal_factor": seasonal, "historical_disruption_rate": random.uniform(0.1, 0.3)}
+    return {"price_volatility": min(price_volatility, 1.0), "weather_severity": weather_severity, "logistics_delay": 0.0, "trade_volume_change": 0.0, "congestion_level": 0.0, "supply_demand_ratio": supply_demand, "seasonal_factor": seasonal, "historical_disruption_rate": rng.uniform(0.1, 0.3)}
 
 
-def _extract_transport_features(logistics_data, weather_data):
+def _extract_transport_features(logistics_data, weather_data, rng=None):
+    rng = rng or sim_random("features", "transport")
     delays = [d.get("current_delay_hours", 0) for d in logistics_data]
     congestions = [d.get("congestion_level", 0) for d in logistics_data]
     weather_severities = [d.get("disruption_severity", 0) for d in weather_data]
-    return {"price_volatility": 0.0, "weather_severity": max(weather_severities) if weather_severities else 0.0, "logistics_delay": min(max(delays) / 5.0, 1.0) if delays else 0.0, "trade_volume_change": 0.0, "congestion_level": max(congestions) if congestions else 0.0, "supply_demand_ratio": 0.0, "seasonal_factor": 0.3, "historical_disruption_rate": random.uniform(0.1, 0.25)}
+    return {"price_volatility": 0.0, "weather_severity": max(weather_severities) if weather_severities else 0.0, "logistics_delay": min(max(delays) / 5.0, 1.0) if delays else 0.0, "trade_volume_change": 0.0, "congestion_level": max(congestions) if congestions else 0.0, "supply_demand_ratio": 0.0, "seasonal_factor": 0.3, "historical_disruption_rate": rng.uniform(0.1, 0.25)}
 
 
-def _extract_import_export_features(trade_data, logistics_data):
+def _extract_import_export_features(trade_data, logistics_data, rng=None):
+    rng = rng or sim_random("features", "import_export")
     trade_changes = [abs(d.get("change_pct", 0)) for d in trade_data]
     delays = [d.get("current_delay_hours", 0) for d in logistics_data]
     congestions = [d.get("congestion_level", 0) for d in logistics_data]
-    return {"price_volatility": min(max(trade_changes) / 20.0, 1.0) if trade_changes else 0.0, "weather_severity": 0.0, "logistics_delay": min(max(delays) / 5.0, 1.0) if delays else 0.0, "trade_volume_change": min(sum(trade_changes) / (len(trade_changes) * 15 + 1e-6), 1.0) if trade_changes else 0.0, "congestion_level": max(congestions) if congestions else 0.0, "supply_demand_ratio": 0.0, "seasonal_factor": 0.4, "historical_disruption_rate": random.uniform(0.15, 0.35)}
+    return {"price_volatility": min(max(trade_changes) / 20.0, 1.0) if trade_changes else 0.0, "weather_severity": 0.0, "logistics_delay": min(max(delays) / 5.0, 1.0) if delays else 0.0, "trade_volume_change": min(sum(trade_changes) / (len(trade_changes) * 15 + 1e-6), 1.0) if trade_changes else 0.0, "congestion_level": max(congestions) if congestions else 0.0, "supply_demand_ratio": 0.0, "seasonal_factor": 0.4, "historical_disruption_rate": rng.uniform(0.15, 0.35)}
 
 
-def _build_supply_network(category, mandi_data, trade_data, logistics_data):
+def _build_supply_network(category, mandi_data, trade_data, logistics_data, rng=None):
+    rng = rng or sim_random("supply_network", category)
     nodes, links = [], []
     regions_seen = set()
     for d in mandi_data:
@@ -116,12 +195,12 @@ def _build_supply_network(category, mandi_data, trade_data, logistics_data):
     for d in trade_data[:3]:
         country = d.get("country", "Unknown")
         nodes.append({"id": f"dest-{country}", "label": country, "type": "destination", "lat": 0, "lng": 0})
-    for region in regions_seen:
-        hub = random.choice(hubs)
-        links.append({"source": f"src-{region}", "target": f"hub-{hub}", "risk_level": random.choice(["low", "medium", "high"])})
+    for region in sorted(regions_seen):
+        hub = rng.choice(hubs)
+        links.append({"source": f"src-{region}", "target": f"hub-{hub}", "risk_level": rng.choice(["low", "medium", "high"])})
     for d in trade_data[:3]:
-        hub = random.choice(hubs)
-        links.append({"source": f"hub-{hub}", "target": f"dest-{d.get('country', 'Unknown')}", "risk_level": random.choice(["low", "medium", "high"])})
+        hub = rng.choice(hubs)
+        links.append({"source": f"hub-{hub}", "target": f"dest-{d.get('country', 'Unknown')}", "risk_level": rng.choice(["low", "medium", "high"])})
     return {"nodes": nodes, "links": links}
 
 
@@ -0,0 +1,259 @@
+"""
+Signal Archive — columnar, memory-mapped history of persisted signals for
+backtesting.
+
+An export job writes each source's signals into one shard per ingestion
+month under SIGNAL_ARCHIVE_DIR:
+
+    <source>/<YYYY-MM>/timestamp.npy   datetime64[us], sorted ascending
+                       value.npy       float64 (NaN = no value)
+                       severity.npy    float64
+                       commodity.npy   int32 codes into meta.json "commodities" (-1 = none)
+                       region.npy      int32 codes into meta.json "regions" (-1 = none)
+                       meta.json       rows, vocabularies, timestamp range, complete flag
+
+Closed months are exported once; the current month is rewritten on every
+run. Shards are written to a temporary directory and swapped in, so
+readers never see a half-written shard.
+
+`SignalArchive` opens shards with `np.load(mmap_mode="r")`. A time filter
+is a binary search on the sorted timestamps and yields zero-copy slices of
+the mapped files; only commodity/region filters and multi-shard `load`
+calls copy.
+"""
+import asyncio
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, inspect, select
+
+from config import settings
+from database import engine
+from models.signal import Signal, SignalSource
+from services.signal_compaction import MONTH_TABLE_RE, archive_table, month_start, month_table_name, next_month
+from services.signal_store import PUBLISHED_SINCE
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = ("timestamp", "value", "severity", "commodity", "region")
+_CODE_COLUMNS = {"commodity": "commodities", "region": "regions"}
+# A month's rows can still change until its last sync has published
+_MONTH_SETTLE = timedelta(days=1)
+
+_archive_status: Dict[str, Any] = {"runs": 0, "failures": 0}
+
+
+def _month_key(month: datetime) -> str:
+    return f"{month:%Y-%m}"
+
+
+def _read_month(source: str, month: datetime) -> pd.DataFrame:
+    """All published signals of a source ingested during `month`, oldest first."""
+    tables = [Signal.__table__]
+    if engine.dialect.name == "sqlite" and inspect(engine).has_table(month_table_name(month)):
+        tables.append(archive_table(month))  # rows compacted out of the hot table
+    frames = []
+    with engine.connect() as conn:
+        for table in tables:
+            c = table.c
+            query = select(c.timestamp, c.value, c.severity, c.commodity, c.region).where(
+                c.source == SignalSource(source),
+                c.created_at >= max(month, PUBLISHED_SINCE), c.created_at < next_month(month),
+            )
+            frames.append(pd.DataFrame(conn.execute(query).all(), columns=list(ARCHIVE_COLUMNS)))
+    frame = pd.concat(frames, ignore_index=True)
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"]).astype("datetime64[us]")
+    return frame.sort_values("timestamp", kind="stable", ignore_index=True)
+
+
+def _write_shard(directory: Path, frame: pd.DataFrame, complete: bool):
+    tmp = directory.with_name(f".{directory.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    meta: Dict[str, Any] = {"rows": len(frame), "complete": complete, "exported_at": datetime.utcnow().isoformat()}
+    np.save(tmp / "timestamp.npy", frame["timestamp"].to_numpy())
+    np.save(tmp / "value.npy", pd.to_numeric(frame["value"], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan))
+    np.save(tmp / "severity.npy", pd.to_numeric(frame["severity"], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan))
+    for column, vocabulary in _CODE_COLUMNS.items():
+        codes, uniques = pd.factorize(frame[column])
+        np.save(tmp / f"{column}.npy", codes.astype(np.int32))
+        meta[vocabulary] = [str(u) for u in uniques]
+    if len(frame):
+        meta["start"] = frame["timestamp"].iat[0].isoformat()
+        meta["end"] = frame["timestamp"].iat[-1].isoformat()
+    (tmp / "meta.json").write_text(json.dumps(meta))
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp, directory)
+
+
+def _read_meta(directory: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads((directory / "meta.json").read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _oldest_month(source: str) -> Optional[datetime]:
+    """Ingestion month of the oldest stored signal of a source, hot table or month tables."""
+    with engine.connect() as conn:
+        oldest = conn.execute(
+            select(func.min(Signal.created_at)).where(Signal.source == SignalSource(source), Signal.created_at >= PUBLISHED_SINCE)
+        ).scalar()
+    months = [month_start(oldest)] if oldest else []
+    if engine.dialect.name == "sqlite":
+        for name in inspect(engine).get_table_names():
+            match = MONTH_TABLE_RE.match(name)
+            if match:
+                months.append(datetime(int(match[1]), int(match[2]), 1))
+    return min(months) if months else None
+
+
+def export_signal_archive(now: Optional[datetime] = None, root: Optional[str] = None) -> Dict[str, Any]:
+    """Write missing or still-open month shards for every source. Blocking."""
+    now = now or datetime.utcnow()
+    base = Path(root or settings.SIGNAL_ARCHIVE_DIR)
+    written: List[str] = []
+    rows = 0
+    for source in SignalSource:
+        month = _oldest_month(source.value)
+        while month is not None and month <= now:
+            directory = base / source.value / _month_key(month)
+            complete = next_month(month) + _MONTH_SETTLE <= now
+            meta = _read_meta(directory)
+            if not (meta and meta.get("complete")):
+                frame = _read_month(source.value, month)
+                if len(frame) or meta:
+                    _write_shard(directory, frame, complete)
+                    written.append(f"{source.value}/{_month_key(month)}")
+                    rows += len(frame)
+            month = next_month(month)
+    if written:
+        logger.info(f"Signal archive: wrote {rows} rows into {len(written)} shard(s) under {base}")
+    return {"shards_written": written, "rows": rows}
+
+
+async def run_archive_job():
+    """Scheduler entry point — runs `export_signal_archive` in a worker thread and records its status."""
+    status = _archive_status
+    status["last_run_at"] = datetime.utcnow().isoformat()
+    started = time.perf_counter()
+    try:
+        status.update(await asyncio.to_thread(export_signal_archive), status="ok", error=None)
+    except Exception as e:
+        status["failures"] += 1
+        status.update(status="error", error=f"{type(e).__name__}: {e}")
+        logger.error(f"Signal archive export failed: {type(e).__name__}: {e}")
+    finally:
+        status["runs"] += 1
+        status["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def get_archive_status() -> Dict[str, Any]:
+    return {"enabled": settings.SIGNAL_ARCHIVE_ENABLED, "dir": settings.SIGNAL_ARCHIVE_DIR, **_archive_status}
+
+
+class SignalArchive:
+    """Read-only view over the archive; shards are memory-mapped on first use and cached."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or settings.SIGNAL_ARCHIVE_DIR)
+        self._shards: Dict[Path, Tuple[float, Dict[str, Any], Dict[str, np.ndarray]]] = {}
+
+    def months(self, source: str) -> List[str]:
+        directory = self.root / source
+        if not directory.is_dir():
+            return []
+        return sorted(p.name for p in directory.iterdir() if p.is_dir() and not p.name.startswith("."))
+
+    def _open(self, directory: Path) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        mtime = (directory / "meta.json").stat().st_mtime
+        cached = self._shards.get(directory)
+        if cached is None or cached[0] != mtime:
+            meta = json.loads((directory / "meta.json").read_text())
+            columns = {c: np.load(directory / f"{c}.npy", mmap_mode="r") for c in ARCHIVE_COLUMNS}
+            cached = self._shards[directory] = (mtime, meta, columns)
+        return cached[1], cached[2]
+
+    def iter_shards(
+        self,
+        source: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        commodity: Optional[str] = None,
+        region: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Per-shard column dicts for signals with start <= timestamp < end, in
+        time order. Columns are zero-copy slices of the mapped files unless a
+        commodity/region filter applies; each dict also carries the shard's
+        "commodities" and "regions" vocabularies for the code columns.
+        """
+        lo_ts = np.datetime64(start, "us") if start else None
+        hi_ts = np.datetime64(end, "us") if end else None
+        for month in self.months(source):
+            meta, columns = self._open(self.root / source / month)
+            if not meta["rows"] or (lo_ts is not None and np.datetime64(meta["end"], "us") < lo_ts) \
+                    or (hi_ts is not None and np.datetime64(meta["start"], "us") >= hi_ts):
+                continue
+            ts = columns["timestamp"]
+            lo = 0 if lo_ts is None else int(np.searchsorted(ts, lo_ts, side="left"))
+            hi = len(ts) if hi_ts is None else int(np.searchsorted(ts, hi_ts, side="left"))
+            view = {c: columns[c][lo:hi] for c in ARCHIVE_COLUMNS}
+            for column, value in (("commodity", commodity), ("region", region)):
+                if value is not None:
+                    vocabulary = meta[_CODE_COLUMNS[column]]
+                    code = vocabulary.index(value) if value in vocabulary else -2
+                    mask = view[column] == code
+                    view = {c: v[mask] for c, v in view.items()}
+            if len(view["timestamp"]):
+                yield {**view, "commodities": meta["commodities"], "regions": meta["regions"]}
+
+    def load(self, source: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+             commodity: Optional[str] = None, region: Optional[str] = None) -> Dict[str, Any]:
+        """
+        All matching signals as one set of columns, in time order. A single
+        matching shard is returned as-is (zero-copy); several are concatenated,
+        with their code columns remapped onto one merged vocabulary.
+        """
+        shards = list(self.iter_shards(source, start, end, commodity, region))
+        if len(shards) == 1:
+            return shards[0]
+        result: Dict[str, Any] = {}
+        for column in ("timestamp", "value", "severity"):
+            result[column] = np.concatenate([s[column] for s in shards]) if shards else np.empty(0)
+        for column, vocabulary in _CODE_COLUMNS.items():
+            merged = list(dict.fromkeys(v for s in shards for v in s[vocabulary]))
+            index = {v: i for i, v in enumerate(merged)}
+            parts = []
+            for s in shards:
+                # Position -1 of the lookup table maps "none" (-1) to itself
+                lookup = np.array([index[v] for v in s[vocabulary]] + [-1], dtype=np.int32)
+                parts.append(lookup[s[column]])
+            result[column] = np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+            result[vocabulary] = merged
+        # Shards split on ingestion month, so timestamps can overlap at the boundaries
+        ts = result["timestamp"]
+        if len(ts) > 1 and (ts[1:] < ts[:-1]).any():
+            order = np.argsort(ts, kind="stable")
+            for column in ARCHIVE_COLUMNS:
+                result[column] = result[column][order]
+        return result
+
+    def load_frame(self, source: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   commodity: Optional[str] = None, region: Optional[str] = None) -> pd.DataFrame:
+        """`load` as a DataFrame with categorical commodity/region columns."""
+        data = self.load(source, start, end, commodity, region)
+        frame = pd.DataFrame({c: data[c] for c in ("timestamp", "value", "severity")})
+        for column, vocabulary in _CODE_COLUMNS.items():
+            frame[column] = pd.Categorical.from_codes(data[column], categories=pd.Index(data.get(vocabulary, []), dtype=object))
+        return frame
+
+
+signal_archive = SignalArchive()
@@ -0,0 +1,238 @@
+"""
+Signal Compaction — time partitioning, retention and per-day downsampling
+for the `signals` table.
+
+Signals keep their raw JSON for SIGNAL_RAW_RETENTION_DAYS. A background
+job then folds older rows, one calendar month at a time, into
+`signal_daily_aggregates` (count, value sum/min/max, severity sum/max per
+source, commodity, region and day) and drops their raw_data:
+
+  * PostgreSQL: `signals` is range-partitioned by month on created_at.
+    Partitions for this month and next are created ahead of time, with a
+    DEFAULT partition for anything else (staged syncs). Compaction nulls
+    raw_data in place. A `signals` table created before partitioning is
+    not converted; startup fails with the manual conversion steps.
+  * SQLite: `signals` holds only the raw window. Compacted rows move,
+    without raw_data, into a `signals_YYYY_MM` table for their month.
+
+Either way a month's rows live in their own table once they are older
+than SIGNAL_ROW_RETENTION_DAYS, and retention is a DROP TABLE. Queries on
+recent data touch only the hot table or partitions, whatever the history
+size. Rows of syncs that never published are purged after a day.
+"""
+import asyncio
+import logging
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Column, DateTime, Float, Index, MetaData, String, Table, case, func, inspect, literal_column, null, or_, select, text
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy.dialects import postgresql, sqlite
+
+from config import settings
+from database import engine, run_write
+from models.signal import Signal, SignalDailyAggregate, SignalSource
+from services.signal_store import PUBLISHED_SINCE, staging_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Matches SQLite month tables (signals_YYYY_MM); groups are year and month
+MONTH_TABLE_RE = re.compile(rf"^{Signal.__tablename__}_(\d{{4}})_(\d{{2}})$")
+_ARCHIVE_COLUMNS = [c.name for c in Signal.__table__.columns if c.name != "raw_data"]
+_AGGREGATE_KEY = ("source", "commodity", "region", "day")
+# Syncs staged longer ago than this crashed before publishing
+_ABANDONED_STAGING = timedelta(days=1)
+
+_compaction_status: Dict[str, Any] = {"runs": 0, "failures": 0}
+
+
+def month_start(ts: datetime) -> datetime:
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(month: datetime) -> datetime:
+    return month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1)
+
+
+def month_table_name(month: datetime) -> str:
+    return f"{Signal.__tablename__}_{month.year:04d}_{month.month:02d}"
+
+
+def _is_postgres() -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+def _is_partitioned(conn) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:name)"),
+        {"name": Signal.__tablename__},
+    ).first() is not None
+
+
+def ensure_signal_partitions(now: Optional[datetime] = None):
+    """
+    Create this month's and next month's partitions (and the DEFAULT one) on
+    PostgreSQL. Blocking. Raises RuntimeError if `signals` predates
+    partitioning: create_all never converts an existing table.
+    """
+    if not _is_postgres():
+        return
+    month = month_start(now or datetime.utcnow())
+    with engine.begin() as conn:
+        if not _is_partitioned(conn):
+            table = Signal.__tablename__
+            columns = ", ".join(c.name for c in Signal.__table__.columns)
+            raise RuntimeError(
+                f"{table} table predates monthly partitioning and is not converted automatically. Convert it "
+                f"with: CREATE TABLE {table}_backup AS SELECT * FROM {table}; DROP TABLE {table}; then restart "
+                f"the app so it creates the partitioned table, and run: INSERT INTO {table} ({columns}) "
+                f"SELECT {columns} FROM {table}_backup; DROP TABLE {table}_backup;"
+            )
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {Signal.__tablename__}_default PARTITION OF {Signal.__tablename__} DEFAULT"))
+        for start in (month, next_month(month)):
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {month_table_name(start)} PARTITION OF {Signal.__tablename__} "
+                f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{next_month(start):%Y-%m-%d}')"
+            ))
+
+
+def archive_table(month: datetime) -> Table:
+    """SQLite month table: the Signal columns without raw_data."""
+    name = month_table_name(month)
+    return Table(
+        name, MetaData(),
+        Column("id", String(36), primary_key=True),
+        Column("source", SQLEnum(SignalSource), nullable=False),
+        Column("region", String(255)),
+        Column("commodity", String(255)),
+        Column("value", Float),
+        Column("unit", String(50)),
+        Column("severity", Float),
+        Column("timestamp", DateTime),
+        Column("created_at", DateTime, primary_key=True),
+        Index(f"ix_{name}_source_timestamp", "source", "timestamp"),
+    )
+
+
+def _aggregate_window(conn, window):
+    """Fold the rows matched by `window` into signal_daily_aggregates."""
+    insert = postgresql.insert if _is_postgres() else sqlite.insert
+    table = SignalDailyAggregate.__table__
+    commodity = func.coalesce(Signal.commodity, literal_column("''"))
+    region = func.coalesce(Signal.region, literal_column("''"))
+    day = func.date(Signal.timestamp)
+    rows = (
+        select(
+            Signal.source, commodity, region, day, func.count(), func.count(Signal.value),
+            func.sum(Signal.value), func.min(Signal.value), func.max(Signal.value),
+            func.sum(Signal.severity), func.max(Signal.severity),
+        )
+        .where(*window)
+        .group_by(Signal.source, commodity, region, day)
+    )
+    stmt = insert(table).from_select(
+        [*_AGGREGATE_KEY, "samples", "value_samples", "value_sum", "value_min", "value_max", "severity_sum", "severity_max"],
+        rows,
+    )
+    new = stmt.excluded
+    conn.execute(stmt.on_conflict_do_update(
+        index_elements=list(_AGGREGATE_KEY),
+        set_={
+            "samples": table.c.samples + new.samples,
+            "value_samples": table.c.value_samples + new.value_samples,
+            "value_sum": func.coalesce(table.c.value_sum, 0) + func.coalesce(new.value_sum, 0),
+            "value_min": case((or_(table.c.value_min.is_(None), new.value_min < table.c.value_min), new.value_min), else_=table.c.value_min),
+            "value_max": case((or_(table.c.value_max.is_(None), new.value_max > table.c.value_max), new.value_max), else_=table.c.value_max),
+            "severity_sum": func.coalesce(table.c.severity_sum, 0) + func.coalesce(new.severity_sum, 0),
+            "severity_max": case((or_(table.c.severity_max.is_(None), new.severity_max > table.c.severity_max), new.severity_max), else_=table.c.severity_max),
+        },
+    ))
+
+
+def _compact_month(month: datetime, cutoff: datetime) -> int:
+    """Aggregate one month's expired raw rows and drop their raw JSON. Returns rows compacted."""
+    upper = min(next_month(month), cutoff)
+    window = (
+        Signal.created_at >= max(month, PUBLISHED_SINCE), Signal.created_at < upper,
+        Signal.raw_data.is_not(None),
+    )
+    signals = Signal.__table__
+
+    def _compact(db) -> int:
+        conn = db.connection()
+        if conn.execute(select(Signal.id).where(*window).limit(1)).first() is None:
+            return 0
+        _aggregate_window(conn, window)
+        if _is_postgres():
+            return conn.execute(signals.update().where(*window).values(raw_data=null())).rowcount
+        archive = archive_table(month)
+        archive.create(conn, checkfirst=True)
+        conn.execute(archive.insert().from_select(
+            _ARCHIVE_COLUMNS, select(*(signals.c[c] for c in _ARCHIVE_COLUMNS)).where(*window)
+        ))
+        return conn.execute(signals.delete().where(*window)).rowcount
+
+    return run_write(_compact)
+
+
+def _drop_expired_months(row_cutoff: datetime) -> List[str]:
+    """Drop month tables/partitions whose whole month is older than `row_cutoff`."""
+    dropped = []
+    for name in sorted(inspect(engine).get_table_names()):
+        match = MONTH_TABLE_RE.match(name)
+        if match and next_month(datetime(int(match[1]), int(match[2]), 1)) <= row_cutoff:
+            run_write(lambda db: db.execute(text(f"DROP TABLE {name}")))
+            dropped.append(name)
+    return dropped
+
+
+def compact_signals(now: Optional[datetime] = None) -> Dict[str, Any]:
+    """One compaction pass: downsample expired raw rows, purge abandoned staging, apply retention. Blocking."""
+    now = now or datetime.utcnow()
+    ensure_signal_partitions(now)
+    cutoff = now - timedelta(days=settings.SIGNAL_RAW_RETENTION_DAYS)
+    abandoned = run_write(lambda db: db.execute(
+        Signal.__table__.delete().where(Signal.created_at < staging_timestamp(now - _ABANDONED_STAGING))
+    ).rowcount)
+    with engine.connect() as conn:
+        oldest = conn.execute(
+            select(func.min(Signal.created_at)).where(
+                Signal.created_at >= PUBLISHED_SINCE, Signal.created_at < cutoff, Signal.raw_data.is_not(None)
+            )
+        ).scalar()
+
+    compacted = months = 0
+    month = month_start(oldest) if oldest else None
+    while month is not None and month < cutoff:
+        compacted += _compact_month(month, cutoff)
+        months += 1
+        month = next_month(month)
+
+    dropped = _drop_expired_months(now - timedelta(days=settings.SIGNAL_ROW_RETENTION_DAYS))
+    if compacted or dropped or abandoned:
+        logger.info(
+            f"Signal compaction: {compacted} rows downsampled over {months} month(s), "
+            f"{abandoned} abandoned staged rows purged, dropped {dropped or 'no tables'}"
+        )
+    return {"compacted_rows": compacted, "months": months, "abandoned_staged_rows": abandoned, "dropped_tables": dropped}
+
+
+async def run_compaction_job():
+    """Scheduler entry point — runs `compact_signals` in a worker thread and records its status."""
+    status = _compaction_status
+    status["last_run_at"] = datetime.utcnow().isoformat()
+    started = time.perf_counter()
+    try:
+        status.update(await asyncio.to_thread(compact_signals), status="ok", error=None)
+    except Exception as e:
+        status["failures"] += 1
+        status.update(status="error", error=f"{type(e).__name__}: {e}")
+        logger.error(f"Signal compaction failed: {type(e).__name__}: {e}")
+    finally:
+        status["runs"] += 1
+        status["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def get_compaction_status() -> Dict[str, Any]:
+    return {"enabled": settings.SIGNAL_COMPACTION_ENABLED, **_compaction_status}
@@ -0,0 +1,163 @@
+"""
+Signal Store — persists normalized feed records as Signal rows and reads
+back the latest ingested snapshot per source, or any stored history page
+by page (`query_signals`).
+
+Every row written by one ingestion run shares the same `created_at`, which
+is what identifies a snapshot. The normalized record is kept in `raw_data`
+so readers get back exactly what the live fetchers return. Rows are
+written in bulk by services.signal_writer.
+
+Multi-page syncs write their pages under a staging timestamp far in the
+past (invisible to readers) and publish them with one UPDATE at the end,
+so a half-finished sync is never served as the latest snapshot.
+
+On SQLite, compaction moves rows past the raw window into per-month
+tables (see signal_compaction); `query_signals` reads those too, so
+history pages look the same on both databases.
+"""
+import base64
+import binascii
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import Table, func, inspect, null, select, tuple_, union_all
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import SessionLocal, run_write
+from models.signal import Signal, SignalSource
+from services.signal_writer import write_signals
+
+logger = logging.getLogger(__name__)
+
+_STAGING_EPOCH = datetime(1900, 1, 1)
+# Every staging timestamp sorts before this (1900 + seconds since 1970), every published one after
+PUBLISHED_SINCE = datetime(2000, 1, 1)
+
+
+def ingestion_interval(source: str) -> int:
+    """Cadence (seconds) at which a source's snapshot is refreshed."""
+    if source == "mandi" and settings.MANDI_BULK_SYNC_ENABLED:
+        return settings.MANDI_BULK_INTERVAL_SECONDS
+    return settings.INGESTION_INTERVAL_SECONDS.get(source, 0)
+
+
+def staging_timestamp(snapshot_at: datetime) -> datetime:
+    """A per-run timestamp that sorts before every published snapshot."""
+    return _STAGING_EPOCH + timedelta(seconds=snapshot_at.timestamp())
+
+
+def save_snapshot(source: str, records: List[Dict[str, Any]], snapshot_at: Optional[datetime] = None) -> int:
+    """Write one ingestion run for a source. Blocking — call via a worker thread."""
+    return write_signals(source, records, snapshot_at or datetime.utcnow())
+
+
+def publish_snapshot(source: str, staged_at: datetime, snapshot_at: datetime) -> int:
+    """Make rows staged under `staged_at` visible as the snapshot at `snapshot_at`. Blocking."""
+    return run_write(lambda db: (
+        db.query(Signal)
+        .filter(Signal.source == SignalSource(source), Signal.created_at == staged_at)
+        .update({Signal.created_at: snapshot_at}, synchronize_session=False)
+    ))
+
+
+def load_latest_snapshot(source: str, max_age_seconds: float, limit: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Return the records of the newest snapshot for a source (at most `limit`),
+    or None when no snapshot exists or it is older than `max_age_seconds`.
+    Blocking.
+    """
+    db = SessionLocal()
+    try:
+        latest = db.query(func.max(Signal.created_at)).filter(Signal.source == SignalSource(source)).scalar()
+        if latest is None or latest < datetime.utcnow() - timedelta(seconds=max_age_seconds):
+            return None
+        query = db.query(Signal.raw_data).filter(Signal.source == SignalSource(source), Signal.created_at == latest)
+        rows = query.limit(limit).all() if limit else query.all()
+        return [row.raw_data for row in rows if row.raw_data]
+    finally:
+        db.close()
+
+
+def load_mandi_snapshot(limit: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+    """The latest published bulk-sync mandi snapshot (the mandi repository's snapshot loader). Blocking."""
+    return load_latest_snapshot("mandi", ingestion_interval("mandi") * settings.SNAPSHOT_MAX_AGE_FACTOR, limit)
+
+
+def encode_cursor(timestamp: datetime, signal_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([timestamp.isoformat(), signal_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """(timestamp, id) of the last row of the previous page; ValueError if malformed."""
+    try:
+        timestamp, signal_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(timestamp), str(signal_id)
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError(f"invalid cursor: {cursor!r}") from e
+
+
+def _history_tables(db: Session) -> List[Table]:
+    """The hot signals table, plus on SQLite the month tables compaction moved older rows into."""
+    tables = [Signal.__table__]
+    if db.get_bind().dialect.name == "sqlite":
+        # Imported here: signal_compaction imports this module
+        from services.signal_compaction import MONTH_TABLE_RE, archive_table
+        for name in sorted(inspect(db.connection()).get_table_names(), reverse=True):
+            match = MONTH_TABLE_RE.match(name)
+            if match:
+                tables.append(archive_table(datetime(int(match[1]), int(match[2]), 1)))
+    return tables
+
+
+def query_signals(
+    db: Session,
+    source: Optional[str] = None,
+    commodity: Optional[str] = None,
+    region: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_raw: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    One page of published signals, newest first, and the cursor of the next
+    page (None on the last one). Pages continue strictly after the cursor's
+    (timestamp, id) — a keyset seek on the matching composite index — so a
+    deep page costs the same as the first. On SQLite every month table is
+    seeked the same way and the pages merged with UNION ALL. raw_data is only
+    loaded with `include_raw` (month tables no longer hold it).
+    """
+    after = decode_cursor(cursor) if cursor else None
+    pages = []
+    for table in _history_tables(db):
+        c = table.c
+        raw_data = c.raw_data if include_raw and "raw_data" in c else null()
+        query = select(
+            c.id, c.source, c.region, c.commodity, c.value, c.unit, c.severity, c.timestamp, c.created_at,
+            raw_data.label("raw_data"),
+        ).where(c.created_at >= PUBLISHED_SINCE)
+        if source:
+            query = query.where(c.source == SignalSource(source))
+        if commodity:
+            query = query.where(c.commodity == commodity)
+        if region:
+            query = query.where(c.region == region)
+        if start:
+            query = query.where(c.timestamp >= start)
+        if end:
+            query = query.where(c.timestamp < end)
+        if after:
+            query = query.where(tuple_(c.timestamp, c.id) < after)
+        pages.append(query.order_by(c.timestamp.desc(), c.id.desc()).limit(limit + 1))
+    if len(pages) > 1:
+        merged = union_all(*(select(page.subquery()) for page in pages)).subquery()
+        pages = [select(merged).order_by(merged.c.timestamp.desc(), merged.c.id.desc()).limit(limit + 1)]
+    rows = db.execute(pages[0]).all()
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(last.timestamp, last.id)
@@ -0,0 +1,156 @@
+"""
+Signal Writer — bulk inserts normalized feed records into the Signal table.
+
+Records are mapped straight to Signal column dicts (severity derived per
+source) without building ORM objects, and written in batches of
+SIGNAL_WRITE_BATCH_SIZE rows: one Core executemany INSERT per batch, or
+COPY ... FROM STDIN in text format (None sent as \\N, i.e. NULL) on
+PostgreSQL (psycopg2 / psycopg 3). `insert_signal_rows` takes an open
+Connection so callers can write inside their own transaction;
+`SignalBatcher` buffers records on the event loop and flushes full batches
+from a worker thread.
+"""
+import asyncio
+import io
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy.engine import Connection
+
+from config import settings
+from database import run_write
+from models.signal import Signal, SignalSource
+
+logger = logging.getLogger(__name__)
+
+_SIGNAL_COLUMNS = [c.name for c in Signal.__table__.columns]
+_COPY_DRIVERS = ("psycopg2", "psycopg")
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _parse_timestamp(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return datetime.utcnow()
+
+
+def _price_spread(record: Dict[str, Any]) -> float:
+    modal, max_p = record.get("modal_price", 0) or 0, record.get("max_price", 0) or 0
+    return round((max_p - modal) / max_p, 4) if max_p > 0 else 0.0
+
+
+def record_to_signal_fields(source: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a normalized feed record onto Signal columns (severity is derived per source)."""
+    if source in ("mandi", "enam"):
+        region, commodity = record.get("state"), record.get("commodity")
+        value, unit, severity = record.get("modal_price"), "INR/quintal", _price_spread(record)
+    elif source == "trade":
+        region, commodity = record.get("country"), record.get("commodity")
+        value, unit = record.get("value_inr_cr"), "INR crore"
+        severity = round(min(abs(record.get("change_pct", 0) or 0) / 20.0, 1.0), 4)
+    elif source == "weather":
+        region, commodity = record.get("region"), None
+        value, unit, severity = record.get("temperature"), "celsius", record.get("disruption_severity", 0.0)
+    else:
+        region, commodity = record.get("corridor_id", record.get("origin")), None
+        value, unit, severity = record.get("current_delay_hours"), "hours", record.get("congestion_level", 0.0)
+    return {
+        "source": SignalSource(source),
+        "region": region,
+        "commodity": commodity,
+        "value": value,
+        "unit": unit,
+        "severity": severity or 0.0,
+        "raw_data": record,
+        "timestamp": _parse_timestamp(record.get("timestamp")),
+    }
+
+
+def signal_rows(source: str, records: List[Dict[str, Any]], created_at: datetime) -> List[Dict[str, Any]]:
+    """Complete Signal row dicts (id and created_at included) for a Core insert."""
+    return [
+        {"id": str(uuid.uuid4()), **record_to_signal_fields(source, r), "created_at": created_at}
+        for r in records
+    ]
+
+
+def _copy_value(value: Any) -> str:
+    """One field in COPY text format: NULL is \\N, and backslash/tab/newline are escaped."""
+    if value is None:
+        return r"\N"
+    if isinstance(value, SignalSource):
+        value = value.name  # SQLEnum stores member names
+    elif isinstance(value, dict):
+        value = json.dumps(value, default=str)
+    elif isinstance(value, datetime):
+        value = value.isoformat(sep=" ")
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def copy_payload(rows: List[Dict[str, Any]]) -> str:
+    """Rows as COPY text-format input: tab-separated fields in _SIGNAL_COLUMNS order, one line per row."""
+    return "".join("\t".join(_copy_value(row[c]) for c in _SIGNAL_COLUMNS) + "\n" for row in rows)
+
+
+def _copy_rows(conn: Connection, rows: List[Dict[str, Any]]):
+    """COPY rows into signals in text format (None is sent as NULL, never as an empty string)."""
+    sql = f"COPY {Signal.__tablename__} ({', '.join(_SIGNAL_COLUMNS)}) FROM STDIN"
+    payload = copy_payload(rows)
+    raw = conn.connection.driver_connection
+    with raw.cursor() as cursor:
+        if conn.dialect.driver == "psycopg2":
+            cursor.copy_expert(sql, io.StringIO(payload))
+        else:
+            with cursor.copy(sql) as copy:
+                copy.write(payload)
+
+
+def insert_signal_rows(conn: Connection, rows: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+    """Insert Signal row dicts in batches on an open connection. Blocking."""
+    batch_size = batch_size or settings.SIGNAL_WRITE_BATCH_SIZE
+    use_copy = conn.dialect.name == "postgresql" and conn.dialect.driver in _COPY_DRIVERS
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        if use_copy:
+            _copy_rows(conn, batch)
+        else:
+            conn.execute(Signal.__table__.insert(), batch)
+    return len(rows)
+
+
+def write_signals(source: str, records: List[Dict[str, Any]], created_at: Optional[datetime] = None) -> int:
+    """Write records as Signal rows in one transaction. Blocking — call via a worker thread."""
+    if not records:
+        return 0
+    rows = signal_rows(source, records, created_at or datetime.utcnow())
+    return run_write(lambda db: insert_signal_rows(db.connection(), rows))
+
+
+class SignalBatcher:
+    """
+    Buffers records for one source and writes them off the event loop in
+    SIGNAL_WRITE_BATCH_SIZE batches. Call `flush()` once the feed is drained.
+    """
+
+    def __init__(self, source: str, created_at: datetime, batch_size: Optional[int] = None):
+        self.source = source
+        self.created_at = created_at
+        self.batch_size = batch_size or settings.SIGNAL_WRITE_BATCH_SIZE
+        self.written = 0
+        self._pending: List[Dict[str, Any]] = []
+
+    async def add(self, records: List[Dict[str, Any]]):
+        self._pending.extend(records)
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> int:
+        batch, self._pending = self._pending, []
+        if batch:
+            self.written += await asyncio.to_thread(write_signals, self.source, batch, self.created_at)
+        return self.written
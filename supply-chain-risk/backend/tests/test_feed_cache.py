@@ -0,0 +1,56 @@
+"""Isolation of records served by integrations.feed_cache.cached_feed."""
+import asyncio
+
+from integrations.feed_cache import cached_feed, feed_cache
+
+
+def test_mutating_a_returned_record_leaves_the_next_hit_unchanged():
+    calls = []
+
+    @cached_feed("isolation_test")
+    async def fetch(commodity: str = "Onion"):
+        calls.append(commodity)
+        return [{"commodity": commodity, "modal_price": 1500.0, "tags": ["live"], "meta": {"market": "Pune"}}]
+
+    async def scenario():
+        first = await fetch()
+        first[0]["modal_price"] = 0.0
+        first[0]["risk_score"] = 99
+        first[0]["tags"].append("annotated")
+        first[0]["meta"]["market"] = "changed"
+        first.append({"commodity": "extra"})
+        return await fetch()
+
+    try:
+        second = asyncio.run(scenario())
+    finally:
+        feed_cache.clear()
+    assert calls == ["Onion"]
+    assert second == [{"commodity": "Onion", "modal_price": 1500.0, "tags": ["live"], "meta": {"market": "Pune"}}]
+
+
+def test_last_known_good_records_are_copies():
+    responses = [
+        [{"commodity": "Onion", "modal_price": 1500.0, "meta": {"market": "Pune"}}],
+        [{"commodity": "Onion", "data_type": "fallback"}],
+        [{"commodity": "Onion", "data_type": "fallback"}],
+    ]
+
+    @cached_feed("isolation_lkg_test")
+    async def fetch():
+        return responses.pop(0)
+
+    async def scenario():
+        await fetch()
+        feed_cache.clear()  # expire the good result so the next calls hit the fallback
+        served = await fetch()
+        served[0]["meta"]["market"] = "changed"
+        feed_cache.clear()
+        return served, await fetch()
+
+    try:
+        served, again = asyncio.run(scenario())
+    finally:
+        feed_cache.clear()
+    assert served[0]["data_type"] == "last_known_good"
+    assert again[0]["meta"] == {"market": "Pune"}
@@ -0,0 +1,66 @@
+"""History paging of services.signal_store across the SQLite compaction boundary."""
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect
+
+from config import settings
+from database import SessionLocal, engine, init_db, run_write
+from models.signal import Signal, SignalSource
+from services.signal_compaction import MONTH_TABLE_RE, compact_signals
+from services.signal_store import query_signals
+
+
+def _seed(now):
+    """One weather signal a day for 90 days, the older two thirds past the raw window."""
+    rows = [
+        Signal(
+            id=f"sig-{day:03d}", source=SignalSource.WEATHER, region="Pune", commodity="Onion",
+            value=float(day), unit="mm", severity=0.5, raw_data={"day": day},
+            timestamp=now - timedelta(days=day), created_at=now - timedelta(days=day),
+        )
+        for day in range(90)
+    ]
+    run_write(lambda db: db.add_all(rows))
+    return [r.id for r in rows]
+
+
+def _page_all(**filters):
+    ids, cursor = [], None
+    db = SessionLocal()
+    try:
+        while True:
+            rows, cursor = query_signals(db, limit=7, cursor=cursor, **filters)
+            ids += [r.id for r in rows]
+            if cursor is None:
+                return ids, rows
+    finally:
+        db.close()
+
+
+def test_query_signals_pages_across_compacted_months():
+    init_db()
+    now = datetime.utcnow().replace(microsecond=0)
+    expected = _seed(now)
+    compact_signals(now)
+
+    with engine.connect() as conn:
+        month_tables = [n for n in inspect(conn).get_table_names() if MONTH_TABLE_RE.match(n)]
+        hot = conn.execute(Signal.__table__.select().where(Signal.source == SignalSource.WEATHER)).all()
+    assert month_tables
+    assert len(hot) < len(expected)
+
+    ids, last_page = _page_all(source="weather")
+    assert ids == expected  # newest first, every row exactly once
+    assert last_page[-1].source == SignalSource.WEATHER
+
+    window_start = now - timedelta(days=settings.SIGNAL_RAW_RETENTION_DAYS + 10)
+    ids, _ = _page_all(source="weather", start=window_start, end=now - timedelta(days=5))
+    assert ids == [i for i, day in zip(expected, range(90)) if 5 < day <= settings.SIGNAL_RAW_RETENTION_DAYS + 10]
+
+
+    db = SessionLocal()
+    try:
+        rows, _ = query_signals(db, source="weather", include_raw=True, limit=90)
+    finally:
+        db.close()
+    assert [r.raw_data is None for r in rows] == [day > settings.SIGNAL_RAW_RETENTION_DAYS for day in range(90)]
@@ -0,0 +1,80 @@
+"""COPY path of services.signal_writer, driven through a stand-in psycopg2 connection."""
+from datetime import datetime
+from types import SimpleNamespace
+
+from services.signal_writer import _SIGNAL_COLUMNS, insert_signal_rows, signal_rows
+
+
+class _Cursor:
+    def __init__(self, sink):
+        self.sink = sink
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def copy_expert(self, sql, buffer):
+        self.sink.append((sql, buffer.read()))
+
+
+def _copy_through_fake_postgres(rows):
+    sink = []
+    raw = SimpleNamespace(cursor=lambda: _Cursor(sink))
+    conn = SimpleNamespace(
+        dialect=SimpleNamespace(name="postgresql", driver="psycopg2"),
+        connection=SimpleNamespace(driver_connection=raw),
+    )
+    assert insert_signal_rows(conn, rows) == len(rows)
+    return sink
+
+
+def _parse_text_copy(payload):
+    """Decode COPY text format back into dicts (\\N -> None)."""
+    unescape = {"\\\\": "\\", "\\t": "\t", "\\n": "\n", "\\r": "\r"}
+    rows = []
+    for line in payload.splitlines():
+        fields = []
+        for field in line.split("\t"):
+            if field == r"\N":
+                fields.append(None)
+                continue
+            out, i = [], 0
+            while i < len(field):
+                pair = field[i:i + 2]
+                if pair in unescape:
+                    out.append(unescape[pair])
+                    i += 2
+                else:
+                    out.append(field[i])
+                    i += 1
+            fields.append("".join(out))
+        rows.append(dict(zip(_SIGNAL_COLUMNS, fields)))
+    return rows
+
+
+def test_copy_sends_none_as_null():
+    created_at = datetime(2026, 1, 1)
+    rows = signal_rows("weather", [{"region": "Mumbai", "temperature": None, "timestamp": "2026-01-01T00:00:00"}], created_at)
+    rows[0]["severity"] = None
+    (sql, payload), = _copy_through_fake_postgres(rows)
+
+    assert "FORMAT csv" not in sql
+    parsed, = _parse_text_copy(payload)
+    assert parsed["commodity"] is None
+    assert parsed["value"] is None
+    assert parsed["severity"] is None
+    assert parsed["region"] == "Mumbai"
+    assert parsed["source"] == "WEATHER"
+
+
+def test_copy_keeps_empty_strings_and_escapes_control_characters():
+    rows = signal_rows("mandi", [{"state": "", "commodity": "On\tion\nRed\\", "modal_price": 1.5, "max_price": 2.0}], datetime(2026, 1, 1))
+    (_, payload), = _copy_through_fake_postgres(rows)
+
+    assert payload.count("\n") == 1
+    parsed, = _parse_text_copy(payload)
+    assert parsed["region"] == ""
+    assert parsed["commodity"] == "On\tion\nRed\\"
+    assert float(parsed["value"]) == 1.5